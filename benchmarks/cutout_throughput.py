@@ -0,0 +1,199 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cutout throughput of BossRemote against a local mock Boss.
+
+Runs get_cutout across chunk sizes, parallelism modes and dtypes, and
+create_cutout across dtypes, against MockBossServer. For every case it
+reports throughput (uncompressed MB/s), p50/p99 time per HTTP request as seen
+by the server, and the peak RSS of the client (including its worker
+processes). Each case runs in a fresh process so peak RSS is per case.
+
+    python -m benchmarks.cutout_throughput --latency-ms 20 --bandwidth-mbps 200 \\
+        --extent 1024,1024,64 --dtypes uint8 uint64 --json results.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.mock_boss import MockBossServer
+
+COLLECTION, EXPERIMENT = "bench", "bench"
+
+DEFAULT_CHUNK_SIZES = [(512, 512, 16), (512, 512, 64), (512, 512, 96), (512, 512, 192)]
+DEFAULT_PARALLEL = ["false", "4", "true"]
+
+
+def make_volume(shape, dtype, seed=0):
+    """
+    A volume that compresses roughly like real data: smooth image intensities,
+    or piecewise-constant labels for annotation dtypes.
+    """
+    rng = np.random.RandomState(seed)
+    dtype = np.dtype(dtype)
+    if dtype == np.uint64:
+        coarse = rng.randint(1, 2 ** 32, size=[max(1, s // 16) for s in shape]).astype(dtype)
+        volume = coarse.repeat(16, 0).repeat(16, 1).repeat(16, 2)
+    else:
+        high = np.iinfo(dtype).max
+        volume = (rng.normal(high / 2, high / 16, size=shape)).clip(0, high).astype(dtype)
+    volume = volume[:shape[0], :shape[1], :shape[2]]
+    return np.ascontiguousarray(np.pad(
+        volume, [(0, s - v) for s, v in zip(shape, volume.shape)], mode="edge"))
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process and of its finished children, in MB (Linux reports KB)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return max(own, children) / scale
+
+
+def _run_case(config, case, extent, results):
+    """Run one case in this (fresh) process and put its measurements on `results`."""
+    from intern.remote.boss import BossRemote
+    from intern.resource.boss.resource import ChannelResource
+
+    rmt = BossRemote(config)
+    chan = ChannelResource(
+        case["dtype"], COLLECTION, EXPERIMENT, datatype=case["dtype"],
+        type="annotation" if case["dtype"] == "uint64" else "image")
+    x_rng, y_rng, z_rng = [0, extent[0]], [0, extent[1]], [0, extent[2]]
+
+    if case["op"] == "get":
+        start = time.perf_counter()
+        data = rmt.get_cutout(
+            chan, 0, x_rng, y_rng, z_rng, parallel=case["parallel"],
+            chunk_size=case["chunk_size"])
+        elapsed = time.perf_counter() - start
+        nbytes = data.nbytes
+    else:
+        data = make_volume(extent[::-1], case["dtype"], seed=1)
+        start = time.perf_counter()
+        rmt.create_cutout(chan, 0, x_rng, y_rng, z_rng, data)
+        elapsed = time.perf_counter() - start
+        nbytes = data.nbytes
+    results.put({"seconds": elapsed, "bytes": nbytes, "peak_rss_mb": _peak_rss_mb()})
+
+
+def run_case(server, case, extent):
+    """Run a case in a child process and combine its measurements with the server's."""
+    server.reset_requests()
+    results = multiprocessing.Queue()
+    proc = multiprocessing.Process(
+        target=_run_case, args=(server.remote_config(), case, extent, results))
+    proc.start()
+    measured = results.get()
+    proc.join()
+    if proc.exitcode:
+        raise RuntimeError("Case {} failed with exit code {}".format(case, proc.exitcode))
+
+    requests = server.reset_requests()
+    per_request = np.array([r["seconds"] for r in requests]) * 1000
+    raw = sum(r["bytes"] for r in requests)
+    compressed = sum(r["compressed_bytes"] for r in requests)
+    row = dict(case)
+    row.update({
+        "mb_per_s": measured["bytes"] / measured["seconds"] / 1e6,
+        "seconds": measured["seconds"],
+        "requests": len(requests),
+        "p50_ms": float(np.percentile(per_request, 50)) if len(requests) else None,
+        "p99_ms": float(np.percentile(per_request, 99)) if len(requests) else None,
+        "compression_ratio": raw / compressed if compressed else None,
+        "peak_rss_mb": measured["peak_rss_mb"],
+    })
+    return row
+
+
+def cases(ops, dtypes, chunk_sizes, parallel_modes):
+    """Cases to run. create_cutout takes neither a chunk size nor parallel, so it runs once per dtype."""
+    for dtype in dtypes:
+        if "get" in ops:
+            for chunk_size in chunk_sizes:
+                for parallel in parallel_modes:
+                    yield {"op": "get", "dtype": dtype, "chunk_size": chunk_size, "parallel": parallel}
+        if "create" in ops:
+            yield {"op": "create", "dtype": dtype, "chunk_size": None, "parallel": None}
+
+
+def _parse_parallel(value):
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    return int(value)
+
+
+def _parse_triple(value):
+    return tuple(int(v) for v in value.split(","))
+
+
+def _print_row(row):
+    print("{op:>6} {dtype:>6} {chunk:>13} {parallel:>8} {mb_per_s:>9.1f} {p50:>9} {p99:>9} {rss:>9.0f}".format(
+        op=row["op"], dtype=row["dtype"],
+        chunk="x".join(map(str, row["chunk_size"])) if row["chunk_size"] else "-",
+        parallel=str(row["parallel"]) if row["parallel"] is not None else "-",
+        mb_per_s=row["mb_per_s"],
+        p50="{:.1f}".format(row["p50_ms"]) if row["p50_ms"] is not None else "-",
+        p99="{:.1f}".format(row["p99_ms"]) if row["p99_ms"] is not None else "-",
+        rss=row["peak_rss_mb"],
+    ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cutout throughput against a mock Boss.")
+    parser.add_argument("--extent", type=_parse_triple, default=(1024, 1024, 64),
+                        help="Cutout size in XYZ, e.g. 1024,1024,64.")
+    parser.add_argument("--dtypes", nargs="+", default=["uint8", "uint16", "uint64"])
+    parser.add_argument("--ops", nargs="+", choices=["get", "create"], default=["get", "create"])
+    parser.add_argument("--chunk-sizes", nargs="+", type=_parse_triple, default=DEFAULT_CHUNK_SIZES,
+                        help="get_cutout chunk sizes in XYZ, e.g. 512,512,96.")
+    parser.add_argument("--parallel", nargs="+", type=_parse_parallel,
+                        default=[_parse_parallel(p) for p in DEFAULT_PARALLEL],
+                        help="get_cutout parallel modes: true, false or a process count.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Server latency per request.")
+    parser.add_argument("--bandwidth-mbps", type=float, default=None,
+                        help="Server bandwidth per connection, in MB/s. Unthrottled if omitted.")
+    parser.add_argument("--json", default=None, help="Also write the results to this file.")
+    args = parser.parse_args(argv)
+
+    bandwidth = args.bandwidth_mbps * 1e6 if args.bandwidth_mbps else None
+    rows = []
+    with MockBossServer(latency=args.latency_ms / 1000, bandwidth=bandwidth) as server:
+        for dtype in args.dtypes:
+            server.add_channel(COLLECTION, EXPERIMENT, dtype, make_volume(args.extent[::-1], dtype))
+
+        print("{:>6} {:>6} {:>13} {:>8} {:>9} {:>9} {:>9} {:>9}".format(
+            "op", "dtype", "chunk_size", "parallel", "MB/s", "p50 ms", "p99 ms", "RSS MB"))
+        for case in cases(args.ops, args.dtypes, args.chunk_sizes, args.parallel):
+            row = run_case(server, case, args.extent)
+            _print_row(row)
+            rows.append(row)
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "json"}, "results": rows},
+                      fp, indent=2)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
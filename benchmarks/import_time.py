@@ -0,0 +1,99 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure how long it takes a fresh interpreter to import intern.
+
+Each statement is timed in its own interpreter, several times, and the median
+is reported next to the cost of starting a bare interpreter. Pass --max-ms to
+fail (exit code 1) when an import gets slower than a budget, e.g. in CI:
+
+    python benchmarks/import_time.py --max-ms 150
+
+Use --profile to print the slowest modules of one statement, from
+`python -X importtime`.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    "import intern",
+    "from intern.convenience import parse_fquri",
+    "from intern.remote.boss import BossRemote",
+    "from intern import array; array",
+]
+
+
+def time_statement(statement, repeat):
+    """Median wall time, in ms, of running `statement` in a fresh interpreter."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", statement], cwd=ROOT)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def profile_statement(statement, top):
+    """Print the `top` modules with the largest cumulative import time."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print("{:>10.1f} ms  {}".format(cumulative / 1000, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Fail if `import intern` takes longer than this, above a bare interpreter.")
+    parser.add_argument("--profile", metavar="STATEMENT", default=None)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    if args.profile:
+        profile_statement(args.profile, args.top)
+        return 0
+
+    baseline = time_statement("pass", args.repeat)
+    print("{:>10.1f} ms  (bare interpreter)".format(baseline))
+    results = {}
+    for statement in STATEMENTS:
+        results[statement] = time_statement(statement, args.repeat) - baseline
+        print("{:>10.1f} ms  {}".format(results[statement], statement))
+
+    if args.max_ms is not None and results["import intern"] > args.max_ms:
+        print("`import intern` took {:.1f} ms, over the {:.1f} ms budget.".format(
+            results["import intern"], args.max_ms))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+An in-process stand-in for the Boss cutout service.
+
+MockBossServer answers the cutout routes used by intern's Boss volume service
+(GET and POST of blosc-compressed cuboids, and PUT to black) from numpy
+volumes held in memory.
+Latency and bandwidth can be throttled so that benchmarks see realistic
+network behavior without a real Boss:
+
+    with MockBossServer(latency=0.02, bandwidth=100e6) as server:
+        server.add_channel("col", "exp", "chan", volume)
+        rmt = BossRemote(server.remote_config())
+        ...
+
+Each request's timing is recorded in `server.requests`.
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+import re
+import threading
+import time
+
+import blosc
+import numpy as np
+
+# /v1/cutout/<coll>/<exp>/<chan>/<res>/<x0:x1>/<y0:y1>/<z0:z1>/
+CUTOUT_ROUTE = re.compile(
+    r"^/v1/cutout/([^/]+)/([^/]+)/([^/]+)/(\d+)/(\d+):(\d+)/(\d+):(\d+)/(\d+):(\d+)/?(?:\?.*)?$"
+)
+
+# /v1/cutout/to_black/<coll>/<exp>/<chan>/<res>/<x0:x1>/<y0:y1>/<z0:z1>/
+TO_BLACK_ROUTE = re.compile(
+    r"^/v1/cutout/to_black/([^/]+)/([^/]+)/([^/]+)/(\d+)/(\d+):(\d+)/(\d+):(\d+)/(\d+):(\d+)/?(?:\?.*)?$"
+)
+
+# Bandwidth throttling sends the response body in pieces of this size.
+_SEND_SIZE = 64 * 1024
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _route(self, route=CUTOUT_ROUTE):
+        match = route.match(self.path)
+        if match is None:
+            self._reply(404, b"Unknown route")
+            return None
+        coll, exp, chan = match.group(1, 2, 3)
+        volume = self.server.boss.volumes.get((coll, exp, chan))
+        if volume is None:
+            self._reply(404, b"Unknown channel")
+            return None
+        x0, x1, y0, y1, z0, z1 = (int(v) for v in match.group(5, 6, 7, 8, 9, 10))
+        if x1 > volume.shape[2] or y1 > volume.shape[1] or z1 > volume.shape[0]:
+            self._reply(400, b"Cutout out of bounds")
+            return None
+        return volume, np.s_[z0:z1, y0:y1, x0:x1]
+
+    def do_GET(self):
+        start = time.perf_counter()
+        route = self._route()
+        if route is None:
+            return
+        volume, index = route
+        raw = np.ascontiguousarray(volume[index])
+        body = blosc.compress(raw, typesize=raw.dtype.itemsize * 8)
+        self._reply(200, body, "application/blosc")
+        self.server.boss._record("GET", raw.nbytes, len(body), start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        route = self._route()
+        if route is None:
+            return
+        volume, index = route
+        shape = volume[index].shape
+        volume[index] = np.frombuffer(blosc.decompress(body), dtype=volume.dtype).reshape(shape)
+        self._reply(201, b"")
+        self.server.boss._record("POST", volume[index].nbytes, len(body), start)
+
+    def do_PUT(self):
+        start = time.perf_counter()
+        route = self._route(TO_BLACK_ROUTE)
+        if route is None:
+            return
+        volume, index = route
+        volume[index] = 0
+        self._reply(200, b"")
+        self.server.boss._record("PUT", volume[index].nbytes, 0, start)
+
+    def _reply(self, status, body, content_type="text/plain"):
+        boss = self.server.boss
+        if boss.latency:
+            time.sleep(boss.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not boss.bandwidth:
+            self.wfile.write(body)
+            return
+        # Throttle each connection to `bandwidth` bytes per second.
+        sent_start = time.perf_counter()
+        for offset in range(0, len(body), _SEND_SIZE):
+            piece = body[offset:offset + _SEND_SIZE]
+            self.wfile.write(piece)
+            due = sent_start + (offset + len(piece)) / boss.bandwidth
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+class MockBossServer(object):
+    """Serve Boss cutouts from memory on a local port.
+
+    Attributes:
+        latency (float): Seconds to wait before answering each request.
+        bandwidth (float): Bytes per second per connection, or None for unthrottled.
+        volumes (dict): {(collection, experiment, channel): ZYX numpy array}
+        requests (list[dict]): One record per cutout request served, with the
+            method, raw and compressed sizes, and the time taken to answer it
+            (including latency and throttling).
+    """
+
+    def __init__(self, latency=0.0, bandwidth=None, host="127.0.0.1", port=0):
+        """Constructor.
+
+        Args:
+            latency (optional[float]): Seconds to wait before answering each request.
+            bandwidth (optional[float]): Bytes per second per connection.
+            host (optional[str]): Interface to listen on.
+            port (optional[int]): Port to listen on; 0 picks a free port.
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.volumes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.boss = self
+        self._thread = None
+
+    @property
+    def address(self):
+        """(host, port) the server is listening on."""
+        return self._server.server_address
+
+    def remote_config(self, token="benchmark"):
+        """Config dict for a BossRemote that talks to this server."""
+        return {"protocol": "http", "host": "{}:{}".format(*self.address), "token": token}
+
+    def add_channel(self, collection, experiment, channel, volume):
+        """Serve a ZYX volume as a channel. Writes go to the same array."""
+        self.volumes[(collection, experiment, channel)] = volume
+
+    def reset_requests(self):
+        """Clear and return the request records."""
+        with self._lock:
+            records, self.requests = self.requests, []
+        return records
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _record(self, method, raw_bytes, compressed_bytes, start):
+        record = {
+            "method": method,
+            "bytes": raw_bytes,
+            "compressed_bytes": compressed_bytes,
+            "seconds": time.perf_counter() - start,
+        }
+        with self._lock:
+            self.requests.append(record)
@@ -0,0 +1,75 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from benchmarks.mock_boss import MockBossServer
+from benchmarks.cutout_throughput import make_volume, main
+from intern.remote.boss import BossRemote
+from intern.resource.boss.resource import ChannelResource
+import contextlib
+import io
+import numpy as np
+import unittest
+
+
+class TestMockBoss(unittest.TestCase):
+    def setUp(self):
+        self.server = MockBossServer().start()
+        self.addCleanup(self.server.stop)
+        self.volume = make_volume((16, 64, 64), "uint16")
+        self.server.add_channel("col", "exp", "chan", self.volume)
+        self.rmt = BossRemote(self.server.remote_config())
+        self.chan = ChannelResource("chan", "col", "exp", datatype="uint16")
+
+    def test_get_cutout_in_chunks(self):
+        data = self.rmt.get_cutout(
+            self.chan, 0, [0, 64], [8, 64], [0, 16], parallel=False, chunk_size=(32, 32, 8))
+        np.testing.assert_array_equal(data, self.volume[:, 8:, :])
+        requests = self.server.reset_requests()
+        self.assertEqual(len(requests), 2 * 2 * 2)
+        self.assertEqual(sum(r["bytes"] for r in requests), data.nbytes)
+
+    def test_create_cutout(self):
+        data = np.ones((4, 8, 8), dtype=np.uint16)
+        self.rmt.create_cutout(self.chan, 0, [8, 16], [0, 8], [2, 6], data)
+        np.testing.assert_array_equal(self.volume[2:6, 0:8, 8:16], data)
+
+    def test_create_cutout_to_black(self):
+        self.rmt.create_cutout_to_black(self.chan, 0, [8, 16], [0, 8], [2, 6])
+        self.assertFalse(self.volume[2:6, 0:8, 8:16].any())
+        self.assertTrue(self.volume[0].any())
+
+    def test_unknown_channel(self):
+        chan = ChannelResource("missing", "col", "exp", datatype="uint16")
+        with self.assertRaises(Exception):
+            self.rmt.get_cutout(chan, 0, [0, 8], [0, 8], [0, 8], parallel=False)
+
+
+class TestCutoutThroughput(unittest.TestCase):
+    def test_runs_every_case(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = main([
+                "--extent", "64,64,16", "--dtypes", "uint8", "uint64",
+                "--chunk-sizes", "32,32,8", "--parallel", "false",
+                "--latency-ms", "1", "--bandwidth-mbps", "100",
+            ])
+        self.assertEqual([(r["op"], r["dtype"]) for r in rows], [
+            ("get", "uint8"), ("create", "uint8"), ("get", "uint64"), ("create", "uint64")])
+        for row in rows:
+            self.assertGreater(row["mb_per_s"], 0)
+            self.assertGreater(row["peak_rss_mb"], 0)
+        self.assertEqual(rows[0]["requests"], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
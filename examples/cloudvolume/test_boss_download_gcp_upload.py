@@ -1,5 +1,3 @@
-import numpy as np
-
 from intern.remote.boss import BossRemote
 from intern.resource.boss.resource import *
 from intern.remote.cv import CloudVolumeRemote
@@ -21,12 +19,6 @@ z_rng = [0, 250]
 # Use base resolution.
 res = 0
 
-# Download the cutout from the channel.
-data = boss_rmt.get_cutout(chan, res, x_rng, y_rng, z_rng)
-
-# cloud-volume likes data in X Y Z format
-data = np.transpose(data)
-
 # Set up cloud-volume remote
 cv_config = {
     "protocol": "gcp",
@@ -47,5 +39,6 @@ info = cv_rmt.create_new_info(
 # create new cloudvolume resource
 cv_resource = cv_rmt.cloudvolume(info=info)
 
-# Upload cutout
-cv_rmt.create_cutout(cv_resource, 0, [0, 250], [0, 250], [0, 250], data)
+# Stream the cutout from the Boss to cloud-volume, one chunk-aligned block at a
+# time. Axes are reordered from Boss's Z Y X to cloud-volume's X Y Z on the way.
+boss_rmt.transfer_cutout(chan, res, x_rng, y_rng, z_rng, cv_rmt, cv_resource)
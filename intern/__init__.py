@@ -2,6 +2,18 @@
 A Python library for open neuroscience data access and manipulation.
 """
 
-from .convenience import array
+import sys
 
 from .version import __version__, check_version
+
+# `intern.array` pulls in the Boss remote, requests, blosc and numpy, so it is
+# only imported the first time it is used (PEP 562). Python 3.6 doesn't support
+# module __getattr__ and imports it eagerly.
+if sys.version_info < (3, 7):
+    from .convenience import array
+else:
+    def __getattr__(name):
+        if name == "array":
+            from . import convenience
+            return convenience.__getattr__(name)
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -1,2 +1,28 @@
+import sys
+
 from .uri import parse_fquri, PROTOCOLS, InvalidURIError
-from .array import AxisOrder, array
+
+# The array module needs the Boss remote and numpy, so it is only imported the
+# first time `array` or `AxisOrder` is used (PEP 562). Python 3.6 doesn't
+# support module __getattr__ and imports it eagerly.
+if sys.version_info < (3, 7):
+    from .array import AxisOrder, array
+else:
+    import types
+
+    class _ConvenienceModule(types.ModuleType):
+        def __setattr__(self, name, value):
+            # Importing the `array` submodule, from anywhere, binds it on the
+            # package; bind the class of the same name instead.
+            if name == "array" and isinstance(value, types.ModuleType):
+                value = value.array
+            super().__setattr__(name, value)
+
+    sys.modules[__name__].__class__ = _ConvenienceModule
+
+    def __getattr__(name):
+        if name in ("array", "AxisOrder"):
+            from .array import AxisOrder, array
+            globals().update(array=array, AxisOrder=AxisOrder)
+            return globals()[name]
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
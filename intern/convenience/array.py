@@ -15,9 +15,10 @@ limitations under the License.
 """
 
 # Standard imports
-from typing import Optional, Union, Tuple
+from typing import Callable, Optional, Union, Tuple
 import abc
 import json
+import os
 from collections import namedtuple
 from urllib.parse import unquote
 
@@ -55,6 +56,9 @@ class VolumeProvider(abc.ABC):
 
     """
 
+    # Cutouts are always read and written in ZYX order.
+    cutout_axis_order = "ZYX"
+
     def get_channel(self, channel: str, collection: str, experiment: str):
         ...
 
@@ -85,6 +89,49 @@ class VolumeProvider(abc.ABC):
     ):
         ...
 
+    def get_cutout_chunking(self, channel: ChannelResource, resolution: int):
+        """
+        Get the native chunk grid of the channel, as (chunk_size, origin) in
+        XYZ order. Defaults to the Boss' cuboids.
+
+        """
+        return (512, 512, 16), (0, 0, 0)
+
+    def get_channel_from_uri(self, uri: str):
+        """
+        Get the channel named by a URI, and the resolution given in it.
+
+        Returns:
+            Tuple[ChannelResource, Optional[int]]
+
+        """
+        parsed = parse_bossdb_uri(uri)
+        channel = self.get_channel(parsed.channel, parsed.collection, parsed.experiment)
+        return channel, parsed.resolution
+
+    def get_dtype(self, channel: ChannelResource) -> str:
+        """
+        Get the datatype of the channel's cutouts.
+
+        """
+        return channel.datatype
+
+    def get_url(self, channel: ChannelResource) -> str:
+        """
+        Get a link to a page describing the channel.
+
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no pages for channels.")
+
+    def get_neuroglancer_source(self, channel: ChannelResource) -> str:
+        """
+        Get the neuroglancer layer source of the channel.
+
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} has no neuroglancer sources for channels."
+        )
+
 
 class _InternVolumeProvider(VolumeProvider):
     """
@@ -134,6 +181,373 @@ class _InternVolumeProvider(VolumeProvider):
     ):
         return self.boss.create_cutout(channel, resolution, xs, ys, zs, data)
 
+    def get_cutout_chunking(self, channel: ChannelResource, resolution: int):
+        return self.boss.get_cutout_chunking(channel, resolution)
+
+    def _api_root(self) -> str:
+        project = self.boss.project_service
+        return f"{project.base_protocol}://{project.base_url}"
+
+    def get_url(self, channel: ChannelResource) -> str:
+        return f"{self._api_root()}/v1/mgmt/resources/{channel.coll_name}/{channel.exp_name}/{channel.name}"
+
+    def get_neuroglancer_source(self, channel: ChannelResource) -> str:
+        return f"boss://{self._api_root()}/{channel.coll_name}/{channel.exp_name}/{channel.name}"
+
+
+class _SingleChannelVolumeProvider(VolumeProvider):
+    """
+    Base for VolumeProviders that serve one volume of a Remote without
+    collections or experiments.
+
+    The volume is presented as `self.channel`, with an experiment of the same
+    collection and experiment names, and `self.coord_frame` for its extents.
+    Subclasses read `self.resource` from `self.remote`.
+    """
+
+    num_hierarchy_levels = 1
+    hierarchy_method = "anisotropic"
+
+    def get_channel(self, channel: str, collection: str, experiment: str):
+        return self.channel
+
+    def get_channel_from_uri(self, uri: str):
+        return self.channel, None
+
+    def get_project(self, resource):
+        if isinstance(resource, CollectionResource):
+            return CollectionResource(self.channel.coll_name)
+        if isinstance(resource, ExperimentResource):
+            return ExperimentResource(
+                self.channel.exp_name,
+                self.channel.coll_name,
+                coord_frame=self.coord_frame.name,
+                num_hierarchy_levels=self.num_hierarchy_levels,
+                hierarchy_method=self.hierarchy_method,
+            )
+        if isinstance(resource, CoordinateFrameResource):
+            return self.coord_frame
+        return self.channel
+
+    def create_project(self, resource):
+        raise NotImplementedError(
+            f"{type(self).__name__} cannot create collections, experiments or channels."
+        )
+
+    def get_cutout_chunking(self, channel: ChannelResource, resolution: int):
+        return self.remote.get_cutout_chunking(self.resource, resolution)
+
+
+class _CloudVolumeVolumeProvider(_SingleChannelVolumeProvider):
+    """
+    A VolumeProvider that backends one layer of a CloudVolumeRemote.
+
+    The layer is presented as channel `<layer>` of experiment `<dataset>` in
+    collection "precomputed", in a coordinate frame built from its mip-0
+    bounds and resolution.
+    """
+
+    def __init__(self, remote, **kwargs):
+        """
+        Arguments:
+            remote (intern.remote.cv.CloudVolumeRemote): Remote of the layer.
+            kwargs: Passed to `CloudVolumeRemote.cloudvolume`, such as `mip`.
+
+        """
+        self.remote = remote
+        self.resource = remote.cloudvolume(**kwargs)
+        vol = self.resource.cloudvolume
+
+        self.dtype = str(np.dtype(vol.data_type))
+        self.channel = ChannelResource(
+            remote.get_layer(self.resource),
+            "precomputed",
+            remote.get_dataset_name(self.resource),
+            type="image" if vol.layer_type == "image" else "annotation",
+            # Channels only take the Boss' datatypes; get_dtype reports the
+            # layer's own.
+            datatype=self.dtype
+            if self.dtype in ChannelResource._valid_datatypes
+            else "",
+        )
+
+        self.num_hierarchy_levels = len(vol.meta.scales)
+        if self.num_hierarchy_levels > 1:
+            # Every scale of the info file is a readable level.
+            self.channel.downsample_status = "DOWNSAMPLED"
+            if vol.meta.resolution(1)[2] != vol.meta.resolution(0)[2]:
+                self.hierarchy_method = "isotropic"
+        bounds = vol.meta.bounds(0)
+        voxel_size = vol.meta.resolution(0)
+        self.coord_frame = CoordinateFrameResource(
+            f"CF_{self.channel.exp_name}_{self.channel.name}",
+            x_start=int(bounds.minpt[0]),
+            x_stop=int(bounds.maxpt[0]),
+            y_start=int(bounds.minpt[1]),
+            y_stop=int(bounds.maxpt[1]),
+            z_start=int(bounds.minpt[2]),
+            z_stop=int(bounds.maxpt[2]),
+            x_voxel_size=float(voxel_size[0]),
+            y_voxel_size=float(voxel_size[1]),
+            z_voxel_size=float(voxel_size[2]),
+            voxel_unit="nanometers",
+        )
+
+    def get_dtype(self, channel: ChannelResource) -> str:
+        return self.dtype
+
+    def get_cutout(
+        self,
+        channel: ChannelResource,
+        resolution: int,
+        xs: Tuple[int, int],
+        ys: Tuple[int, int],
+        zs: Tuple[int, int],
+    ):
+        cutout = self.remote.get_cutout(self.resource, resolution, xs, ys, zs)
+        # CloudVolumeRemote returns XYZ data with length-1 axes squeezed out.
+        sizes = (xs[1] - xs[0], ys[1] - ys[0], zs[1] - zs[0])
+        return np.asarray(cutout).reshape(sizes).T
+
+    def create_cutout(
+        self,
+        channel: ChannelResource,
+        resolution: int,
+        xs: Tuple[int, int],
+        ys: Tuple[int, int],
+        zs: Tuple[int, int],
+        data,
+    ):
+        return self.remote.create_cutout(
+            self.resource, resolution, xs, ys, zs, np.asarray(data).T
+        )
+
+    def get_url(self, channel: ChannelResource) -> str:
+        return self.resource.url
+
+    def get_neuroglancer_source(self, channel: ChannelResource) -> str:
+        return f"precomputed://{self.resource.url}"
+
+
+class _DVIDVolumeProvider(_SingleChannelVolumeProvider):
+    """
+    A VolumeProvider that backends one data instance of a DVIDRemote.
+
+    The instance is presented as channel `<instance>` of experiment `<UUID>`
+    in collection "dvid", in a coordinate frame built from the instance's
+    metadata.
+    """
+
+    def __init__(
+        self, remote, uuid: str, instance: str, datatype: Optional[str] = None
+    ):
+        """
+        Arguments:
+            remote (intern.remote.dvid.DVIDRemote): Remote of the instance.
+            uuid (str): UUID of the repository node.
+            instance (str): Name of the data instance.
+            datatype (Optional[str]): Datatype of the instance. Defaults to
+                the datatype in the instance's info.
+
+        """
+        self.remote = remote
+        if datatype is None:
+            info = remote.get_info(remote.get_instance(uuid, instance))
+            datatype = info["Extended"]["Values"][0]["DataType"]
+        self.resource = remote.get_instance(uuid, instance, datatype)
+        self.channel = ChannelResource(
+            instance,
+            "dvid",
+            uuid,
+            type="image" if datatype in ["uint8", "uint16"] else "annotation",
+            datatype=datatype,
+        )
+        self._coord_frame = None
+
+    @property
+    def coord_frame(self) -> CoordinateFrameResource:
+        # Fetched on first use, so that opening an array is a single request.
+        if self._coord_frame is None:
+            properties = self.remote.get_metadata(self.resource)["Properties"]
+            min_point = properties["MinPoint"]
+            max_point = properties["MaxPoint"]
+            voxel_size = properties.get("VoxelSize") or [1, 1, 1]
+            voxel_unit = (properties.get("VoxelUnits") or ["nanometers"])[0]
+            # DVID's MaxPoint is the last voxel, not one past it.
+            self._coord_frame = CoordinateFrameResource(
+                f"CF_{self.channel.exp_name}_{self.channel.name}",
+                x_start=min_point[0],
+                x_stop=max_point[0] + 1,
+                y_start=min_point[1],
+                y_stop=max_point[1] + 1,
+                z_start=min_point[2],
+                z_stop=max_point[2] + 1,
+                x_voxel_size=voxel_size[0],
+                y_voxel_size=voxel_size[1],
+                z_voxel_size=voxel_size[2],
+                voxel_unit=voxel_unit,
+            )
+        return self._coord_frame
+
+    def get_cutout(
+        self,
+        channel: ChannelResource,
+        resolution: int,
+        xs: Tuple[int, int],
+        ys: Tuple[int, int],
+        zs: Tuple[int, int],
+    ):
+        return self.remote.get_cutout(self.resource, resolution, xs, ys, zs)
+
+    def create_cutout(
+        self,
+        channel: ChannelResource,
+        resolution: int,
+        xs: Tuple[int, int],
+        ys: Tuple[int, int],
+        zs: Tuple[int, int],
+        data,
+    ):
+        return self.remote.create_cutout(self.resource, resolution, xs, ys, zs, data)
+
+    def _instance_url(self) -> str:
+        return f"{self.remote.volume_service.base_url}/api/node/{self.resource.UUID}/{self.resource.name}"
+
+    def get_url(self, channel: ChannelResource) -> str:
+        return f"{self._instance_url()}/info"
+
+    def get_neuroglancer_source(self, channel: ChannelResource) -> str:
+        return f"dvid://{self.remote.volume_service.base_url}/{self.resource.UUID}/{self.resource.name}"
+
+
+class _LocalVolumeProvider(_SingleChannelVolumeProvider):
+    """
+    A VolumeProvider that backends one volume of a LocalRemote.
+
+    The volume is presented as channel `<directory name>` of experiment
+    "local" in collection "local". Cutouts are views of the mapped files.
+    """
+
+    def __init__(self, remote, path: str, mode: str = "r+"):
+        """
+        Arguments:
+            remote (intern.remote.local.LocalRemote): Remote of the volume.
+            path (str): Directory of the volume.
+            mode (str: "r+"): "r" for read only, "r+" to read and write.
+
+        """
+        self.remote = remote
+        self.resource = remote.get_resource(path, mode)
+        self.dtype = self.resource.data_type
+        self.channel = ChannelResource(
+            os.path.basename(self.resource.path.rstrip("/")),
+            "local",
+            "local",
+            # Channels only take the Boss' datatypes; get_dtype reports the
+            # volume's own.
+            datatype=self.dtype
+            if self.dtype in ChannelResource._valid_datatypes
+            else "",
+        )
+
+        self.num_hierarchy_levels = len(self.resource.list_res())
+        if self.num_hierarchy_levels > 1:
+            # Every level has a file, so every level is readable.
+            self.channel.downsample_status = "DOWNSAMPLED"
+            if self.resource.voxel_size(1)[2] != self.resource.voxel_size(0)[2]:
+                self.hierarchy_method = "isotropic"
+
+        extents = remote.get_extents(self.resource, 0)
+        voxel_size = self.resource.voxel_size(0)
+        self.coord_frame = CoordinateFrameResource(
+            f"CF_local_{self.channel.name}",
+            x_start=extents[0][0],
+            x_stop=extents[0][1],
+            y_start=extents[1][0],
+            y_stop=extents[1][1],
+            z_start=extents[2][0],
+            z_stop=extents[2][1],
+            x_voxel_size=voxel_size[0],
+            y_voxel_size=voxel_size[1],
+            z_voxel_size=voxel_size[2],
+            voxel_unit=self.resource.info["voxel_unit"],
+        )
+
+    def get_dtype(self, channel: ChannelResource) -> str:
+        return self.dtype
+
+    def get_cutout(
+        self,
+        channel: ChannelResource,
+        resolution: int,
+        xs: Tuple[int, int],
+        ys: Tuple[int, int],
+        zs: Tuple[int, int],
+    ):
+        return self.remote.get_cutout(self.resource, resolution, xs, ys, zs)
+
+    def create_cutout(
+        self,
+        channel: ChannelResource,
+        resolution: int,
+        xs: Tuple[int, int],
+        ys: Tuple[int, int],
+        zs: Tuple[int, int],
+        data,
+    ):
+        return self.remote.create_cutout(self.resource, resolution, xs, ys, zs, data)
+
+    def get_url(self, channel: ChannelResource) -> str:
+        return f"file://{self.resource.path}"
+
+
+def _volume_provider_from_uri(uri: str) -> Optional[VolumeProvider]:
+    """
+    Get the VolumeProvider for a URI of a volume outside bossDB.
+
+    Supports `precomputed://[file|gs|s3]://path/to/layer` (CloudVolume),
+    `dvid://http[s]://host[:port]/UUID/instance` (DVID) and
+    `local://path/to/volume` (LocalRemote).
+
+    Returns:
+        Optional[VolumeProvider]: None for bossDB URIs.
+
+    """
+    protocol, _, rest = uri.partition("://")
+    if protocol == "precomputed":
+        # Imported here so that CloudVolume stays an optional dependency.
+        from intern.remote.cv import CloudVolumeRemote
+
+        storage, _, path = rest.partition("://")
+        storage_protocols = {"file": "local", "gs": "gcp", "s3": "s3"}
+        if storage not in storage_protocols or not path:
+            raise ValueError(
+                f"Cannot parse URI {uri}: precomputed URIs must be of the form "
+                "precomputed://[file|gs|s3]://path."
+            )
+        return _CloudVolumeVolumeProvider(
+            CloudVolumeRemote({"protocol": storage_protocols[storage], "cloudpath": path})
+        )
+    if protocol == "dvid":
+        from intern.remote.dvid import DVIDRemote
+
+        scheme, _, path = rest.partition("://")
+        components = path.strip("/").split("/")
+        if scheme not in ["http", "https"] or len(components) != 3:
+            raise ValueError(
+                f"Cannot parse URI {uri}: DVID URIs must be of the form "
+                "dvid://http[s]://host/UUID/instance."
+            )
+        host, uuid, instance = components
+        return _DVIDVolumeProvider(
+            DVIDRemote({"protocol": scheme, "host": host}), uuid, instance
+        )
+    if protocol == "local":
+        from intern.remote.local import LocalRemote
+
+        return _LocalVolumeProvider(LocalRemote(), rest)
+    return None
+
 
 def _construct_boss_url(boss, col, exp, chan, res, xs, ys, zs) -> str:
     # TODO: use boss host
@@ -174,6 +588,8 @@ class array:
 
     Data are downloaded when a request is made. This means that even "simple"
     commands like `array#[:]sum()` are very network-heavy (don't do this!).
+    Use `array#reduce("sum")` instead, which streams the data block by block,
+    and `array#map_blocks` to compute a derived volume the same way.
 
     Examples:
 
@@ -257,6 +673,8 @@ class array:
         self.axis_order = axis_order
 
         # Handle custom Remote:
+        if volume_provider is None and isinstance(channel, str):
+            volume_provider = _volume_provider_from_uri(channel)
         self.volume_provider = volume_provider
         if volume_provider is None:
             if boss_config:
@@ -364,12 +782,11 @@ class array:
         # If it is set as a string, then parse the channel and generate an
         # intern.Resource from a bossDB URI.
         elif isinstance(channel, str):
-            uri = parse_bossdb_uri(channel)
-            self.resolution = (
-                uri.resolution if not (uri.resolution is None) else self.resolution
+            self._channel, uri_resolution = self.volume_provider.get_channel_from_uri(
+                channel
             )
-            self._channel = self.volume_provider.get_channel(
-                uri.channel, uri.collection, uri.experiment
+            self.resolution = (
+                uri_resolution if not (uri_resolution is None) else self.resolution
             )
         else:
             raise NotImplementedError(
@@ -382,6 +799,10 @@ class array:
         self._exp = None
         # Set empty coordframe (will be dict)
         self._coord_frame = None
+        # Set when writes are buffered (see `write_buffer`)
+        self._write_buffer = None
+        # Set when reads are cached (see `enable_cache`)
+        self._read_cache = None
 
         # Set col/exp/chan based upon the channel or URI provided.
         self.collection_name = self._channel.coll_name
@@ -395,23 +816,23 @@ class array:
 
         Will default to the dtype of the channel.
         """
-        return self._channel.datatype
+        return self.volume_provider.get_dtype(self._channel)
 
     @property
     def url(self):
         """
-        Get a pointer to this Channel on the BossDB page.
+        Get a pointer to the page describing this Channel.
         """
-        return f"{self.volume_provider.boss._project._base_protocol}://{self.volume_provider.boss._project._base_url}/v1/mgmt/resources/{self.collection_name}/{self.experiment_name}/{self.channel_name}"
+        return self.volume_provider.get_url(self._channel)
 
     @property
     def visualize(self):
         """
-        Get a pointer to this Channel on the BossDB page.
+        Get a neuroglancer link that displays this Channel.
         """
-        return "https://neuroglancer.bossdb.io/#!{'layers':{'image':{'source':'boss://__replace_me__'}}}".replace(
+        return "https://neuroglancer.bossdb.io/#!{'layers':{'image':{'source':'__replace_me__'}}}".replace(
             "__replace_me__",
-            f"{self.volume_provider.boss._project._base_protocol}://{self.volume_provider.boss._project._base_url}/{self.collection_name}/{self.experiment_name}/{self.channel_name}",
+            self.volume_provider.get_neuroglancer_source(self._channel),
         )
 
     @property
@@ -436,11 +857,11 @@ class array:
         if self.axis_order == AxisOrder.XYZ:
             return (
                 int(
-                    (self._coord_frame.y_stop - self._coord_frame.y_start)
+                    (self._coord_frame.x_stop - self._coord_frame.x_start)
                     / (2 ** self.resolution)
                 ),
                 int(
-                    (self._coord_frame.x_stop - self._coord_frame.x_start)
+                    (self._coord_frame.y_stop - self._coord_frame.y_start)
                     / (2 ** self.resolution)
                 ),
                 (self._coord_frame.z_stop - self._coord_frame.z_start),
@@ -488,6 +909,540 @@ class array:
             )
         return (vox_size, self._coord_frame.voxel_unit)
 
+    def build_pyramid(
+        self,
+        num_levels: Optional[int] = None,
+        method: Optional[str] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Downsample this channel's data into the levels above `self.resolution`.
+
+        Downsampling happens on the client, block by block, and every level
+        is uploaded as soon as it's computed, so there's no need to wait for
+        the server to downsample a newly uploaded volume. Images are averaged
+        and annotations take the most common label of each window; levels
+        halve x and y, and also z if the experiment's hierarchy method is
+        "isotropic".
+
+        Arguments:
+            num_levels (Optional[int]): Number of levels to write. Defaults to
+                the rest of the experiment's hierarchy.
+            method (Optional[str]): "mean" or "mode". Defaults to "mode" for
+                annotation channels and "mean" otherwise.
+            kwargs: Passed to `intern.utils.pyramid.build_pyramid`
+                (block_size, max_workers, progress, cancel).
+
+        Returns:
+            int: The number of blocks uploaded.
+
+        """
+        from intern.utils.pyramid import build_pyramid
+
+        self.flush()
+        region = self._extents()
+        if num_levels is None:
+            num_levels = self._exp.num_hierarchy_levels - 1 - self.resolution
+        return build_pyramid(
+            self.volume_provider,
+            self._channel,
+            self.resolution,
+            *region,
+            num_levels,
+            factor=self._exp.hierarchy_method,
+            method=method,
+            **kwargs,
+        )
+
+    def write_buffer(
+        self,
+        max_bytes: Optional[int] = None,
+        max_workers: int = 4,
+        block_size: Optional[Tuple[int, int, int]] = None,
+    ):
+        """
+        Buffer writes to this array, and upload them as whole blocks.
+
+        Until the buffer is closed, `array[...] = data` copies the data into
+        blocks aligned to the channel's chunk grid, and each block is
+        uploaded once all of its voxels have been written. Many small writes,
+        such as one z-slice at a time, turn into a few large aligned uploads.
+        Reads flush the buffer first, so they see every write.
+
+            with arr.write_buffer():
+                for z in range(arr.shape[0]):
+                    arr[z, :, :] = segment(z)
+
+        Arguments:
+            max_bytes (Optional[int]): Memory the buffered blocks may use
+                before the partly written ones are uploaded. Defaults to 512MB.
+            max_workers (int: 4): Number of blocks to upload concurrently.
+            block_size (Optional[Tuple[int, int, int]]): XYZ size of the
+                blocks. Defaults to the channel's chunk size.
+
+        Returns:
+            WriteBuffer: Closing it (or leaving its `with` block) flushes it
+                and stops buffering. `array.flush` flushes it.
+
+        """
+        from .buffer import DEFAULT_BUFFER_BYTES, WriteBuffer
+
+        if self._write_buffer is not None:
+            raise RuntimeError("Writes to this array are already buffered.")
+        chunk_size, origin = self.volume_provider.get_cutout_chunking(
+            self._channel, self.resolution
+        )
+
+        def _stop_buffering():
+            self._write_buffer = None
+
+        self._write_buffer = WriteBuffer(
+            self.volume_provider,
+            self._channel,
+            self.resolution,
+            self._extents(),
+            block_size or chunk_size,
+            origin,
+            self.dtype,
+            max_bytes=DEFAULT_BUFFER_BYTES if max_bytes is None else max_bytes,
+            max_workers=max_workers,
+            on_close=_stop_buffering,
+        )
+        return self._write_buffer
+
+    def enable_cache(
+        self,
+        max_bytes: Optional[int] = None,
+        read_ahead: Optional[str] = "auto",
+        depth: int = 2,
+        max_workers: int = 4,
+        block_size: Optional[Tuple[int, int, int]] = None,
+    ):
+        """
+        Cache reads from this array in memory, and read ahead of them.
+
+        Reads are split into blocks aligned to the channel's chunk grid, and
+        the blocks are kept in an in-memory cache. While the caller works on
+        one region, the regions it's expected to read next are downloaded
+        into the cache in the background, so the next read is served from
+        memory:
+
+            arr.enable_cache(read_ahead="auto")
+            for z in range(0, arr.shape[0], 16):
+                process(arr[z : z + 16, :, :])
+
+        With `read_ahead="auto"`, a read that continues the previous one along
+        one axis (z-slab after z-slab, or y-row after y-row) prefetches the
+        next `depth` regions along that axis. "x", "y" or "z" always read
+        ahead along that axis, and None only caches. Writes through this
+        array drop the cached blocks they overlap.
+
+        Arguments:
+            max_bytes (Optional[int]): Memory the cached blocks may use.
+                Defaults to 1GB.
+            read_ahead (Optional[str]): "auto", "x", "y", "z" or None.
+            depth (int: 2): Number of regions to read ahead.
+            max_workers (int: 4): Number of blocks downloaded concurrently.
+            block_size (Optional[Tuple[int, int, int]]): XYZ size of the
+                blocks. Defaults to the channel's chunk size.
+
+        Returns:
+            ChunkReader: Its `cache` has the `hits` and `misses` counts.
+
+        """
+        from .prefetch import DEFAULT_CACHE_BYTES, ChunkReader
+
+        self.disable_cache()
+        if self._exp is None:
+            self._populate_exp()
+        self._read_cache = ChunkReader(
+            self.volume_provider,
+            self._channel,
+            self._extents,
+            max_bytes=DEFAULT_CACHE_BYTES if max_bytes is None else max_bytes,
+            read_ahead=read_ahead,
+            depth=depth,
+            max_workers=max_workers,
+            block_size=block_size,
+        )
+        return self._read_cache
+
+    def disable_cache(self):
+        """
+        Stop caching reads, and drop the cached blocks.
+
+        """
+        if self._read_cache is not None:
+            self._read_cache.close()
+            self._read_cache = None
+
+    def reduce(
+        self,
+        op: Union[str, Callable],
+        x_range: Optional[Tuple[int, int]] = None,
+        y_range: Optional[Tuple[int, int]] = None,
+        z_range: Optional[Tuple[int, int]] = None,
+        combine: Optional[Callable] = None,
+        bins: int = 256,
+        hist_range: Optional[Tuple[float, float]] = None,
+        block_size: Optional[Tuple[int, int, int]] = None,
+        max_workers: int = 4,
+        progress: Optional[Callable] = None,
+        cancel=None,
+    ):
+        """
+        Reduce the array (or a region of it), one block at a time.
+
+        Blocks aligned to the channel's chunk grid are downloaded and reduced
+        on a thread pool, and only the blocks in flight are ever in memory,
+        so `arr.reduce("sum")` is the streaming version of `arr[:].sum()`.
+
+        Arguments:
+            op (Union[str, Callable]): "sum", "min", "max", "mean" or
+                "histogram"; or a function called with each block (in the
+                array's axis order) whose results are folded with `combine`.
+            x_range, y_range, z_range (Optional[Tuple[int, int]]): Region to
+                reduce, in voxels. Defaults to the whole array.
+            combine (Optional[Callable]): Combines two results of `op`, when
+                `op` is a function.
+            bins (int: 256): Number of bins of a histogram.
+            hist_range (Optional[Tuple[float, float]]): Value range of a
+                histogram. Defaults to the whole range of 8 and 16 bit types.
+            block_size (Optional[Tuple[int, int, int]]): XYZ size of the
+                blocks. Defaults to a multiple of the channel's chunk size.
+            max_workers (int: 4): Number of blocks reduced concurrently.
+            progress (Optional[Callable]): Called with an
+                intern.utils.progress.Progress after each block.
+            cancel (Optional[CancellationToken]): Stops the reduction before
+                its next block, raising TransferCancelled.
+
+        Returns:
+            The reduction. Histograms are (counts, bin_edges), as returned
+                by `numpy.histogram`.
+
+        """
+        from functools import reduce as _fold
+        from .blocks import (
+            combine_partials,
+            histogram_range,
+            reduce_partial,
+            run_blocks,
+        )
+
+        if callable(op) and combine is None:
+            raise ValueError("A `combine` function is needed to reduce with a function.")
+        if op == "histogram":
+            hist_range = histogram_range(self.dtype, hist_range)
+
+        def _reduce(block):
+            data = self._read_block(block)
+            if callable(op):
+                return op(data)
+            return reduce_partial(op, data, bins=bins, hist_range=hist_range)
+
+        partials = run_blocks(
+            _reduce,
+            self._plan_blocks(x_range, y_range, z_range, block_size),
+            max_workers=max_workers,
+            progress=progress,
+            cancel=cancel,
+        )
+        if callable(op):
+            return _fold(combine, partials)
+        return combine_partials(op, partials)
+
+    def map_blocks(
+        self,
+        fn: Callable,
+        out: Optional["array"] = None,
+        halo: Union[int, Tuple[int, int, int]] = 0,
+        x_range: Optional[Tuple[int, int]] = None,
+        y_range: Optional[Tuple[int, int]] = None,
+        z_range: Optional[Tuple[int, int]] = None,
+        block_size: Optional[Tuple[int, int, int]] = None,
+        max_workers: int = 4,
+        progress: Optional[Callable] = None,
+        cancel=None,
+    ):
+        """
+        Apply a function to the array (or a region of it), one block at a time.
+
+        Blocks aligned to the channel's chunk grid are downloaded, passed to
+        `fn` and written out on a thread pool; only the blocks in flight are
+        in memory. With a halo, each block is read with that many extra voxels
+        on every side (clipped to the region), for filters that need context,
+        and the halo is trimmed from the result.
+
+            smoothed = intern.array("bossdb://col/exp/smoothed", ...)
+            arr.map_blocks(lambda b: gaussian_filter(b, 2), out=smoothed, halo=8)
+
+        Arguments:
+            fn (Callable): Called with each block, in the array's axis order.
+                Returns an array of the same shape, with or without the halo.
+            out (Optional[array]): Array to write the results to, at the same
+                coordinates. Its write buffer is used if it has one.
+            halo (Union[int, Tuple[int, int, int]]): Voxels of context around
+                each block, or an XYZ tuple of them.
+            x_range, y_range, z_range (Optional[Tuple[int, int]]): Region to
+                process, in voxels. Defaults to the whole array.
+            block_size (Optional[Tuple[int, int, int]]): XYZ size of the
+                blocks, without the halo. Defaults to a multiple of the
+                channel's chunk size.
+            max_workers (int: 4): Number of blocks processed concurrently.
+            progress (Optional[Callable]): Called with an
+                intern.utils.progress.Progress after each block.
+            cancel (Optional[CancellationToken]): Stops before the next
+                block, raising TransferCancelled.
+
+        Returns:
+            Optional[np.ndarray]: Without `out`, the results of the whole
+                region in the array's axis order (so the region must fit in
+                memory); None otherwise.
+
+        """
+        from .blocks import run_blocks
+
+        if isinstance(halo, int):
+            halo = (halo, halo, halo)
+        blocks = self._plan_blocks(x_range, y_range, z_range, block_size)
+        region = [
+            [min(b[i][0] for b in blocks), max(b[i][1] for b in blocks)]
+            for i in range(3)
+        ]
+
+        def _map(block):
+            # Read the block with its halo, clipped to the region:
+            read = [
+                (max(b[0] - h, r[0]), min(b[1] + h, r[1]))
+                for b, h, r in zip(block, halo, region)
+            ]
+            result = np.asarray(fn(self._read_block(read)))
+            if self.axis_order == AxisOrder.XYZ:
+                result = result.T
+            core = tuple(b[1] - b[0] for b in block)[::-1]
+            if result.shape != core:
+                if result.shape != tuple(r[1] - r[0] for r in read)[::-1]:
+                    raise ValueError(
+                        f"map_blocks function returned shape {result.shape} "
+                        f"for a block of shape {core}."
+                    )
+                result = result[
+                    tuple(
+                        slice(b[0] - r[0], b[1] - r[0]) for b, r in zip(block, read)
+                    )[::-1]
+                ]
+            if out is not None:
+                out._write_zyx(block[0], block[1], block[2], result)
+                return None
+            return block, result
+
+        if out is not None:
+            for _ in run_blocks(
+                _map, blocks, max_workers=max_workers, progress=progress, cancel=cancel
+            ):
+                pass
+            return None
+
+        output = None
+        for block, result in run_blocks(
+            _map, blocks, max_workers=max_workers, progress=progress, cancel=cancel
+        ):
+            if output is None:
+                shape = tuple(r[1] - r[0] for r in region)[::-1]
+                output = np.empty(shape, dtype=result.dtype)
+            output[
+                tuple(slice(b[0] - r[0], b[1] - r[0]) for b, r in zip(block, region))[
+                    ::-1
+                ]
+            ] = result
+        if self.axis_order == AxisOrder.XYZ and output is not None:
+            output = output.T
+        return output
+
+    def sample(
+        self,
+        points,
+        block_size: Optional[Tuple[int, int, int]] = None,
+        max_workers: int = 4,
+        progress: Optional[Callable] = None,
+        cancel=None,
+    ) -> np.ndarray:
+        """
+        Get the values of the array at many scattered voxels.
+
+        The points are grouped by the chunk-aligned block that contains
+        them, only those blocks are downloaded (a few at a time), and the
+        values are gathered from each block with one fancy-indexing step.
+        With `enable_cache`, the blocks are read through the cache.
+
+            values = arr.sample(synapse_centroids)
+
+        Arguments:
+            points (array-like): An (N, 3) array of integer voxel
+                coordinates, in the array's axis order.
+            block_size (Optional[Tuple[int, int, int]]): XYZ size of the
+                blocks. Defaults to the channel's chunk size, or to the
+                cache's block size when reads are cached.
+            max_workers (int: 4): Number of blocks downloaded concurrently.
+            progress (Optional[Callable]): Called with an
+                intern.utils.progress.Progress after each block.
+            cancel (Optional[CancellationToken]): Stops before the next
+                block, raising TransferCancelled.
+
+        Returns:
+            np.ndarray: The N values, in the order of the points.
+
+        Raises:
+            ValueError if `points` is not (N, 3) or a point is outside the
+                array.
+
+        """
+        from .blocks import run_blocks
+
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"points must have shape (N, 3), not {points.shape}.")
+        points = points.astype(np.int64)
+        if self.axis_order == AxisOrder.ZYX:
+            points = points[:, ::-1]
+
+        extents = self._extents()
+        lower = np.array([ext[0] for ext in extents])
+        upper = np.array([ext[1] for ext in extents])
+        if ((points < lower) | (points >= upper)).any():
+            raise ValueError("Some points are outside the array.")
+
+        # Buffered writes are uploaded first, so that they are read back.
+        self.flush()
+        reader = self._read_cache
+        if reader is not None:
+            grid_size, origin = reader.grid(self.resolution)
+        else:
+            chunk_size, origin = self.volume_provider.get_cutout_chunking(
+                self._channel, self.resolution
+            )
+            grid_size = block_size or chunk_size
+        grid_size = np.array(grid_size)
+        origin = np.array(origin)
+
+        # Sort the points by block, so that each block's points are a run.
+        indices = (points - origin) // grid_size
+        keys, inverse = np.unique(indices, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(inverse))))
+
+        def _sample(i):
+            start = np.maximum(origin + keys[i] * grid_size, lower)
+            stop = np.minimum(origin + (keys[i] + 1) * grid_size, upper)
+            box = tuple((int(a), int(b)) for a, b in zip(start, stop))
+            if reader is not None:
+                data = reader.cache.get(self.resolution, box)
+            else:
+                data = np.reshape(
+                    self.volume_provider.get_cutout(
+                        self._channel, self.resolution, *box
+                    ),
+                    tuple(stop - start)[::-1],
+                )
+            local = points[order[bounds[i] : bounds[i + 1]]] - start
+            return data[local[:, 2], local[:, 1], local[:, 0]]
+
+        values = np.empty(len(points), dtype=self.dtype)
+        for i, block_values in enumerate(
+            run_blocks(_sample, range(len(keys)), max_workers, progress, cancel)
+        ):
+            values[order[bounds[i] : bounds[i + 1]]] = block_values
+        return values
+
+    def _plan_blocks(self, x_range, y_range, z_range, block_size):
+        """
+        Split a region of the array into blocks aligned to the chunk grid.
+
+        """
+        from .blocks import plan_blocks
+
+        # Buffered writes are uploaded first, so that they are read back.
+        self.flush()
+        extents = self._extents()
+        region = [
+            list(rng) if rng is not None else ext
+            for rng, ext in zip((x_range, y_range, z_range), extents)
+        ]
+        return plan_blocks(
+            region,
+            self.volume_provider.get_cutout_chunking(self._channel, self.resolution),
+            block_size,
+        )
+
+    def _read_block(self, block):
+        """
+        Read the XYZ ranges of a block, in the array's axis order.
+
+        """
+        xs, ys, zs = block
+        cutout = self.volume_provider.get_cutout(
+            self._channel, self.resolution, xs, ys, zs
+        )
+        data = np.reshape(cutout, tuple(r[1] - r[0] for r in block)[::-1])
+        if self.axis_order == AxisOrder.XYZ:
+            data = data.T
+        return data
+
+    def _read_zyx(self, resolution, xs, ys, zs):
+        """
+        Read a region in ZYX order, through the read cache if there is one.
+
+        """
+        if self._read_cache is not None:
+            return self._read_cache.read(resolution, xs, ys, zs)
+        return self.volume_provider.get_cutout(
+            self._channel, resolution, xs, ys, zs
+        )
+
+    def _write_zyx(self, xs, ys, zs, data):
+        """
+        Write ZYX data to a region, through the write buffer if there is one.
+
+        """
+        if self._read_cache is not None:
+            self._read_cache.invalidate(self.resolution, xs, ys, zs)
+        if self._write_buffer is not None:
+            self._write_buffer.write(xs, ys, zs, data)
+            return
+        self.volume_provider.create_cutout(
+            self._channel, self.resolution, xs, ys, zs, data
+        )
+
+    def flush(self):
+        """
+        Upload the writes held by this array's write buffer, if it has one.
+
+        """
+        if self._write_buffer is not None:
+            self._write_buffer.flush()
+
+    def _extents(self, resolution: Optional[int] = None):
+        """
+        Get the XYZ ranges of the array at a resolution, by default its own.
+
+        """
+        from intern.utils.pyramid import HIERARCHY_FACTORS, pyramid_regions
+
+        if self._exp is None:
+            self._populate_exp()
+        if self._coord_frame is None:
+            self._populate_coord_frame()
+
+        cf = self._coord_frame
+        return pyramid_regions(
+            [cf.x_start, cf.x_stop],
+            [cf.y_start, cf.y_stop],
+            [cf.z_start, cf.z_stop],
+            self.resolution if resolution is None else resolution,
+            HIERARCHY_FACTORS[self._exp.hierarchy_method],
+        )[-1]
+
     def _populate_exp(self):
         """
         Populate the experiment component of this array.
@@ -512,14 +1467,21 @@ class array:
         """
         Get a subarray or subvolume.
 
-        Uses one of two indexing methods:
+        Uses one of three indexing methods:
             1. Start/Stop (`int:int`)
-            2. Single index (`int`)
+            2. Start/Stop/Step (`int:int:int`)
+            3. Single index (`int`)
 
-        Each element of the key can be one of those two options. For example,
+        Each element of the key can be one of those options. For example,
 
             myarray[1, 1:100, 2]
 
+        Strided slices such as `myarray[10, ::4, ::4]` are read from the
+        coarsest downsampled level whose voxels line up with the step and
+        start (for example resolution 2 for a step of 4 in x and y), then
+        subsampled, so previews download far fewer voxels. Those voxels
+        are the downsampled values rather than every 4th voxel.
+
         """
         # If the user has requested XYZ mode, the first thing to do is reverse
         # the array indices. Then you can continue this fn without any
@@ -541,6 +1503,11 @@ class array:
         if self._coord_frame is None:
             self._populate_coord_frame()
 
+        # Bounds of the array in ZYX order, to fill in open-ended slices:
+        zyx_extents = self._extents()[::-1]
+        # Steps of the key, in XYZ order:
+        steps = [1, 1, 1]
+
         # Now we can begin. There is a wide variety of indexing options
         # available, including single-integer indexing, tuple-of-slices
         # indexing, tuple-of-int indexing...
@@ -554,8 +1521,8 @@ class array:
         # We will get the full XY extents and download a single 2D array:
         if isinstance(key, int):
             # Get the full Z slice:
-            xs = (0, self.shape[2])
-            ys = (0, self.shape[1])
+            xs = tuple(zyx_extents[2])
+            ys = tuple(zyx_extents[1])
             zs = (key, key + 1)
         else:
             # We also support indexing with units. For example, you can ask for
@@ -589,11 +1556,12 @@ class array:
                 # If the key is a Slice, then it has .start and .stop attrs.
                 # (The user is requesting an array with more than one slice
                 # in this dimension.)
-                start = key[2].start if key[2].start else 0
-                stop = key[2].stop if key[2].stop else self.shape[0]
+                start = key[2].start
+                stop = key[2].stop
+                steps[0] = key[2].step or 1
 
-                start = int(start / _normalize_units[0])
-                stop = int(stop / _normalize_units[0])
+                start = zyx_extents[2][0] if start is None else start / _normalize_units[0]
+                stop = zyx_extents[2][1] if stop is None else stop / _normalize_units[0]
 
                 # Cast the coords to integers (since Boss needs int coords)
                 xs = (int(start), int(stop))
@@ -603,11 +1571,12 @@ class array:
             if isinstance(key[1], int):
                 ys = (key[1], key[1] + 1)
             else:
-                start = key[1].start if key[1].start else 0
-                stop = key[1].stop if key[1].stop else self.shape[1]
+                start = key[1].start
+                stop = key[1].stop
+                steps[1] = key[1].step or 1
 
-                start = start / _normalize_units[1]
-                stop = stop / _normalize_units[1]
+                start = zyx_extents[1][0] if start is None else start / _normalize_units[1]
+                stop = zyx_extents[1][1] if stop is None else stop / _normalize_units[1]
 
                 ys = (int(start), int(stop))
 
@@ -616,23 +1585,34 @@ class array:
             if isinstance(key[0], int):
                 zs = (key[0], key[0] + 1)
             else:
-                start = key[0].start if key[0].start else 0
-                stop = key[0].stop if key[0].stop else self.shape[2]
+                start = key[0].start
+                stop = key[0].stop
+                steps[2] = key[0].step or 1
 
-                start = start / _normalize_units[2]
-                stop = stop / _normalize_units[2]
+                start = zyx_extents[0][0] if start is None else start / _normalize_units[2]
+                stop = zyx_extents[0][1] if stop is None else stop / _normalize_units[2]
 
                 zs = (int(start), int(stop))
 
-        # Finally, we can perform the cutout itself, using the x, y, and z
-        # coordinates that we computed in the previous step.
-        cutout = self.volume_provider.get_cutout(
-            self._channel, self.resolution, xs, ys, zs
+        # Strided slices are read from the coarsest level that lines up with
+        # them, and the remaining steps are taken from the downloaded data.
+        # Steps are in voxels, even when the key is in units.
+        resolution, (xs, ys, zs), steps = self._strided_read(
+            (xs, ys, zs), steps
         )
 
-        # Data are returned in ZYX order:
+        # Finally, we can perform the cutout itself, using the x, y, and z
+        # coordinates that we computed in the previous step. Buffered writes
+        # are uploaded first, so that they are read back.
+        self.flush()
+        cutout = self._read_zyx(resolution, xs, ys, zs)
+        if steps != [1, 1, 1]:
+            cutout = cutout[:: steps[2], :: steps[1], :: steps[0]]
+
+        # Data are returned in ZYX order. XYZ is the reverse of ZYX, so a
+        # transposed view is enough (no data are copied):
         if self.axis_order == AxisOrder.XYZ:
-            data = np.rollaxis(np.rollaxis(cutout, 1), 2)
+            data = cutout.T
         elif self.axis_order == AxisOrder.ZYX:
             data = cutout
 
@@ -649,6 +1629,55 @@ class array:
             data = data[:, :, 0]
         return data
 
+    def _strided_read(self, region, steps):
+        """
+        Pick the level to read a strided region from.
+
+        A level `n` above `self.resolution` serves an axis when the axis'
+        step and start are multiples of the level's downsampling factor
+        along it, so that the level's voxels are the ones requested.
+
+        Arguments:
+            region (list[Tuple[int, int]]): XYZ ranges at `self.resolution`.
+            steps (list[int]): XYZ steps.
+
+        Returns:
+            Tuple[int, list, list[int]]: The resolution to read, the XYZ
+                ranges to read from it, and the XYZ steps left to take.
+
+        """
+        from intern.utils.pyramid import HIERARCHY_FACTORS
+
+        if any(step < 1 for step in steps):
+            raise ValueError("Only positive slice steps are supported.")
+        if steps == [1, 1, 1]:
+            return self.resolution, list(region), steps
+
+        factor = HIERARCHY_FACTORS.get(self._exp.hierarchy_method, (1, 1, 1))
+        levels = 0
+        # Levels only exist once the channel has been downsampled.
+        if self._channel.downsample_status == "DOWNSAMPLED":
+            levels = self._exp.num_hierarchy_levels - 1 - self.resolution
+
+        level = 0
+        while level < levels:
+            scale = [f ** (level + 1) for f in factor]
+            if any(
+                (step % sc or rng[0] % sc) and sc > 1
+                for step, rng, sc in zip(steps, region, scale)
+            ):
+                break
+            level += 1
+
+        scale = [f ** level for f in factor]
+        steps = [step // sc for step, sc in zip(steps, scale)]
+        read = []
+        for (start, stop), step, sc in zip(region, steps, scale):
+            count = max(0, -(-(stop - start) // (step * sc)))
+            start = start // sc
+            read.append((start, start + max(1, (count - 1) * step + 1)))
+        return self.resolution + level, read, steps
+
     def __setitem__(self, key: Tuple, value: np.array) -> np.array:
         """
         Set a subarray or subvolume.
@@ -661,7 +1690,7 @@ class array:
 
             myarray[1, 1:100, 2]
 
-        Start-only (`10:`) or stop-only (`:10`) indexing is unsupported.
+        Open-ended slices (`10:`, `:10` or `:`) extend to the array's bounds.
         """
 
         if self.axis_order == AxisOrder.XYZ:
@@ -675,6 +1704,9 @@ class array:
         if self._coord_frame is None:
             self._populate_coord_frame()
 
+        # Bounds of the array in ZYX order, to fill in open-ended slices:
+        zyx_extents = self._extents()[::-1]
+
         _normalize_units = (1, 1, 1)
         if isinstance(key[-1], str) and len(key) == 4:
             if key[-1] != self._coord_frame.voxel_unit:
@@ -687,43 +1719,56 @@ class array:
         if isinstance(key[2], int):
             xs = (key[2], key[2] + 1)
         else:
-            start = key[2].start if key[2].start else 0
-            stop = key[2].stop if key[2].stop else self.shape[0]
+            start = key[2].start
+            stop = key[2].stop
 
-            start = start / _normalize_units[0]
-            stop = stop / _normalize_units[0]
+            start = zyx_extents[2][0] if start is None else start / _normalize_units[0]
+            stop = zyx_extents[2][1] if stop is None else stop / _normalize_units[0]
 
             xs = (int(start), int(stop))
 
         if isinstance(key[1], int):
             ys = (key[1], key[1] + 1)
         else:
-            start = key[1].start if key[1].start else 0
-            stop = key[1].stop if key[1].stop else self.shape[1]
+            start = key[1].start
+            stop = key[1].stop
 
-            start = start / _normalize_units[1]
-            stop = stop / _normalize_units[1]
+            start = zyx_extents[1][0] if start is None else start / _normalize_units[1]
+            stop = zyx_extents[1][1] if stop is None else stop / _normalize_units[1]
 
             ys = (int(start), int(stop))
 
         if isinstance(key[0], int):
             zs = (key[0], key[0] + 1)
         else:
-            start = key[0].start if key[0].start else 0
-            stop = key[0].stop if key[0].stop else self.shape[2]
+            start = key[0].start
+            stop = key[0].stop
 
-            start = start / _normalize_units[2]
-            stop = stop / _normalize_units[2]
+            start = zyx_extents[0][0] if start is None else start / _normalize_units[2]
+            stop = zyx_extents[0][1] if stop is None else stop / _normalize_units[2]
 
             zs = (int(start), int(stop))
 
-        if len(value.shape) == 2:
-            # TODO: Support other 2D shapes as well
-            value = np.array([value])
+        # Single indices drop their axis from the value: put those axes back,
+        # in the array's axis order (the key is in ZYX order by now).
+        int_axes = [i for i in range(3) if isinstance(key[i], int)]
+        if self.axis_order == AxisOrder.XYZ:
+            int_axes = sorted(2 - i for i in int_axes)
+        if len(value.shape) == 3 - len(int_axes):
+            for axis in int_axes:
+                value = np.expand_dims(value, axis)
+        elif len(value.shape) == 2:
+            if self.axis_order == AxisOrder.XYZ:
+                value = value[:, :, np.newaxis]
+            else:
+                value = value[np.newaxis, :, :]
 
-        cutout = self.volume_provider.create_cutout(
-            self._channel, self.resolution, xs, ys, zs, value
-        )
+        # The volume provider expects ZYX data. Pass a transposed view rather
+        # than a copy; the upload path makes each chunk contiguous as it goes.
+        if self.axis_order == AxisOrder.XYZ:
+            value = value.T
+
+        self._write_zyx(xs, ys, zs, value)
 
 
 def arrays_from_neuroglancer(url: str):
@@ -742,14 +1787,13 @@ def arrays_from_neuroglancer(url: str):
 
     arrays = {}
     for source in ngl_state["layers"]:
-        source_url = ""
-        if "boss://" in source["source"]:
-            source_url = source["source"]
-        elif (
-            isinstance(source["source"], dict) and "boss://" in source["source"]["url"]
-        ):
-            source_url = source["source"]["url"]
-        else:
+        source_url = source["source"]
+        if isinstance(source_url, dict):
+            source_url = source_url["url"]
+        if source_url.startswith(("precomputed://", "dvid://")):
+            arrays[source["name"]] = array(source_url)
+            continue
+        if "boss://" not in source_url:
             continue
         remote, channel = parse_fquri(source_url)
         arrays[source["name"]] = array(
@@ -0,0 +1,180 @@
+"""
+Copyright 2020 The Johns Hopkins University Applied Physics Laboratory.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Standard imports
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+# Pip-installable imports
+import numpy as np
+
+from intern.utils.parallel import block_compute
+from intern.utils.progress import ProgressTracker
+from intern.utils.transfer import transfer_block_size
+
+# Reductions understood by `array.reduce`.
+REDUCTIONS = ("sum", "min", "max", "mean", "histogram")
+
+
+def plan_blocks(region, chunking, block_size=None):
+    """
+    Split a region into blocks aligned to a chunk grid.
+
+    Arguments:
+        region (list[list[int]]): XYZ ranges of the region.
+        chunking (tuple): (chunk_size, origin) of the grid, in XYZ order.
+        block_size (Optional[Tuple[int, int, int]]): XYZ size of the blocks.
+            Defaults to a multiple of the chunk size.
+
+    Returns:
+        list: XYZ ranges of each block.
+
+    """
+    chunk_size, origin = chunking
+    return block_compute(
+        region[0][0], region[0][1],
+        region[1][0], region[1][1],
+        region[2][0], region[2][1],
+        origin=origin,
+        block_size=block_size or transfer_block_size(chunk_size),
+    )
+
+
+def run_blocks(
+    fn: Callable,
+    blocks: Iterable,
+    max_workers: int = 4,
+    progress: Optional[Callable] = None,
+    cancel=None,
+):
+    """
+    Call `fn(block)` for every block on a thread pool, yielding the results
+    in block order.
+
+    At most `max_workers` blocks are in flight, so the memory used is bounded
+    by the size of the blocks rather than the size of the region. Numpy
+    releases the GIL, so the computations of the blocks run on all cores
+    while the next blocks download.
+
+    Arguments:
+        fn (Callable): Called with the XYZ ranges of each block.
+        blocks (Iterable): XYZ ranges of each block.
+        max_workers (int: 4): Number of blocks processed concurrently.
+        progress (Optional[Callable]): Called with an intern.utils.progress.Progress
+            after each block.
+        cancel (Optional[intern.utils.progress.CancellationToken]): Stops
+            before the next block, raising TransferCancelled.
+
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be greater than 0.")
+    blocks = list(blocks)
+    tracker = ProgressTracker(len(blocks), None, progress)
+
+    def _run(block):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        return fn(block)
+
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for block in blocks:
+                if len(in_flight) >= max_workers:
+                    yield _finish(in_flight.popleft(), tracker)
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                in_flight.append(executor.submit(_run, block))
+            while in_flight:
+                yield _finish(in_flight.popleft(), tracker)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def _finish(future, tracker):
+    result = future.result()
+    tracker.update(getattr(result, "nbytes", 0))
+    return result
+
+
+def accumulator_dtype(dtype):
+    """
+    Get a datatype that sums values of `dtype` without overflowing.
+
+    """
+    if np.issubdtype(dtype, np.unsignedinteger):
+        return np.uint64
+    if np.issubdtype(dtype, np.integer):
+        return np.int64
+    return np.float64
+
+
+def histogram_range(dtype, hist_range=None):
+    """
+    Get the value range of a histogram, so that every block shares its bins.
+
+    Raises:
+        ValueError if there is no range and the datatype is too wide to
+            default to its full range.
+
+    """
+    if hist_range is not None:
+        return hist_range
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer) and dtype.itemsize <= 2:
+        info = np.iinfo(dtype)
+        return (info.min, info.max + 1)
+    raise ValueError(f"Histograms of {dtype} data need a hist_range.")
+
+
+def reduce_partial(op: str, data, bins=None, hist_range=None):
+    """
+    Reduce one block.
+
+    Returns:
+        The partial result of the block, to combine with `combine_partials`.
+
+    """
+    if op in ("sum", "mean"):
+        return data.sum(dtype=accumulator_dtype(data.dtype)), data.size
+    if op == "min":
+        return data.min()
+    if op == "max":
+        return data.max()
+    if op == "histogram":
+        return np.histogram(data, bins=bins, range=hist_range)
+    raise ValueError(f"op must be one of {', '.join(REDUCTIONS)} or a callable, not {op}.")
+
+
+def combine_partials(op: str, partials):
+    """
+    Combine the partial results of every block.
+
+    """
+    partials = list(partials)
+    if op == "sum":
+        return sum(p[0] for p in partials)
+    if op == "mean":
+        return sum(float(p[0]) for p in partials) / sum(p[1] for p in partials)
+    if op == "min":
+        return min(partials)
+    if op == "max":
+        return max(partials)
+    if op == "histogram":
+        return sum(p[0] for p in partials), partials[0][1]
+    raise ValueError(f"op must be one of {', '.join(REDUCTIONS)} or a callable, not {op}.")
@@ -0,0 +1,280 @@
+"""
+Copyright 2020 The Johns Hopkins University Applied Physics Laboratory.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Standard imports
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Optional, Tuple
+import threading
+
+# Pip-installable imports
+import numpy as np
+
+# Default limit on the memory held by the blocks of a WriteBuffer.
+DEFAULT_BUFFER_BYTES = 512 * 1024 * 1024
+
+
+class _Block:
+    """
+    One block of a WriteBuffer: its ZYX data, and which voxels were written.
+
+    """
+
+    def __init__(self, box, dtype):
+        self.box = box
+        shape = tuple(stop - start for start, stop in box)[::-1]
+        self.data = np.zeros(shape, dtype=dtype)
+        self.written = np.zeros(shape, dtype=bool)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.written.nbytes
+
+
+class WriteBuffer:
+    """
+    A write-back buffer that combines small writes into whole blocks.
+
+    Writes are copied into blocks aligned to the channel's chunk grid. A
+    block is uploaded as soon as every voxel of it has been written, so a
+    volume written one slice at a time is uploaded as whole cuboids, several
+    at a time. `flush` uploads the blocks that are only partly written: a
+    block whose written voxels form a box is uploaded as that box, and any
+    other block is merged with the data already stored before it's uploaded.
+
+    Use it from `intern.array.write_buffer`, as a context manager:
+
+        with arr.write_buffer():
+            for z, slab in enumerate(slabs):
+                arr[z, :, :] = slab
+
+    Upload errors are raised by the next write, or by `flush`.
+
+    """
+
+    def __init__(
+        self,
+        volume_provider,
+        channel,
+        resolution: int,
+        extents,
+        block_size: Tuple[int, int, int],
+        origin: Tuple[int, int, int],
+        dtype: str,
+        max_bytes: int = DEFAULT_BUFFER_BYTES,
+        max_workers: int = 4,
+        on_close: Optional[Callable] = None,
+    ):
+        """
+        Arguments:
+            volume_provider (VolumeProvider): Provider to upload with.
+            channel (ChannelResource): Channel to write to.
+            resolution (int): Resolution to write to.
+            extents (list[list[int]]): XYZ ranges of the channel at that
+                resolution. Blocks are clipped to them.
+            block_size (Tuple[int, int, int]): XYZ size of the blocks.
+            origin (Tuple[int, int, int]): XYZ origin of the block grid.
+            dtype (str): Datatype of the channel.
+            max_bytes (int): Memory the buffered blocks may use before the
+                partly written ones are flushed.
+            max_workers (int: 4): Number of blocks to upload concurrently.
+            on_close (Optional[Callable]): Called when the buffer is closed.
+
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0.")
+        self.volume_provider = volume_provider
+        self.channel = channel
+        self.resolution = resolution
+        self.extents = [list(rng) for rng in extents]
+        self.block_size = tuple(block_size)
+        self.origin = tuple(origin)
+        self.dtype = dtype
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self._on_close = on_close
+
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._uploads = deque()
+        # The latest upload of each block, which the next one waits for.
+        self._latest = {}
+        self.blocks_uploaded = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def bytes_buffered(self) -> int:
+        with self._lock:
+            return sum(block.nbytes for block in self._blocks.values())
+
+    def write(self, xs, ys, zs, data):
+        """
+        Buffer a write of ZYX data to a region.
+
+        Regions outside the extents are not buffered, and are passed straight
+        to the volume provider.
+
+        """
+        region = (xs, ys, zs)
+        expected = tuple(rng[1] - rng[0] for rng in region)[::-1]
+        if tuple(data.shape) != expected:
+            raise ValueError(
+                f"data has shape {tuple(data.shape)}, expected {expected} for the region."
+            )
+        self._collect(block=False)
+        if any(
+            rng[0] < ext[0] or rng[1] > ext[1]
+            for rng, ext in zip(region, self.extents)
+        ):
+            self.volume_provider.create_cutout(
+                self.channel, self.resolution, xs, ys, zs, data
+            )
+            return
+
+        full = []
+        with self._lock:
+            for key in self._keys(region):
+                block = self._blocks.get(key)
+                if block is None:
+                    block = self._blocks[key] = _Block(self._box(key), self.dtype)
+                # The part of the write that falls in this block:
+                overlap = [
+                    (max(r[0], b[0]), min(r[1], b[1])) for r, b in zip(region, block.box)
+                ]
+                in_block = tuple(
+                    slice(o[0] - b[0], o[1] - b[0]) for o, b in zip(overlap, block.box)
+                )[::-1]
+                in_data = tuple(
+                    slice(o[0] - r[0], o[1] - r[0]) for o, r in zip(overlap, region)
+                )[::-1]
+                block.data[in_block] = data[in_data]
+                block.written[in_block] = True
+                if block.written.all():
+                    full.append(self._blocks.pop(key))
+            buffered = sum(block.nbytes for block in self._blocks.values())
+
+        for block in full:
+            self._submit(block.box, block.data)
+        if buffered > self.max_bytes:
+            self._flush_partial()
+
+    def flush(self):
+        """
+        Upload every buffered block, and wait for all uploads to finish.
+
+        """
+        self._flush_partial()
+        self._collect(block=True)
+
+    def close(self):
+        """
+        Flush the buffer, and stop buffering.
+
+        """
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            if self._on_close is not None:
+                self._on_close()
+
+    def _keys(self, region):
+        """Grid indices of the blocks that a region touches."""
+        ranges = [
+            range((rng[0] - o) // b, (rng[1] - 1 - o) // b + 1)
+            for rng, o, b in zip(region, self.origin, self.block_size)
+        ]
+        return [(i, j, k) for i in ranges[0] for j in ranges[1] for k in ranges[2]]
+
+    def _box(self, key):
+        """XYZ ranges of a block, clipped to the extents."""
+        return tuple(
+            (max(o + i * b, ext[0]), min(o + (i + 1) * b, ext[1]))
+            for i, o, b, ext in zip(key, self.origin, self.block_size, self.extents)
+        )
+
+    def _flush_partial(self):
+        with self._lock:
+            blocks = list(self._blocks.values())
+            self._blocks = {}
+        for block in blocks:
+            self._submit_partial(block)
+
+    def _submit_partial(self, block: _Block):
+        # Upload just the written box if there is one, to avoid a download.
+        nonzero = [np.flatnonzero(block.written.any(axis=axes)) for axes in ((1, 2), (0, 2), (0, 1))]
+        bounds = [(int(n[0]), int(n[-1]) + 1) for n in nonzero]
+        index = tuple(slice(*b) for b in bounds)
+        box = tuple(
+            (start + b[0], start + b[1])
+            for (start, _), b in zip(block.box, bounds[::-1])
+        )
+        if block.written[index].all():
+            self._submit(box, block.data[index])
+        else:
+            self._submit(block.box, block.data, block.written)
+
+    def _submit(self, box, data, written=None):
+        # Keep a bounded window of uploads in flight, so that uploaded blocks
+        # are released as the writer goes.
+        while len(self._uploads) >= 2 * self.max_workers:
+            self._uploads.popleft().result()
+        # Uploads of the same block are chained in the order they were
+        # submitted, so that a newer write is never overwritten by an older
+        # one, and a merge never reads data that is about to change. An
+        # earlier upload is always ahead in the pool's queue, so waiting on
+        # it can't deadlock.
+        key = self._keys(box)[0]
+        with self._lock:
+            previous = self._latest.get(key)
+            future = self._executor.submit(self._upload, box, data, written, previous)
+            self._latest[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        self._uploads.append(future)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._latest.get(key) is future:
+                del self._latest[key]
+
+    def _upload(self, box, data, written, previous=None):
+        if previous is not None:
+            # Its errors are raised by its own future.
+            wait([previous])
+        xs, ys, zs = box
+        if written is not None:
+            stored = np.asarray(
+                self.volume_provider.get_cutout(
+                    self.channel, self.resolution, xs, ys, zs
+                )
+            ).reshape(data.shape)
+            data = np.where(written, data, stored)
+        self.volume_provider.create_cutout(
+            self.channel, self.resolution, xs, ys, zs, np.ascontiguousarray(data)
+        )
+        with self._lock:
+            self.blocks_uploaded += 1
+
+    def _collect(self, block: bool):
+        """Raise the errors of finished uploads; with block, wait for all of them."""
+        while self._uploads and (block or self._uploads[0].done()):
+            self._uploads.popleft().result()
@@ -0,0 +1,332 @@
+"""
+Copyright 2020 The Johns Hopkins University Applied Physics Laboratory.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Standard imports
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+import threading
+
+# Pip-installable imports
+import numpy as np
+
+# Default limit on the memory held by a ChunkCache.
+DEFAULT_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Axes that reads can be hinted to advance along, and their XYZ index.
+READ_AHEAD_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+class ChunkCache:
+    """
+    A least-recently-used cache of blocks, filled on a thread pool.
+
+    Entries are futures, so a block that is being prefetched is waited for
+    rather than downloaded twice. Finished blocks are evicted, oldest first,
+    once they hold more than `max_bytes`.
+
+    """
+
+    def __init__(self, fetch: Callable, max_bytes: int, max_workers: int = 4):
+        """
+        Arguments:
+            fetch (Callable): Called as `fetch(resolution, box)` with the XYZ
+                ranges of a block; returns its ZYX data.
+            max_bytes (int): Memory the finished blocks may use.
+            max_workers (int: 4): Number of blocks downloaded concurrently.
+
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0.")
+        self._fetch = fetch
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, resolution: int, box):
+        """
+        Get a block, downloading it if it isn't cached or in flight.
+
+        """
+        key = (resolution, box)
+        with self._lock:
+            future = self._entries.get(key)
+            if future is None:
+                self.misses += 1
+                future = self._entries[key] = self._executor.submit(
+                    self._fetch, resolution, box
+                )
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+        try:
+            data = future.result()
+        except Exception:
+            with self._lock:
+                if self._entries.get(key) is future:
+                    del self._entries[key]
+            raise
+        self._evict()
+        return data
+
+    def prefetch(self, resolution: int, box):
+        """
+        Start downloading a block in the background, unless it's cached.
+
+        """
+        key = (resolution, box)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = self._executor.submit(
+                    self._fetch, resolution, box
+                )
+
+    def invalidate(self, resolution: int, region):
+        """
+        Forget the blocks of a resolution that overlap a region, and every
+        block of the other resolutions, since they are derived from it.
+
+        """
+        with self._lock:
+            for key in list(self._entries):
+                res, box = key
+                if res != resolution or all(
+                    b[0] < r[1] and r[0] < b[1] for b, r in zip(box, region)
+                ):
+                    del self._entries[key]
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(
+                f.result().nbytes
+                for f in self._entries.values()
+                if f.done() and not f.exception()
+            )
+
+    def _evict(self):
+        with self._lock:
+            done = [
+                (key, f.result().nbytes)
+                for key, f in self._entries.items()
+                if f.done() and not f.exception()
+            ]
+            total = sum(nbytes for _, nbytes in done)
+            for key, nbytes in done:
+                if total <= self.max_bytes:
+                    break
+                del self._entries[key]
+                total -= nbytes
+
+    def close(self):
+        """
+        Drop every block, and stop the downloads that haven't started.
+
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for future in entries:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+class ChunkReader:
+    """
+    Reads regions of a channel through a ChunkCache, with read-ahead.
+
+    Regions are split into blocks aligned to the channel's chunk grid, and
+    each block is read from the cache. After each read, the next blocks the
+    caller is expected to read are prefetched in the background:
+
+        - with `read_ahead="auto"`, when a read continues the previous one
+          along one axis (for example z-slab after z-slab), the next `depth`
+          regions along that axis;
+        - with `read_ahead` set to "x", "y" or "z", the next `depth` regions
+          along that axis, after every read;
+        - with `read_ahead=None`, nothing.
+
+    """
+
+    def __init__(
+        self,
+        volume_provider,
+        channel,
+        extents: Callable,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        read_ahead: Optional[str] = "auto",
+        depth: int = 2,
+        max_workers: int = 4,
+        block_size: Optional[Tuple[int, int, int]] = None,
+    ):
+        """
+        Arguments:
+            volume_provider (VolumeProvider): Provider to read with.
+            channel (ChannelResource): Channel to read.
+            extents (Callable): Called with a resolution; returns the XYZ
+                ranges of the channel at that resolution.
+            max_bytes (int): Memory the cached blocks may use.
+            read_ahead (Optional[str]): "auto", "x", "y", "z" or None.
+            depth (int: 2): Number of regions to read ahead.
+            max_workers (int: 4): Number of blocks downloaded concurrently.
+            block_size (Optional[Tuple[int, int, int]]): XYZ size of the
+                blocks. Defaults to the channel's chunk size.
+
+        """
+        if read_ahead not in ("auto", None) and read_ahead not in READ_AHEAD_AXES:
+            raise ValueError(
+                f"read_ahead must be 'auto', 'x', 'y', 'z' or None, not {read_ahead}."
+            )
+        self.volume_provider = volume_provider
+        self.channel = channel
+        self._extents = extents
+        self.read_ahead = read_ahead
+        self.depth = depth
+        self.block_size = block_size
+        self.cache = ChunkCache(self._fetch, max_bytes, max_workers)
+        self._grids = {}
+        self._last = None
+
+    def _fetch(self, resolution, box):
+        xs, ys, zs = box
+        cutout = self.volume_provider.get_cutout(
+            self.channel, resolution, xs, ys, zs
+        )
+        # Cached blocks are shared between reads, so keep them read-only.
+        data = np.array(cutout).reshape(tuple(r[1] - r[0] for r in box)[::-1])
+        data.flags.writeable = False
+        return data
+
+    def _grid(self, resolution):
+        if resolution not in self._grids:
+            chunk_size, origin = self.volume_provider.get_cutout_chunking(
+                self.channel, resolution
+            )
+            self._grids[resolution] = (
+                tuple(self.block_size or chunk_size),
+                tuple(origin),
+                self._extents(resolution),
+            )
+        return self._grids[resolution]
+
+    def grid(self, resolution: int):
+        """
+        Get the XYZ (block_size, origin) of the blocks cached at a resolution.
+
+        """
+        block_size, origin, _ = self._grid(resolution)
+        return block_size, origin
+
+    def _boxes(self, resolution, region):
+        """XYZ ranges of the blocks that a region touches, clipped to the extents."""
+        chunk_size, origin, extents = self._grid(resolution)
+        ranges = [
+            range((rng[0] - o) // c, (rng[1] - 1 - o) // c + 1)
+            for rng, o, c in zip(region, origin, chunk_size)
+        ]
+        return [
+            tuple(
+                (max(o + i * c, ext[0]), min(o + (i + 1) * c, ext[1]))
+                for i, o, c, ext in zip(index, origin, chunk_size, extents)
+            )
+            for index in (
+                (i, j, k) for i in ranges[0] for j in ranges[1] for k in ranges[2]
+            )
+        ]
+
+    def read(self, resolution: int, xs, ys, zs):
+        """
+        Read a region, in ZYX order.
+
+        Regions outside the extents are read directly, without the cache.
+
+        """
+        region = (tuple(xs), tuple(ys), tuple(zs))
+        extents = self._grid(resolution)[2]
+        if any(
+            rng[0] < ext[0] or rng[1] > ext[1] or rng[0] >= rng[1]
+            for rng, ext in zip(region, extents)
+        ):
+            return self.volume_provider.get_cutout(
+                self.channel, resolution, xs, ys, zs
+            )
+
+        boxes = self._boxes(resolution, region)
+        if len(boxes) == 1 and boxes[0] == region:
+            result = self.cache.get(resolution, boxes[0]).copy()
+        else:
+            result = None
+            for box in boxes:
+                block = self.cache.get(resolution, box)
+                if result is None:
+                    result = np.empty(
+                        tuple(r[1] - r[0] for r in region)[::-1], dtype=block.dtype
+                    )
+                overlap = [
+                    (max(r[0], b[0]), min(r[1], b[1])) for r, b in zip(region, box)
+                ]
+                result[
+                    tuple(slice(o[0] - r[0], o[1] - r[0]) for o, r in zip(overlap, region))[::-1]
+                ] = block[
+                    tuple(slice(o[0] - b[0], o[1] - b[0]) for o, b in zip(overlap, box))[::-1]
+                ]
+
+        self._read_ahead(resolution, region)
+        return result
+
+    def _read_ahead(self, resolution, region):
+        axis = None
+        if self.read_ahead in READ_AHEAD_AXES:
+            axis = READ_AHEAD_AXES[self.read_ahead]
+        elif self.read_ahead == "auto" and self._last is not None:
+            last_resolution, last = self._last
+            if last_resolution == resolution:
+                for a in range(3):
+                    others_same = all(
+                        region[i] == last[i] for i in range(3) if i != a
+                    )
+                    if others_same and region[a][0] == last[a][1]:
+                        axis = a
+                        break
+        self._last = (resolution, region)
+        if axis is None:
+            return
+
+        extents = self._grid(resolution)[2]
+        size = region[axis][1] - region[axis][0]
+        for step in range(1, self.depth + 1):
+            start = region[axis][0] + step * size
+            stop = min(start + size, extents[axis][1])
+            if start >= stop:
+                break
+            ahead = list(region)
+            ahead[axis] = (start, stop)
+            for box in self._boxes(resolution, ahead):
+                self.cache.prefetch(resolution, box)
+
+    def invalidate(self, resolution: int, xs, ys, zs):
+        """
+        Forget cached blocks that a write to a region makes stale.
+
+        """
+        self.cache.invalidate(resolution, (tuple(xs), tuple(ys), tuple(zs)))
+        self._last = None
+
+    def close(self):
+        self.cache.close()
@@ -0,0 +1,240 @@
+"""
+Copyright 2020 The Johns Hopkins University Applied Physics Laboratory.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Standard imports
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+# Pip-installable imports
+import numpy as np
+
+from .array import AxisOrder
+
+# Rounds of candidate patches drawn for a batch before label_weights is
+# assumed to match nothing in the region.
+MAX_SAMPLING_ROUNDS = 1000
+
+
+class PatchSampler:
+    """
+    Yields batches of random patches of an array, downloaded ahead of use.
+
+    Up to `prefetch` batches are downloaded in the background while the
+    caller trains on the current one, so iterating yields batches at the
+    rate of the network rather than one round trip per patch:
+
+        with PatchSampler(image, (16, 128, 128), label=labels, batch_size=8,
+                          label_weights={0: 0.1, 1: 1.0}) as sampler:
+            for images, labels in sampler:
+                train_step(images, labels)
+
+    Patches are read through each array's read cache, so patches that
+    overlap share their downloaded chunks. Arrays without a cache get one
+    (without read-ahead) until the sampler is closed.
+
+    With `label_weights`, a patch is kept with a probability proportional to
+    the weight of the label at its center, so rare labels can be sampled
+    more often. Labels missing from `label_weights` have a weight of 0.
+
+    """
+
+    def __init__(
+        self,
+        image,
+        patch_size: Tuple[int, int, int],
+        label=None,
+        batch_size: int = 8,
+        num_batches: Optional[int] = None,
+        label_weights: Optional[Dict[int, float]] = None,
+        x_range: Optional[Tuple[int, int]] = None,
+        y_range: Optional[Tuple[int, int]] = None,
+        z_range: Optional[Tuple[int, int]] = None,
+        prefetch: int = 4,
+        max_workers: int = 8,
+        cache_bytes: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Arguments:
+            image (array): Array to take the patches from.
+            patch_size (Tuple[int, int, int]): Size of each patch, in the
+                image's axis order.
+            label (Optional[array]): Array of the same shape, whose patches
+                are yielded alongside the image's.
+            batch_size (int: 8): Number of patches in each batch.
+            num_batches (Optional[int]): Number of batches to yield. Defaults
+                to yielding forever.
+            label_weights (Optional[Dict[int, float]]): Weight of each label
+                value, to sample patches by the label at their center.
+            x_range, y_range, z_range (Optional[Tuple[int, int]]): Region to
+                take the patches from, in voxels. Defaults to the whole array.
+            prefetch (int: 4): Number of batches downloaded ahead.
+            max_workers (int: 8): Number of patches downloaded concurrently.
+            cache_bytes (Optional[int]): Memory of the read caches the
+                sampler enables. Defaults to `array.enable_cache`'s.
+            seed (Optional[int]): Seed of the random patches.
+
+        """
+        if batch_size < 1 or prefetch < 1 or max_workers < 1:
+            raise ValueError(
+                "batch_size, prefetch and max_workers must be greater than 0."
+            )
+        if label_weights is not None and label is None:
+            raise ValueError("label_weights needs a label array.")
+        if label is not None and tuple(label.shape) != tuple(image.shape):
+            raise ValueError(
+                f"label has shape {label.shape}, but image has shape {image.shape}."
+            )
+        if label_weights is not None and max(label_weights.values(), default=0) <= 0:
+            raise ValueError("label_weights must have a positive weight.")
+
+        self.image = image
+        self.label = label
+        self.batch_size = batch_size
+        self.num_batches = num_batches
+        self.label_weights = label_weights
+        self.prefetch = prefetch
+
+        self.patch_size = np.array(patch_size)
+        if image.axis_order == AxisOrder.ZYX:
+            self.patch_size = self.patch_size[::-1]
+        region = [
+            list(rng) if rng is not None else ext
+            for rng, ext in zip((x_range, y_range, z_range), image._extents())
+        ]
+        self._lower = np.array([rng[0] for rng in region])
+        self._upper = np.array([rng[1] for rng in region]) - self.patch_size + 1
+        if (self.patch_size < 1).any() or (self._upper <= self._lower).any():
+            raise ValueError(
+                f"Patches of size {tuple(patch_size)} don't fit in the region."
+            )
+
+        self._arrays = [image] if label is None else [image, label]
+        self._cached = []
+        for arr in self._arrays:
+            # Buffered writes are uploaded first, so that they are read back.
+            arr.flush()
+            if arr._read_cache is None:
+                arr.enable_cache(max_bytes=cache_bytes, read_ahead=None)
+                self._cached.append(arr)
+
+        self._seeds = np.random.SeedSequence(seed)
+        self._batches = ThreadPoolExecutor(max_workers=prefetch)
+        self._patches = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        """
+        Yield batches: an image array of shape (batch_size, *patch_size),
+        or an (images, labels) tuple when there is a label array.
+
+        """
+        in_flight = deque()
+        submitted = 0
+        try:
+            while True:
+                while len(in_flight) < self.prefetch and (
+                    self.num_batches is None or submitted < self.num_batches
+                ):
+                    rng = np.random.default_rng(self._seeds.spawn(1)[0])
+                    in_flight.append(self._batches.submit(self._batch, rng))
+                    submitted += 1
+                if not in_flight:
+                    return
+                yield in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def sample_boxes(self, count: int, rng=None):
+        """
+        Draw random patches.
+
+        Arguments:
+            count (int): Number of patches.
+            rng (Optional[np.random.Generator]): Source of randomness.
+
+        Returns:
+            list: XYZ ranges of each patch.
+
+        Raises:
+            RuntimeError if `label_weights` keeps rejecting every patch.
+
+        """
+        rng = rng or np.random.default_rng()
+        if self.label_weights is None:
+            starts = rng.integers(self._lower, self._upper, size=(count, 3))
+        else:
+            top = max(self.label_weights.values())
+            kept = []
+            for _ in range(MAX_SAMPLING_ROUNDS):
+                candidates = rng.integers(self._lower, self._upper, size=(4 * count, 3))
+                centers = candidates + self.patch_size // 2
+                if self.label.axis_order == AxisOrder.ZYX:
+                    centers = centers[:, ::-1]
+                weights = np.fromiter(
+                    (self.label_weights.get(int(v), 0) for v in self.label.sample(centers)),
+                    dtype=np.float64,
+                    count=len(centers),
+                )
+                kept.extend(candidates[rng.random(len(candidates)) * top < weights])
+                if len(kept) >= count:
+                    break
+            else:
+                raise RuntimeError(
+                    "No patches with a positive label weight were found in the region."
+                )
+            starts = np.array(kept[:count])
+        return [
+            tuple((int(s), int(s + p)) for s, p in zip(start, self.patch_size))
+            for start in starts
+        ]
+
+    def _batch(self, rng):
+        boxes = self.sample_boxes(self.batch_size, rng)
+        futures = [
+            [self._patches.submit(self._read, arr, box) for box in boxes]
+            for arr in self._arrays
+        ]
+        batch = tuple(np.stack([f.result() for f in patches]) for patches in futures)
+        return batch if self.label is not None else batch[0]
+
+    @staticmethod
+    def _read(arr, box):
+        data = np.reshape(
+            arr._read_zyx(arr.resolution, *box),
+            tuple(r[1] - r[0] for r in box)[::-1],
+        )
+        if arr.axis_order == AxisOrder.XYZ:
+            data = data.T
+        return data
+
+    def close(self):
+        """
+        Stop the downloads, and disable the read caches the sampler enabled.
+
+        """
+        self._batches.shutdown(wait=True)
+        self._patches.shutdown(wait=True)
+        for arr in self._cached:
+            arr.disable_cache()
+        self._cached = []
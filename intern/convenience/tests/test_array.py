@@ -0,0 +1,604 @@
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from intern.convenience.array import (
+    array,
+    AxisOrder,
+    VolumeProvider,
+    _DVIDVolumeProvider,
+)
+from intern.remote.local import LocalRemote
+from intern.utils.pyramid import downsample_mean
+from intern.resource.boss.resource import (
+    ChannelResource,
+    CoordinateFrameResource,
+    ExperimentResource,
+)
+
+try:
+    from cloudvolume import CloudVolume
+
+    HAS_CLOUDVOLUME = True
+except ImportError:
+    HAS_CLOUDVOLUME = False
+
+
+class InMemoryVolumeProvider(VolumeProvider):
+    """
+    A VolumeProvider that serves a single ZYX numpy volume from memory.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.get_calls = []
+        self.create_calls = []
+        self.channel = ChannelResource(
+            "chan", "col", "exp", type="image", datatype=str(data.dtype)
+        )
+        self.coord_frame = CoordinateFrameResource(
+            "cf",
+            x_stop=data.shape[2],
+            y_stop=data.shape[1],
+            z_stop=data.shape[0],
+        )
+
+    def get_channel(self, channel, collection, experiment):
+        return self.channel
+
+    def get_project(self, resource):
+        if isinstance(resource, ExperimentResource):
+            return ExperimentResource("exp", "col", coord_frame="cf")
+        if isinstance(resource, CoordinateFrameResource):
+            return self.coord_frame
+        return self.channel
+
+    def get_cutout(self, channel, resolution, xs, ys, zs):
+        self.get_calls.append((resolution, tuple(xs), tuple(ys), tuple(zs)))
+        return self.data[zs[0] : zs[1], ys[0] : ys[1], xs[0] : xs[1]].copy()
+
+    def create_cutout(self, channel, resolution, xs, ys, zs, data):
+        self.create_calls.append((resolution, tuple(xs), tuple(ys), tuple(zs)))
+        self.data[zs[0] : zs[1], ys[0] : ys[1], xs[0] : xs[1]] = data
+
+
+class TestArrayAxisOrder(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.randint(0, 255, (10, 20, 30), dtype=np.uint8)
+        self.provider = InMemoryVolumeProvider(self.data)
+
+    def test_get_zyx(self):
+        arr = array(self.provider.channel, volume_provider=self.provider)
+        np.testing.assert_array_equal(arr[2:5, 3:9, 4:20], self.data[2:5, 3:9, 4:20])
+
+    def test_get_xyz_is_transposed_view(self):
+        arr = array(
+            self.provider.channel,
+            volume_provider=self.provider,
+            axis_order=AxisOrder.XYZ,
+        )
+        cutout = arr[4:20, 3:9, 2:5]
+        self.assertEqual(cutout.shape, (16, 6, 3))
+        np.testing.assert_array_equal(cutout, self.data[2:5, 3:9, 4:20].T)
+
+    def test_set_xyz(self):
+        arr = array(
+            self.provider.channel,
+            volume_provider=self.provider,
+            axis_order=AxisOrder.XYZ,
+        )
+        value = np.random.randint(0, 255, (16, 6, 3), dtype=np.uint8)
+        arr[4:20, 3:9, 2:5] = value
+        np.testing.assert_array_equal(self.provider.data[2:5, 3:9, 4:20], value.T)
+
+    def test_set_2d_slice_xyz(self):
+        arr = array(
+            self.provider.channel,
+            volume_provider=self.provider,
+            axis_order=AxisOrder.XYZ,
+        )
+        # One test per axis indexed with an int: x, y and z.
+        arr[5, 3:9, 2:5] = np.full((6, 3), 1, dtype=np.uint8)
+        np.testing.assert_array_equal(self.provider.data[2:5, 3:9, 5], 1)
+        arr[4:20, 7, 2:5] = np.full((16, 3), 2, dtype=np.uint8)
+        np.testing.assert_array_equal(self.provider.data[2:5, 7, 4:20], 2)
+        arr[4:20, 3:9, 6] = np.full((16, 6), 3, dtype=np.uint8)
+        np.testing.assert_array_equal(self.provider.data[6, 3:9, 4:20], 3)
+
+    def test_set_1d_row(self):
+        arr = array(self.provider.channel, volume_provider=self.provider)
+        arr[4, 2, 5:15] = np.arange(10, dtype=np.uint8)
+        np.testing.assert_array_equal(self.provider.data[4, 2, 5:15], np.arange(10))
+
+    def test_set_2d_slice(self):
+        arr = array(self.provider.channel, volume_provider=self.provider)
+        value = np.ones((6, 16), dtype=np.uint8)
+        arr[7, 3:9, 4:20] = value
+        np.testing.assert_array_equal(self.provider.data[7, 3:9, 4:20], value)
+
+
+class TestArrayWriteBuffer(unittest.TestCase):
+    def setUp(self):
+        self.data = np.zeros((10, 20, 30), dtype=np.uint8)
+        self.provider = InMemoryVolumeProvider(self.data)
+        self.arr = array(self.provider.channel, volume_provider=self.provider)
+
+    def test_slices_are_combined(self):
+        expected = np.random.randint(1, 255, (10, 20, 30), dtype=np.uint8)
+        with self.arr.write_buffer(block_size=(16, 16, 4)) as buffer:
+            for z in range(10):
+                self.arr[z, 0:20, 0:30] = expected[z]
+            # Blocks are clipped to the extents, so even the last ones
+            # filled up and were uploaded without a flush.
+            self.assertEqual(buffer.bytes_buffered, 0)
+
+        np.testing.assert_array_equal(self.provider.data, expected)
+        self.assertIsNone(self.arr._write_buffer)
+        # 2 x 2 x 3 blocks, each uploaded whole.
+        self.assertEqual(len(self.provider.create_calls), 12)
+        self.assertEqual(self.provider.get_calls, [])
+        for _, xs, ys, zs in self.provider.create_calls:
+            self.assertEqual(xs[0] % 16, 0)
+            self.assertEqual(ys[0] % 16, 0)
+            self.assertEqual(zs[0] % 4, 0)
+
+    def test_rewriting_a_submitted_block(self):
+        # The first upload of the block is slow, so the rewrite of slice 0
+        # would land first if uploads of a block weren't kept in order.
+        create_cutout = self.provider.create_cutout
+
+        def _slow_create_cutout(channel, resolution, xs, ys, zs, data):
+            if zs == (0, 10):
+                time.sleep(0.2)
+            create_cutout(channel, resolution, xs, ys, zs, data)
+
+        self.provider.create_cutout = _slow_create_cutout
+        with self.arr.write_buffer(block_size=(32, 32, 16)):
+            for z in range(10):
+                self.arr[z, 0:20, 0:30] = np.ones((20, 30), dtype=np.uint8)
+            self.arr[0, 0:20, 0:30] = np.full((20, 30), 2, dtype=np.uint8)
+        np.testing.assert_array_equal(self.provider.data[0], 2)
+        np.testing.assert_array_equal(self.provider.data[1:], 1)
+
+    def test_flush_partial_box(self):
+        value = np.random.randint(1, 255, (2, 3, 5), dtype=np.uint8)
+        with self.arr.write_buffer(block_size=(16, 16, 4)):
+            self.arr[1:3, 2:5, 4:9] = value
+            self.arr.flush()
+            self.assertEqual(self.provider.create_calls, [(0, (4, 9), (2, 5), (1, 3))])
+            self.assertEqual(self.provider.get_calls, [])
+        np.testing.assert_array_equal(self.provider.data[1:3, 2:5, 4:9], value)
+
+    def test_flush_partial_merges_stored_data(self):
+        self.provider.data[:] = 7
+        with self.arr.write_buffer(block_size=(16, 16, 4)):
+            self.arr[0, 0:2, 0:2] = np.ones((2, 2), dtype=np.uint8)
+            self.arr[3, 5:6, 5:9] = np.full((1, 4), 2, dtype=np.uint8)
+
+        expected = np.full((10, 20, 30), 7, dtype=np.uint8)
+        expected[0, 0:2, 0:2] = 1
+        expected[3, 5:6, 5:9] = 2
+        np.testing.assert_array_equal(self.provider.data, expected)
+        self.assertEqual(self.provider.create_calls, [(0, (0, 16), (0, 16), (0, 4))])
+
+    def test_reads_see_buffered_writes(self):
+        with self.arr.write_buffer():
+            self.arr[2:4, 0:5, 0:5] = np.full((2, 5, 5), 3, dtype=np.uint8)
+            np.testing.assert_array_equal(self.arr[2:4, 0:5, 0:5], 3)
+
+    def test_max_bytes(self):
+        with self.arr.write_buffer(max_bytes=0, block_size=(16, 16, 4)):
+            self.arr[0, 0:2, 0:2] = np.ones((2, 2), dtype=np.uint8)
+            self.arr.flush()
+            self.assertEqual(len(self.provider.create_calls), 1)
+
+    def test_invalid(self):
+        with self.arr.write_buffer():
+            with self.assertRaises(RuntimeError):
+                self.arr.write_buffer()
+            with self.assertRaises(ValueError):
+                self.arr._write_buffer.write(
+                    (0, 2), (0, 2), (0, 1), np.ones((2, 2, 2), np.uint8)
+                )
+
+
+class TestArrayReadCache(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.randint(0, 255, (12, 20, 30), dtype=np.uint8)
+        self.provider = InMemoryVolumeProvider(self.data)
+        self.arr = array(self.provider.channel, volume_provider=self.provider)
+
+    def tearDown(self):
+        self.arr.disable_cache()
+
+    def test_sequential_slabs_are_prefetched(self):
+        reader = self.arr.enable_cache(depth=1, block_size=(32, 32, 4))
+        for z in range(0, 12, 4):
+            np.testing.assert_array_equal(
+                self.arr[z : z + 4, 0:20, 0:30], self.data[z : z + 4]
+            )
+        # The first two slabs are misses. The second continues the first,
+        # so the third was prefetched while the second was returned.
+        self.assertEqual(reader.cache.misses, 2)
+        self.assertEqual(reader.cache.hits, 1)
+        self.assertEqual(len(self.provider.get_calls), 3)
+
+    def test_read_ahead_hint(self):
+        reader = self.arr.enable_cache(read_ahead="z", depth=2, block_size=(32, 32, 4))
+        self.arr[0:4, 0:20, 0:30]
+        np.testing.assert_array_equal(self.arr[8:12, 0:20, 0:30], self.data[8:12])
+        self.assertEqual(reader.cache.misses, 1)
+        self.assertEqual(reader.cache.hits, 1)
+
+    def test_unaligned_reads_are_assembled(self):
+        self.arr.enable_cache(read_ahead=None, block_size=(8, 8, 4))
+        np.testing.assert_array_equal(
+            self.arr[3:10, 5:17, 2:29], self.data[3:10, 5:17, 2:29]
+        )
+        calls = len(self.provider.get_calls)
+        np.testing.assert_array_equal(self.arr[5, 6:9, 3:7], self.data[5, 6:9, 3:7])
+        self.assertEqual(len(self.provider.get_calls), calls)
+
+    def test_writes_invalidate(self):
+        self.arr.enable_cache(read_ahead=None, block_size=(32, 32, 4))
+        self.arr[0:4, 0:20, 0:30]
+        self.arr[1, 2:4, 2:4] = np.zeros((2, 2), dtype=np.uint8)
+        np.testing.assert_array_equal(self.arr[1, 2:4, 2:4], 0)
+
+    def test_max_bytes(self):
+        reader = self.arr.enable_cache(
+            max_bytes=0, read_ahead=None, block_size=(32, 32, 4)
+        )
+        self.arr[0:4, 0:20, 0:30]
+        self.arr[0:4, 0:20, 0:30]
+        self.assertEqual(reader.cache.misses, 2)
+        self.assertEqual(reader.cache.nbytes, 0)
+
+    def test_invalid_hint(self):
+        with self.assertRaises(ValueError):
+            self.arr.enable_cache(read_ahead="t")
+
+
+class TestArrayBlocks(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.randint(0, 255, (10, 20, 30), dtype=np.uint8)
+        self.provider = InMemoryVolumeProvider(self.data)
+        self.arr = array(self.provider.channel, volume_provider=self.provider)
+
+    def test_reduce(self):
+        kwargs = {"block_size": (16, 16, 4), "max_workers": 3}
+        self.assertEqual(self.arr.reduce("sum", **kwargs), self.data.sum())
+        self.assertEqual(self.arr.reduce("min", **kwargs), self.data.min())
+        self.assertEqual(self.arr.reduce("max", **kwargs), self.data.max())
+        self.assertAlmostEqual(self.arr.reduce("mean", **kwargs), self.data.mean())
+        # 2 x 2 x 3 blocks
+        self.assertEqual(len(self.provider.get_calls), 4 * 12)
+
+    def test_sample(self):
+        points = np.stack(
+            [
+                np.random.randint(0, 10, 200),
+                np.random.randint(0, 20, 200),
+                np.random.randint(0, 30, 200),
+            ],
+            axis=1,
+        )
+        values = self.arr.sample(points, block_size=(8, 8, 4), max_workers=3)
+        np.testing.assert_array_equal(
+            values, self.data[points[:, 0], points[:, 1], points[:, 2]]
+        )
+        # Only the blocks containing points are downloaded, once each.
+        blocks = {(z // 4, y // 8, x // 8) for z, y, x in points}
+        self.assertEqual(len(self.provider.get_calls), len(blocks))
+
+    def test_sample_xyz_and_cache(self):
+        arr = array(
+            self.provider.channel,
+            volume_provider=self.provider,
+            axis_order=AxisOrder.XYZ,
+        )
+        reader = arr.enable_cache(read_ahead=None, block_size=(32, 32, 16))
+        points = [(29, 19, 9), (0, 0, 0), (5, 6, 7)]
+        np.testing.assert_array_equal(
+            arr.sample(points), [self.data[z, y, x] for x, y, z in points]
+        )
+        arr.sample(points)
+        self.assertEqual(reader.cache.misses, 1)
+        arr.disable_cache()
+
+    def test_sample_invalid(self):
+        with self.assertRaises(ValueError):
+            self.arr.sample([(0, 0, 30)])
+        with self.assertRaises(ValueError):
+            self.arr.sample([(0, 0)])
+        self.assertEqual(len(self.arr.sample(np.zeros((0, 3), dtype=int))), 0)
+
+    def test_reduce_histogram(self):
+        counts, edges = self.arr.reduce("histogram", bins=16, block_size=(16, 16, 4))
+        expected_counts, expected_edges = np.histogram(self.data, bins=16, range=(0, 256))
+        np.testing.assert_array_equal(counts, expected_counts)
+        np.testing.assert_array_equal(edges, expected_edges)
+
+    def test_reduce_region_and_function(self):
+        actual = self.arr.reduce(
+            lambda block: int((block > 100).sum()),
+            x_range=(3, 25),
+            y_range=(0, 20),
+            z_range=(2, 9),
+            combine=lambda a, b: a + b,
+            block_size=(8, 8, 8),
+        )
+        self.assertEqual(actual, (self.data[2:9, 0:20, 3:25] > 100).sum())
+
+    def test_reduce_invalid(self):
+        with self.assertRaises(ValueError):
+            self.arr.reduce("median")
+        with self.assertRaises(ValueError):
+            self.arr.reduce(np.sum)
+
+    def test_map_blocks_with_halo(self):
+        def _blur(block):
+            # Mean of each voxel and its neighbours along x.
+            padded = np.pad(block.astype(np.float64), ((0, 0), (0, 0), (1, 1)), mode="edge")
+            return (padded[:, :, :-2] + padded[:, :, 1:-1] + padded[:, :, 2:]) / 3
+
+        actual = self.arr.map_blocks(_blur, halo=1, block_size=(8, 8, 4), max_workers=3)
+
+        np.testing.assert_allclose(actual, _blur(self.data))
+
+    def test_map_blocks_to_array(self):
+        out_provider = InMemoryVolumeProvider(np.zeros_like(self.data))
+        out = array(out_provider.channel, volume_provider=out_provider)
+
+        result = self.arr.map_blocks(
+            lambda block: 255 - block, out=out, block_size=(16, 16, 4)
+        )
+
+        self.assertIsNone(result)
+        np.testing.assert_array_equal(out_provider.data, 255 - self.data)
+        self.assertEqual(len(out_provider.create_calls), 12)
+
+    def test_map_blocks_xyz(self):
+        arr = array(
+            self.provider.channel,
+            volume_provider=self.provider,
+            axis_order=AxisOrder.XYZ,
+        )
+        actual = arr.map_blocks(
+            lambda block: np.full_like(block, block.shape[0]), block_size=(16, 16, 4)
+        )
+        self.assertEqual(actual.shape, (30, 20, 10))
+        # Blocks are passed in XYZ order, so their first axis is x.
+        self.assertEqual(set(np.unique(actual)), {14, 16})
+
+
+@unittest.skipIf(not HAS_CLOUDVOLUME, "cloudvolume is not installed")
+class TestArrayCloudVolume(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.data = np.random.randint(0, 255, (10, 20, 30), dtype=np.uint8)
+        info = CloudVolume.create_new_info(
+            num_channels=1,
+            layer_type="image",
+            data_type="uint8",
+            encoding="raw",
+            resolution=[4, 4, 40],
+            voxel_offset=[0, 0, 0],
+            chunk_size=[16, 16, 8],
+            volume_size=[30, 20, 10],
+        )
+        vol = CloudVolume("file://" + self.dir + "/layer", info=info)
+        vol.commit_info()
+        vol[:, :, :] = self.data.T
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_get_zyx(self):
+        arr = array("precomputed://file://" + self.dir + "/layer")
+        self.assertEqual(arr.shape, (10, 20, 30))
+        self.assertEqual(arr.voxel_size, ((40, 4, 4), "nanometers"))
+        self.assertEqual(arr.dtype, "uint8")
+        np.testing.assert_array_equal(arr[2:5, 3:9, 4:20], self.data[2:5, 3:9, 4:20])
+        np.testing.assert_array_equal(arr[7, 3:9, 4:20], self.data[7, 3:9, 4:20])
+
+    def test_set_zyx(self):
+        arr = array("precomputed://file://" + self.dir + "/layer")
+        value = np.random.randint(0, 255, (8, 16, 16), dtype=np.uint8)
+        arr[0:8, 0:16, 0:16] = value
+        np.testing.assert_array_equal(arr[0:8, 0:16, 0:16], value)
+
+    def test_visualize(self):
+        arr = array("precomputed://file://" + self.dir + "/layer")
+        self.assertIn("precomputed://file://" + self.dir + "/layer", arr.visualize)
+
+    def test_invalid_uri(self):
+        with self.assertRaises(ValueError):
+            array("precomputed://ftp://host/layer")
+
+
+class TestArrayLocal(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.data = np.random.randint(0, 255, (10, 20, 30), dtype=np.uint8)
+        remote = LocalRemote({"root": self.root})
+        resource = remote.create_resource(
+            "volume", "uint8", (30, 20, 10), voxel_size=(4, 4, 40)
+        )
+        remote.create_cutout(resource, 0, [0, 30], [0, 20], [0, 10], self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_get_zyx(self):
+        arr = array("local://" + self.root + "/volume")
+        self.assertEqual(arr.shape, (10, 20, 30))
+        self.assertEqual(arr.voxel_size, ((40, 4, 4), "nanometers"))
+        np.testing.assert_array_equal(arr[2:5, 3:9, 4:20], self.data[2:5, 3:9, 4:20])
+
+    def test_set_zyx(self):
+        arr = array("local://" + self.root + "/volume")
+        value = np.random.randint(0, 255, (3, 6, 16), dtype=np.uint8)
+        arr[2:5, 3:9, 4:20] = value
+        np.testing.assert_array_equal(arr[2:5, 3:9, 4:20], value)
+
+    def test_write_buffer_slices_with_open_slices(self):
+        # The slice-by-slice pattern documented by write_buffer, on a
+        # volume whose x, y and z sizes all differ.
+        expected = np.random.randint(0, 255, (10, 20, 30), dtype=np.uint8)
+        arr = array("local://" + self.root + "/volume")
+        with arr.write_buffer():
+            for z in range(arr.shape[0]):
+                arr[z, :, :] = expected[z]
+        np.testing.assert_array_equal(arr[:, :, :], expected)
+
+        arr = array("local://" + self.root + "/volume", axis_order=AxisOrder.XYZ)
+        self.assertEqual(arr.shape, (30, 20, 10))
+        arr[:, :, 4:6] = expected[4:6].T + 1
+        np.testing.assert_array_equal(arr[:, :, 4:6], expected[4:6].T + 1)
+
+    def test_open_slices_with_offset(self):
+        remote = LocalRemote({"root": self.root})
+        resource = remote.create_resource(
+            "offset", "uint8", (30, 20, 10), voxel_offset=(1, 1, 0)
+        )
+        remote.create_cutout(resource, 0, [1, 31], [1, 21], [0, 10], self.data)
+
+        arr = array("local://" + self.root + "/offset")
+        np.testing.assert_array_equal(arr[:, :, :], self.data)
+        np.testing.assert_array_equal(arr[2, :, 5:], self.data[2, :, 4:])
+        np.testing.assert_array_equal(arr[3], self.data[3])
+
+        arr[4, :, :] = np.full((20, 30), 9, dtype=np.uint8)
+        arr[:, 1:2, :12] = np.full((10, 1, 11), 8, dtype=np.uint8)
+        expected = self.data.copy()
+        expected[4] = 9
+        expected[:, 0:1, :11] = 8
+        np.testing.assert_array_equal(arr[:, :, :], expected)
+
+    def test_build_pyramid(self):
+        remote = LocalRemote({"root": self.root})
+        resource = remote.create_resource(
+            "pyramid", "uint8", (30, 20, 10), voxel_size=(4, 4, 40), num_res=3
+        )
+        remote.create_cutout(resource, 0, [0, 30], [0, 20], [0, 10], self.data)
+
+        arr = array("local://" + self.root + "/pyramid")
+        self.assertGreater(arr.build_pyramid(), 0)
+
+        expected = downsample_mean(downsample_mean(self.data, (2, 2, 1)), (2, 2, 1))
+        np.testing.assert_array_equal(
+            remote.get_cutout(resource, 2, [0, 8], [0, 5], [0, 10]), expected
+        )
+
+    def test_strided_slices_read_coarser_levels(self):
+        remote = LocalRemote({"root": self.root})
+        resource = remote.create_resource(
+            "strided", "uint8", (32, 16, 10), voxel_size=(4, 4, 40), num_res=3
+        )
+        data = np.random.randint(0, 255, (10, 16, 32), dtype=np.uint8)
+        remote.create_cutout(resource, 0, [0, 32], [0, 16], [0, 10], data)
+        arr = array("local://" + self.root + "/strided")
+        arr.build_pyramid()
+        level1 = remote.get_cutout(resource, 1, [0, 16], [0, 8], [0, 10])
+        level2 = remote.get_cutout(resource, 2, [0, 8], [0, 4], [0, 10])
+
+        with mock.patch.object(
+            arr.volume_provider, "get_cutout", wraps=arr.volume_provider.get_cutout
+        ) as get_cutout:
+            # A step of 4 in x and y is served by level 2, and z is subsampled.
+            np.testing.assert_array_equal(arr[::2, ::4, ::4], level2[::2])
+            get_cutout.assert_called_with(arr._channel, 2, (0, 8), (0, 4), (0, 9))
+
+            # A step of 8 in x is served by level 2, with a step of 2 left.
+            np.testing.assert_array_equal(arr[3, 4:16:4, 0:32:8], level2[3, 1:4, 0:8:2])
+
+            # An odd start can't use a coarser level in y, so x and y use level 0.
+            np.testing.assert_array_equal(arr[0:4, 1:16:2, 0:32:2], data[0:4, 1:16:2, 0:32:2])
+            get_cutout.assert_called_with(arr._channel, 0, (0, 31), (1, 16), (0, 4))
+
+            # Steps of 2 and 6 from even starts line up with level 1.
+            np.testing.assert_array_equal(arr[:, 2:12:2, 4:32:6], level1[:, 1:6, 2:16:3])
+            np.testing.assert_array_equal(arr[:, 2:12:3, 4:32:6], data[:, 2:12:3, 4:32:6])
+            np.testing.assert_array_equal(arr[:, 0:16:2, 0:32:2], level1)
+
+        with self.assertRaises(ValueError):
+            arr[::-1, :, :]
+
+    def test_float_volume(self):
+        remote = LocalRemote({"root": self.root})
+        remote.create_resource("float", "float32", (8, 8, 8))
+        arr = array("local://" + self.root + "/float")
+        self.assertEqual(arr.dtype, "float32")
+        self.assertEqual(arr[0:2, 0:2, 0:2].dtype, np.float32)
+
+
+class TestArrayDVID(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.randint(0, 255, (10, 20, 30), dtype=np.uint8)
+        self.remote = mock.Mock()
+        self.remote.volume_service.base_url = "http://localhost:8000"
+        self.remote.get_instance.return_value = mock.Mock(UUID="abc123", name="grayscale")
+        self.remote.get_instance.return_value.name = "grayscale"
+        self.remote.get_metadata.return_value = {
+            "Properties": {
+                "MinPoint": [0, 0, 0],
+                "MaxPoint": [29, 19, 9],
+                "VoxelSize": [8, 8, 8],
+                "VoxelUnits": ["nanometers", "nanometers", "nanometers"],
+            }
+        }
+        self.remote.get_cutout.side_effect = lambda res, r, xs, ys, zs: self.data[
+            zs[0] : zs[1], ys[0] : ys[1], xs[0] : xs[1]
+        ]
+        self.remote.get_info.return_value = {
+            "Extended": {"Values": [{"DataType": "uint8", "Label": "grayscale"}]}
+        }
+
+    def test_get_zyx(self):
+        provider = _DVIDVolumeProvider(self.remote, "abc123", "grayscale")
+        arr = array(provider.channel, volume_provider=provider)
+        self.assertEqual(arr.shape, (10, 20, 30))
+        self.assertEqual(arr.voxel_size, ((8, 8, 8), "nanometers"))
+        np.testing.assert_array_equal(arr[2:5, 3:9, 4:20], self.data[2:5, 3:9, 4:20])
+
+    def test_urls(self):
+        provider = _DVIDVolumeProvider(self.remote, "abc123", "grayscale")
+        arr = array(provider.channel, volume_provider=provider)
+        self.assertEqual(
+            arr.url, "http://localhost:8000/api/node/abc123/grayscale/info"
+        )
+        self.assertIn("dvid://http://localhost:8000/abc123/grayscale", arr.visualize)
+
+    def test_from_uri(self):
+        with mock.patch("intern.remote.dvid.DVIDRemote", return_value=self.remote) as remote:
+            arr = array("dvid://http://localhost:8000/abc123/grayscale")
+        remote.assert_called_once_with({"protocol": "http", "host": "localhost:8000"})
+        self.remote.get_instance.assert_called_with("abc123", "grayscale", "uint8")
+        self.assertEqual(arr.shape, (10, 20, 30))
+
+    def test_datatype_from_info(self):
+        self.data = np.random.randint(0, 2 ** 40, (10, 20, 30), dtype=np.uint64)
+        self.remote.get_info.return_value = {
+            "Extended": {"Values": [{"DataType": "uint64", "Label": "segmentation"}]}
+        }
+        with mock.patch("intern.remote.dvid.DVIDRemote", return_value=self.remote):
+            arr = array("dvid://http://localhost:8000/abc123/segmentation")
+        self.remote.get_instance.assert_called_with("abc123", "segmentation", "uint64")
+        self.assertEqual(arr.dtype, "uint64")
+        self.assertEqual(arr._channel.type, "annotation")
+        np.testing.assert_array_equal(arr[2:5, 3:9, 4:20], self.data[2:5, 3:9, 4:20])
+
+        # A datatype passed by the caller is used as is.
+        self.remote.get_info.reset_mock()
+        provider = _DVIDVolumeProvider(self.remote, "abc123", "segmentation", "uint64")
+        self.assertEqual(provider.channel.datatype, "uint64")
+        self.remote.get_info.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
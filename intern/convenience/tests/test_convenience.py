@@ -1,6 +1,9 @@
 import unittest
+from unittest import mock
 
-from ...convenience import parse_fquri, InvalidURIError
+from ...convenience import parse_fquri, InvalidURIError, PROTOCOLS
+from ...convenience.uri import _remote_class
+from ...remote.boss import BossRemote
 
 
 class TestFQURIParser(unittest.TestCase):
@@ -15,6 +18,11 @@ class TestFQURIParser(unittest.TestCase):
         with self.assertRaises(InvalidURIError):
             parse_fquri("https://api.bossdb.io/Bock/bock11/image")
 
+    def test_protocols_accept_classes_and_paths(self):
+        self.assertIs(_remote_class("bossdb"), BossRemote)
+        with mock.patch.dict(PROTOCOLS, {"custom": BossRemote}):
+            self.assertIs(_remote_class("custom"), BossRemote)
+
     def test_boss_uri_with_token(self):
         remote, resource = parse_fquri(
             "bossdb://https://api.bossdb.io/Bock/bock11/image", token="public"
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from intern.convenience.array import array, AxisOrder
+from intern.convenience.sampler import PatchSampler
+from intern.convenience.tests.test_array import InMemoryVolumeProvider
+
+
+class TestPatchSampler(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.randint(0, 255, (12, 20, 30), dtype=np.uint8)
+        self.provider = InMemoryVolumeProvider(self.data)
+        self.image = array(self.provider.channel, volume_provider=self.provider)
+
+        self.labels = np.zeros((12, 20, 30), dtype=np.uint64)
+        self.labels[8:12, 15:20, 25:30] = 7
+        self.label_provider = InMemoryVolumeProvider(self.labels)
+        self.label = array(
+            self.label_provider.channel, volume_provider=self.label_provider
+        )
+
+    def test_batches(self):
+        with PatchSampler(
+            self.image, (4, 5, 6), batch_size=3, num_batches=5, seed=1
+        ) as sampler:
+            batches = list(sampler)
+            boxes = sampler.sample_boxes(50, np.random.default_rng(0))
+        self.assertEqual(len(batches), 5)
+        for batch in batches:
+            self.assertEqual(batch.shape, (3, 4, 5, 6))
+        for xs, ys, zs in boxes:
+            self.assertEqual((zs[1] - zs[0], ys[1] - ys[0], xs[1] - xs[0]), (4, 5, 6))
+            self.assertTrue(0 <= zs[0] and zs[1] <= 12)
+            self.assertTrue(0 <= ys[0] and ys[1] <= 20)
+            self.assertTrue(0 <= xs[0] and xs[1] <= 30)
+        # The sampler's read cache is gone once it's closed.
+        self.assertIsNone(self.image._read_cache)
+
+    def test_seed_is_reproducible(self):
+        def _batches():
+            with PatchSampler(self.image, (2, 3, 4), num_batches=3, seed=5) as sampler:
+                return list(sampler)
+
+        for a, b in zip(_batches(), _batches()):
+            np.testing.assert_array_equal(a, b)
+
+    def test_label_pairs_and_weights(self):
+        with PatchSampler(
+            self.image,
+            (2, 3, 4),
+            label=self.label,
+            batch_size=4,
+            num_batches=3,
+            label_weights={7: 1.0},
+            seed=2,
+        ) as sampler:
+            for images, labels in sampler:
+                self.assertEqual(images.shape, (4, 2, 3, 4))
+                self.assertEqual(labels.dtype, np.uint64)
+                # Only patches centered on label 7 are kept.
+                np.testing.assert_array_equal(labels[:, 1, 1, 2], 7)
+
+    def test_patches_match_the_array(self):
+        image = array(
+            self.provider.channel,
+            volume_provider=self.provider,
+            axis_order=AxisOrder.XYZ,
+        )
+        image.enable_cache(read_ahead=None, block_size=(8, 8, 4))
+        with PatchSampler(image, (6, 5, 4), num_batches=1, seed=3) as sampler:
+            boxes = sampler.sample_boxes(2, np.random.default_rng(0))
+            patches = [sampler._read(image, box) for box in boxes]
+        for (xs, ys, zs), patch in zip(boxes, patches):
+            np.testing.assert_array_equal(
+                patch, self.data[zs[0] : zs[1], ys[0] : ys[1], xs[0] : xs[1]].T
+            )
+        # A cache the caller enabled is left alone.
+        self.assertIsNotNone(image._read_cache)
+        image.disable_cache()
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            PatchSampler(self.image, (13, 1, 1))
+        with self.assertRaises(ValueError):
+            PatchSampler(self.image, (1, 1, 1), label_weights={1: 1.0})
+        with self.assertRaises(ValueError):
+            PatchSampler(self.image, (1, 1, 1), label=self.label, label_weights={7: 0})
@@ -1,12 +1,23 @@
-from ..remote.boss import BossRemote
+import importlib
 
-# A mapping of permitted protocol types:
+# A mapping of permitted protocol types to the remote class that serves them.
+# Remotes are named rather than imported here so that parsing a URI doesn't
+# pull in every remote's dependencies; a remote class can be registered too.
 PROTOCOLS = {
-    "bossdb": BossRemote,
-    "boss": BossRemote,
+    "bossdb": "intern.remote.boss.BossRemote",
+    "boss": "intern.remote.boss.BossRemote",
 }
 
 
+def _remote_class(protocol):
+    """Import and return the remote class for a protocol in PROTOCOLS."""
+    remote = PROTOCOLS[protocol]
+    if not isinstance(remote, str):
+        return remote
+    module, name = remote.rsplit(".", 1)
+    return getattr(importlib.import_module(module), name)
+
+
 class InvalidURIError(ValueError):
     def __init__(self, *args):
         self.reason = args[0] if len(args) else None
@@ -70,7 +81,8 @@ def parse_fquri(fully_qualified_uri, **kwargs):
             + ",".join([str(i) for i in PROTOCOLS.keys()])
         )
 
-    remote_constructor = PROTOCOLS[protocol]
+    remote_constructor = _remote_class(protocol)
+    from ..remote.boss import BossRemote
 
     if remote_constructor == BossRemote:
         # `remote_path` should be of the form `host/col/exp/chan`:
@@ -17,8 +17,13 @@ from intern.remote import Remote
 from intern.resource.boss.resource import *
 from intern.service.boss.project import ProjectService
 from intern.service.boss.metadata import MetadataService
+from intern.service.boss.v1.metadata import METADATA_PARALLEL
+from intern.service.boss.v1.project import WALK_PARALLEL
+from intern.service.boss.snapshot import ResourceSnapshot
 from intern.service.boss.volume import VolumeService
-from intern.service.boss.v1.volume import CacheMode
+from intern.service.boss.v1.volume import CacheMode, GET_CUTOUTS_PARALLEL
+from intern.service.boss.instrumentation import Instrumentation
+import os
 import warnings
 
 
@@ -32,6 +37,14 @@ CONFIG_TOKEN = 'token'
 
 LATEST_VERSION = 'v1'
 
+
+def _pairs(resources_items):
+    """(resource, item) pairs from a list of pairs or a dictionary keyed by resource."""
+    if isinstance(resources_items, dict):
+        return list(resources_items.items())
+    return list(resources_items)
+
+
 class BossRemote(Remote):
     """
     Remote provides an SDK to the Boss API.
@@ -45,6 +58,9 @@ class BossRemote(Remote):
             volume service.
     """
 
+    # Boss cuboids are 512x512x16 voxels.
+    cutout_chunk_size = (512, 512, 16)
+
     def __init__(self, cfg_file_or_dict=None, version=None):
         """
         Constructor.
@@ -214,6 +230,37 @@ class BossRemote(Remote):
         self._token_volume = value
         self.volume_service.set_auth(self._token_volume)
 
+    def add_instrumentation_listener(self, callback):
+        """Receive timing and size events for cutout operations.
+
+        `callback` is called with an intern.service.boss.instrumentation.RequestEvent
+        for every HTTP request made by get_cutout, create_cutout and
+        create_cutout_to_black, and a CutoutEvent summarizing each of those calls.
+
+        Args:
+            callback (callable): Called with each event.
+        """
+        volume = self.volume_service.service
+        if volume.instrumentation is None:
+            volume.instrumentation = Instrumentation()
+        volume.instrumentation.add_listener(callback)
+
+    def remove_instrumentation_listener(self, callback):
+        """Stop sending events to a listener added with add_instrumentation_listener.
+
+        Args:
+            callback (callable): Listener to remove.
+
+        Raises:
+            ValueError if callback isn't a listener.
+        """
+        volume = self.volume_service.service
+        if volume.instrumentation is None:
+            raise ValueError("{} is not an instrumentation listener.".format(callback))
+        volume.instrumentation.remove_listener(callback)
+        if not volume.instrumentation.listeners:
+            volume.instrumentation = None
+
     def list_groups(self, filtr=None):
         """
         Get the groups the logged in user is a member of.
@@ -692,6 +739,68 @@ class BossRemote(Remote):
         cf = CoordinateFrameResource(name='')
         return self._list_resource(cf)
 
+    def walk_resources(self, collections=None, max_workers=WALK_PARALLEL, snapshot=None, max_age=None):
+        """
+        Get every collection, experiment, channel and coordinate frame, fully populated.
+
+        The tree is crawled with several requests in flight at once. With a
+        snapshot path, the result is saved there, and later calls load it
+        instead of crawling again while it is younger than max_age.
+
+        Args:
+            collections (optional[list[str]]): Names of the collections to walk. Defaults to all.
+            max_workers (optional[int]): Number of requests to send at once.
+            snapshot (optional[str]): JSON file to save the result to and load it from.
+            max_age (optional[float]): Seconds a saved snapshot stays valid. Defaults
+                to forever; 0 always crawls and refreshes the snapshot.
+
+        Returns:
+            (intern.service.boss.snapshot.ResourceSnapshot)
+
+        Raises:
+            requests.HTTPError on failure.
+        """
+        if snapshot is not None and os.path.exists(os.path.expanduser(snapshot)):
+            saved = ResourceSnapshot.load(snapshot)
+            if max_age is None or saved.age() < max_age:
+                return saved
+
+        self.project_service.set_auth(self._token_project)
+        found = self.project_service.walk(collections, max_workers)
+        result = ResourceSnapshot(
+            found['collections'], found['experiments'], found['channels'],
+            found['coordinate_frames'])
+        if snapshot is not None:
+            result.save(snapshot)
+        return result
+
+    def refresh_catalog(self, catalog, max_age=None, max_workers=WALK_PARALLEL):
+        """
+        Bring a local resource catalog up to date.
+
+        Only collections that are new, or were crawled more than max_age
+        seconds ago, are crawled again; collections deleted from the Boss
+        are removed from the catalog. Coordinate frames are always refreshed.
+
+        Args:
+            catalog (intern.service.boss.catalog.ResourceCatalog): Catalog to update.
+            max_age (optional[float]): Seconds a crawled collection stays fresh.
+                Defaults to forever; 0 crawls every collection again.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (list[str]): Names of the collections crawled.
+
+        Raises:
+            requests.HTTPError on failure.
+        """
+        names = self.list_collections()
+        stale = catalog.stale_collections(names, max_age)
+        deleted = [name for name in catalog.refreshed_at() if name not in names]
+        snapshot = self.walk_resources(stale, max_workers=max_workers)
+        catalog.update(snapshot, collections=stale + deleted)
+        return stale
+
     def get_channel(self, chan_name, coll_name, exp_name):
         """
         Helper that gets a fully initialized ChannelResource for an *existing* channel.
@@ -859,6 +968,78 @@ class BossRemote(Remote):
         self.metadata_service.set_auth(self._token_metadata)
         self.metadata_service.delete(resource, keys)
 
+    def create_metadata_bulk(self, resources_keys_vals, max_workers=METADATA_PARALLEL):
+        """
+        Associates new key-value pairs with many resources at once.
+
+        Requests for every resource and key are sent concurrently over the
+        metadata session. Will attempt to add all key-value pairs even if
+        some fail; the failures are reported together.
+
+        Args:
+            resources_keys_vals (list[tuple]|dict): (resource, keys_vals) pairs,
+                or a dictionary mapping resources to their keys_vals.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.metadata_service.set_auth(self._token_metadata)
+        self.metadata_service.create_bulk(_pairs(resources_keys_vals), max_workers)
+
+    def get_metadata_bulk(self, resources_keys, max_workers=METADATA_PARALLEL):
+        """
+        Gets the values for given keys of many resources at once.
+
+        Args:
+            resources_keys (list[tuple]|dict): (resource, keys) pairs, or a
+                dictionary mapping resources to their keys.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (list[dictionary]): Metadata of each resource, in the given order.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.metadata_service.set_auth(self._token_metadata)
+        return self.metadata_service.get_bulk(_pairs(resources_keys), max_workers)
+
+    def update_metadata_bulk(self, resources_keys_vals, max_workers=METADATA_PARALLEL):
+        """
+        Updates key-value pairs of many resources at once.
+
+        Will attempt to update all key-value pairs even if some fail.
+        Keys must already exist.
+
+        Args:
+            resources_keys_vals (list[tuple]|dict): (resource, keys_vals) pairs,
+                or a dictionary mapping resources to their keys_vals.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.metadata_service.set_auth(self._token_metadata)
+        self.metadata_service.update_bulk(_pairs(resources_keys_vals), max_workers)
+
+    def delete_metadata_bulk(self, resources_keys, max_workers=METADATA_PARALLEL):
+        """
+        Deletes the given keys of many resources at once.
+
+        Will attempt to delete all key-value pairs even if some fail.
+
+        Args:
+            resources_keys (list[tuple]|dict): (resource, keys) pairs, or a
+                dictionary mapping resources to their keys.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.metadata_service.set_auth(self._token_metadata)
+        self.metadata_service.delete_bulk(_pairs(resources_keys), max_workers)
+
     def parse_bossURI(self, uri): # type: (str) -> Resource
         """
         Parse a bossDB URI and handle malform errors.
@@ -928,9 +1109,43 @@ class BossRemote(Remote):
                 parallel=parallel, **kwargs
             )
     
-    def create_cutout_to_black(self, resource, resolution, x_range, y_range, z_range, time_range=None):
+    def get_cutouts(self, resource, resolution, regions, time_range=None, id_list=[], access_mode=CacheMode.no_cache, max_workers=GET_CUTOUTS_PARALLEL):
+        """Get many cutouts of one resource at once.
+
+        Overlapping and nearby regions are merged so that their voxels are
+        downloaded once, several requests are sent at a time, and each region
+        is sliced out of what was downloaded. Useful for many small, scattered
+        cutouts such as patches around synapses.
+
+        Args:
+            resource (intern.resource.boss.resource.ChannelResource | str): Channel or layer Resource,
+                or a URI-formatted string, see get_cutout.
+            resolution (int): 0 indicates native resolution.
+            regions (list[tuple]): (x_range, y_range, z_range) of each cutout.
+            time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            id_list (optional [list[int]]): list of object ids to filter the cutouts by.
+            access_mode (optional [Enum]): Identifies one of three cache access options, see get_cutout.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (list[numpy.array]): A 3D or 4D (time) numpy matrix in (time)ZYX order per region,
+                in the order of `regions`.
+
+        Raises:
+            requests.HTTPError on error.
+        """
+        if isinstance(resource, str):
+            resource = self.parse_bossURI(resource)
+        return self._volume.get_cutouts(
+            resource, resolution, regions, time_range, id_list, access_mode,
+            max_workers=max_workers)
+
+    def create_cutout_to_black(self, resource, resolution, x_range, y_range, z_range, time_range=None, parallel=True):
         """Post a black cutout to the volume service.
 
+        Regions too large for one request are split into as few cuboid-aligned
+        blocks as the Boss accepts, which are sent concurrently.
+
         Args:
             resource (intern.resource.Resource): Resource compatible with cutout operations.
             resolution (int): 0 indicates native resolution.
@@ -938,6 +1153,8 @@ class BossRemote(Remote):
             y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
             z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
             time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            parallel (Union[int, bool]: True): Number of requests to send at once for large
+                regions. True sends up to 8 at once, False sends them one at a time.
 
         Returns:
             (): Return type depends on volume service's implementation.
@@ -949,7 +1166,7 @@ class BossRemote(Remote):
         if not resource.valid_volume():
             raise RuntimeError('Resource incompatible with the volume service.')
         return self._volume.create_cutout_to_black(
-            resource, resolution, x_range, y_range, z_range, time_range)
+            resource, resolution, x_range, y_range, z_range, time_range, parallel=parallel)
         
     def get_experiment(self, coll_name, exp_name):
         """
@@ -220,5 +220,24 @@ class MetadataServiceTest_v1(unittest.TestCase):
         self.assertEqual([], actual_list_end)
 
 
+    def test_bulk(self):
+        keys_vals = { 'red': 'green', 'two': 'four' }
+        resources = [self.coll, self.exp, self.chan]
+        self.rmt.create_metadata_bulk([(r, keys_vals) for r in resources])
+
+        actual = self.rmt.get_metadata_bulk([(r, list(keys_vals.keys())) for r in resources])
+        self.assertEqual([keys_vals] * 3, actual)
+
+        with self.assertRaises(HTTPErrorList) as err:
+            # Only the keys that don't exist fail.
+            self.rmt.update_metadata_bulk({self.coll: {'red': 'blue'}, self.chan: {'foo': 'bar'}})
+        self.assertEqual(1, len(err.exception.http_errors))
+        self.assertEqual({'red': 'blue'}, self.rmt.get_metadata(self.coll, ['red']))
+
+        self.rmt.delete_metadata_bulk([(r, list(keys_vals.keys())) for r in resources])
+        for r in resources:
+            self.assertEqual([], self.rmt.list_metadata(r))
+
+
 if __name__ == '__main__':
     unittest.main()
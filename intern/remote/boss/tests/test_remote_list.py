@@ -14,6 +14,14 @@
 
 from intern.remote import Remote
 from intern.remote.boss import BossRemote
+from intern.resource.boss.resource import CollectionResource
+from intern.service.boss.catalog import ResourceCatalog
+from intern.service.boss.project import ProjectService
+from intern.service.boss.snapshot import ResourceSnapshot
+import os
+import shutil
+import tempfile
+import time
 import unittest
 from mock import patch
 
@@ -53,5 +61,66 @@ class TestRemoteListMethods(unittest.TestCase):
             actual = self.remote.list_coordinate_frames()
             self.assertEqual([], actual)
 
+
+class TestRemoteWalkResources(unittest.TestCase):
+    def setUp(self):
+        config = {"protocol": "https",
+                  "host": "test.theboss.io",
+                  "token": "my_secret"}
+        self.remote = BossRemote(config)
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'snapshot.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_walk_resources(self):
+        with patch.object(ProjectService, 'walk') as walk_fake:
+            walk_fake.return_value = {
+                'collections': [CollectionResource('col1')], 'experiments': [],
+                'channels': [], 'coordinate_frames': []}
+
+            actual = self.remote.walk_resources(['col1'], max_workers=2)
+
+            walk_fake.assert_called_once_with(['col1'], 2)
+            self.assertEqual(['col1'], actual.list_collections())
+
+    def test_walk_resources_snapshot(self):
+        with patch.object(ProjectService, 'walk') as walk_fake:
+            walk_fake.return_value = {
+                'collections': [CollectionResource('col1', raw={'name': 'col1', 'description': '', 'creator': 'me'})],
+                'experiments': [], 'channels': [], 'coordinate_frames': []}
+
+            self.remote.walk_resources(snapshot=self.path)
+            actual = self.remote.walk_resources(snapshot=self.path, max_age=60)
+            self.assertEqual(1, walk_fake.call_count)
+            self.assertEqual(['col1'], actual.list_collections())
+
+            self.remote.walk_resources(snapshot=self.path, max_age=0)
+            self.assertEqual(2, walk_fake.call_count)
+
+    def test_refresh_catalog(self):
+        catalog = ResourceCatalog(':memory:')
+        catalog.update(ResourceSnapshot(
+            [CollectionResource(name, raw={}) for name in ('fresh', 'stale', 'deleted')],
+            [], [], [], taken_at=time.time() - 100))
+
+        with patch.object(BossRemote, 'list_collections') as list_fake, \
+                patch.object(ProjectService, 'walk') as walk_fake:
+            list_fake.return_value = ['fresh', 'stale', 'new']
+            walk_fake.return_value = {
+                'collections': [CollectionResource('stale', raw={}), CollectionResource('new', raw={})],
+                'experiments': [], 'channels': [], 'coordinate_frames': []}
+            with patch.object(ResourceCatalog, 'stale_collections') as stale_fake:
+                stale_fake.return_value = ['stale', 'new']
+
+                crawled = self.remote.refresh_catalog(catalog, max_age=50, max_workers=2)
+
+            stale_fake.assert_called_once_with(['fresh', 'stale', 'new'], 50)
+            walk_fake.assert_called_once_with(['stale', 'new'], 2)
+            self.assertEqual(['stale', 'new'], crawled)
+            self.assertEqual(['fresh', 'new', 'stale'], sorted(catalog.refreshed_at()))
+
+
 if __name__ == '__main__':
     unittest.main()
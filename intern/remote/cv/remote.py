@@ -21,6 +21,10 @@ from intern.service.cv.project import ProjectService
 
 
 class CloudVolumeRemote(Remote):
+
+    # CloudVolume cutouts are indexed and returned in XYZ order.
+    cutout_axis_order = "XYZ"
+
     def __init__(
         self, cfg_file_or_dict=None,
     ):
@@ -130,6 +134,19 @@ class CloudVolumeRemote(Remote):
             resource, res, x_range, y_range, z_range, data
         )
 
+    def get_cutout_chunking(self, resource, res):
+        """
+        Get the chunk grid of a cloudvolume resource at the given mip.
+
+        Args:
+            resource (CloudVolume Resource Object)
+            res (int): mip level
+
+        Returns:
+            tuple: (chunk_size, voxel_offset), both in XYZ order
+        """
+        return self._metadata.get_chunking(resource, res)
+
     def get_cutout(self, resource, res, x_range, y_range, z_range):
         """
         Method to download a cutout of data
@@ -24,6 +24,7 @@ import numpy as np
 import unittest
 
 FILE_PATH = "test_data/images/"
+COPY_PATH = "test_data/images_copy/"
 
 class TestCloudVolumeRemote(unittest.TestCase):
     def setUp(self):
@@ -184,6 +185,43 @@ class TestCloudVolumeRemote(unittest.TestCase):
 
         np.testing.assert_array_equal(np.zeros([64,64,64]), self.cv_remote.get_cutout(resource, 0, [0,64], [0,64], [0,64]))
 
+    @unittest.skipIf(not HAS_CLOUDVOLUME, "cloud-volume not installed. Skipping test.")
+    def test_transfer_cutout(self):
+        info = self.cv_remote.create_new_info(
+            num_channels=1,
+            layer_type="image",
+            data_type="uint8",
+            resolution=(10,10,10),
+            volume_size=(128,128,128),
+            chunk_size=(32,32,32)
+            )
+        resource = self.cv_remote.cloudvolume(info=info)
+        data = np.random.randint(0, 255, [128,128,128], dtype=np.uint8)
+        self.cv_remote.create_cutout(resource, 0, [0,128], [0,128], [0,128], data)
+
+        # Copy into a second layer with a different chunk grid
+        os.makedirs(COPY_PATH, exist_ok=True)
+        self.addCleanup(shutil.rmtree, COPY_PATH)
+        dest_remote = CloudVolumeRemote({
+        'protocol': 'local',
+        'cloudpath': COPY_PATH
+        })
+        dest_info = dest_remote.create_new_info(
+            num_channels=1,
+            layer_type="image",
+            data_type="uint8",
+            resolution=(10,10,10),
+            volume_size=(128,128,128),
+            chunk_size=(16,16,16)
+            )
+        dest_resource = dest_remote.cloudvolume(info=dest_info)
+        self.assertEqual(((16,16,16), (0,0,0)), dest_remote.get_cutout_chunking(dest_resource, 0))
+
+        self.cv_remote.transfer_cutout(
+            resource, 0, [0,128], [0,128], [16,112], dest_remote, dest_resource, block_size=(64,64,32))
+
+        cutout = dest_remote.get_cutout(dest_resource, 0, [0,128], [0,128], [16,112])
+        np.testing.assert_array_equal(data[:, :, 16:112], cutout)
 
     def tearDown(self):
         shutil.rmtree(FILE_PATH)
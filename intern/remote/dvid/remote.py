@@ -32,6 +32,9 @@ class DVIDRemote(Remote):
     """Remote provides an SDK to the DVID API.
 	"""
 
+    # DVID stores voxel data in 32x32x32 blocks.
+    cutout_chunk_size = (32, 32, 32)
+
     def __init__(self, cfg_file_or_dict=None):
         """Constructor.
 		Protocol and host specifications are taken in as keys -values of dictionary.
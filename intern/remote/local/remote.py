@@ -0,0 +1,167 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.remote import Remote
+from intern.resource.local.resource import LocalResource
+from intern.service.local.volume import VolumeService
+from intern.service.local.metadata import MetadataService
+from intern.service.local.project import ProjectService
+
+import os
+
+
+class LocalRemote(Remote):
+    """Remote for volumes stored as memory-mapped files on local disk.
+
+    Each volume is a directory holding an info.json sidecar and one .npy or
+    raw file per resolution level (see LocalResource). Cutouts are views of
+    the mapped files, so reads cost page faults rather than copies. Useful to
+    run pipelines in tests and offline without a server, with only numpy.
+    """
+
+    # Arrays are stored in ZYX order, like Boss cutouts.
+    cutout_axis_order = "ZYX"
+
+    def __init__(self, cfg_file_or_dict=None):
+        """Constructor.
+
+        Args:
+            cfg_file_or_dict (optional[string|dict]): Path to config file in
+                INI format or a dict of config parameters. The optional "root"
+                key is a directory that relative volume paths are resolved against.
+        """
+        Remote.__init__(self, {} if cfg_file_or_dict is None else cfg_file_or_dict)
+        self.root = self._config["Default"].get("root", "")
+        # Init the services
+        self._volume = VolumeService()
+        self._metadata = MetadataService()
+        self._project = ProjectService()
+
+    def _path(self, path):
+        return os.path.join(os.path.expanduser(self.root), path)
+
+    def get_resource(self, path, mode="r+"):
+        """
+        Opens an existing local volume.
+
+        Args:
+            path (str): Directory of the volume, relative to the configured root.
+            mode (str): "r" for read only, "r+" to read and write.
+
+        Returns:
+            LocalResource
+        """
+        return LocalResource(self._path(path), mode)
+
+    def create_resource(
+        self,
+        path,
+        data_type,
+        volume_size,
+        chunk_size=(64, 64, 64),
+        voxel_offset=(0, 0, 0),
+        voxel_size=(1, 1, 1),
+        voxel_unit="nanometers",
+        num_res=1,
+        factor=(2, 2, 1),
+        file_format="npy",
+        overwrite=False,
+    ):
+        """
+        Creates a local volume with one file per resolution level.
+
+        Args:
+            path (str): Directory of the volume, relative to the configured root.
+            data_type (str): e.g. "uint8", "uint16", "uint64", "float32"
+            volume_size (tuple[int]): XYZ extent of resolution 0.
+            chunk_size (tuple[int]): XYZ block size used to split transfers.
+            voxel_offset (tuple[int]): XYZ coordinates of the first voxel of resolution 0.
+            voxel_size (tuple[float]): XYZ voxel size of resolution 0.
+            voxel_unit (str): Unit of voxel_size, such as "nanometers".
+            num_res (int): Number of resolution levels.
+            factor (tuple[int]): XYZ downsampling factor between levels.
+            file_format (str): "npy" for .npy files, "raw" for headerless C-order files.
+            overwrite (bool): Replace an existing volume at path.
+
+        Returns:
+            LocalResource
+        """
+        return self._project.create_volume(
+            self._path(path), data_type, volume_size, chunk_size, voxel_offset,
+            voxel_size, voxel_unit, num_res, factor, file_format, overwrite)
+
+    def get_cutout(self, resource, res, x_range, y_range, z_range):
+        """
+        Method to read a cutout of data
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+        Returns:
+            data (numpy array) : read-only ZYX view of the region
+        """
+        return self._volume.get_cutout(resource, res, x_range, y_range, z_range)
+
+    def create_cutout(self, resource, res, x_range, y_range, z_range, data):
+        """
+        Method to write a cutout of data
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+            data (numpy array) : ZYX array of the region
+        Returns:
+            None
+        """
+        return self._volume.create_cutout(resource, res, x_range, y_range, z_range, data)
+
+    def get_cutout_chunking(self, resource, res):
+        """
+        Get the block grid used to split transfers of a local resource.
+
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+
+        Returns:
+            tuple: (chunk_size, voxel_offset), both in XYZ order
+        """
+        return self._metadata.get_chunking(resource, res)
+
+    def get_extents(self, resource, res=0):
+        """
+        Gets extents of a local resource
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+        Returns:
+            extents (list): [[x-min, x-max], [y-min, y-max], [z-min, z-max]]
+        """
+        return self._metadata.get_extents(resource, res)
+
+    def list_res(self, resource):
+        """
+        What resolution(s) are available to read and write to in the resource.
+
+        Args:
+            resource (LocalResource object)
+
+        Returns:
+            list: list of ints denoting resolution levels
+        """
+        return self._metadata.list_res(resource)
@@ -0,0 +1,106 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.remote.local import LocalRemote
+
+import json
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestLocalRemote(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.remote = LocalRemote({"root": self.root})
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _roundtrip(self, path, dtype, file_format):
+        resource = self.remote.create_resource(
+            path, dtype, (100, 80, 40), voxel_offset=(10, 0, 5), file_format=file_format)
+        data = np.random.randint(0, 200, (30, 70, 85)).astype(dtype)
+
+        self.remote.create_cutout(resource, 0, [13, 98], [5, 75], [7, 37], data)
+
+        # Reopened, so the data are read back from the file.
+        resource = self.remote.get_resource(path, mode="r")
+        cutout = self.remote.get_cutout(resource, 0, [13, 98], [5, 75], [7, 37])
+        np.testing.assert_array_equal(data, cutout)
+        cutout = self.remote.get_cutout(resource, 0, [20, 52], [10, 42], [10, 26])
+        np.testing.assert_array_equal(data[3:19, 5:37, 7:39], cutout)
+
+    def test_cutout_npy(self):
+        self._roundtrip("npy", "uint8", "npy")
+
+    def test_cutout_raw(self):
+        self._roundtrip("raw", "float32", "raw")
+
+    def test_cutout_is_read_only_view(self):
+        resource = self.remote.create_resource("view", "uint16", (64, 64, 16))
+        data = np.arange(16 * 64 * 64, dtype=np.uint16).reshape(16, 64, 64)
+        self.remote.create_cutout(resource, 0, [0, 64], [0, 64], [0, 16], data)
+
+        cutout = self.remote.get_cutout(resource, 0, [8, 24], [0, 64], [2, 4])
+
+        self.assertIs(type(cutout), np.ndarray)
+        self.assertTrue(np.shares_memory(cutout, resource.array(0)))
+        with self.assertRaises(ValueError):
+            cutout[0, 0, 0] = 1
+
+    def test_files(self):
+        self.remote.create_resource(
+            "files", "uint8", (100, 80, 40), voxel_size=(4, 4, 40), num_res=2, file_format="raw")
+
+        with open(os.path.join(self.root, "files", "info.json")) as fp:
+            info = json.load(fp)
+        self.assertEqual("uint8", info["data_type"])
+        self.assertEqual("1.raw", info["scales"][1]["file"])
+        self.assertEqual([8, 8, 40], info["scales"][1]["voxel_size"])
+        self.assertEqual(40 * 80 * 100, os.path.getsize(os.path.join(self.root, "files", "0.raw")))
+
+    def test_metadata(self):
+        resource = self.remote.create_resource(
+            "meta", "uint8", (100, 80, 40), chunk_size=(32, 32, 16),
+            voxel_offset=(10, 0, 4), num_res=3)
+
+        self.assertEqual([0, 1, 2], self.remote.list_res(resource))
+        self.assertEqual([[10, 110], [0, 80], [4, 44]], self.remote.get_extents(resource))
+        self.assertEqual([[2, 27], [0, 20], [4, 44]], self.remote.get_extents(resource, 2))
+        self.assertEqual(((32, 32, 16), (5, 0, 4)), self.remote.get_cutout_chunking(resource, 1))
+        with self.assertRaises(KeyError):
+            resource.array(3)
+
+    def test_create_existing(self):
+        self.remote.create_resource("existing", "uint8", (64, 64, 16))
+        with self.assertRaises(FileExistsError):
+            self.remote.create_resource("existing", "uint8", (64, 64, 16))
+        resource = self.remote.create_resource("existing", "uint16", (32, 32, 8), overwrite=True)
+        self.assertEqual((8, 32, 32), resource.array(0).shape)
+
+    def test_out_of_bounds(self):
+        resource = self.remote.create_resource(
+            "bounds", "uint8", (64, 64, 16), voxel_offset=(10, 0, 0))
+        with self.assertRaises(ValueError):
+            self.remote.get_cutout(resource, 0, [0, 20], [0, 10], [0, 10])
+        with self.assertRaises(ValueError):
+            self.remote.create_cutout(
+                resource, 0, [10, 20], [0, 10], [0, 10], np.zeros((10, 10, 5), np.uint8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,7 +14,7 @@
 import six
 from abc import ABCMeta
 from six.moves import configparser
-from intern.service.mesh.service import MeshService, VoxelUnits
+from intern.service.mesh.units import VoxelUnits
 import os
 
 CONFIG_FILE ='~/.intern/intern.cfg'
@@ -29,8 +29,14 @@ class Remote(object):
         _metadata (intern.service.Service): Class that communicates with the metadata service.
         _project (intern.service.Service): Class that communicates with the project service.
         _object (intern.service.Service): Class that communicates with the object service.
+        cutout_axis_order (str): Axis order of the arrays returned by get_cutout
+            and expected by create_cutout. Either "ZYX" or "XYZ".
+        cutout_chunk_size (tuple[int]): Native chunk size of the data store, in XYZ order.
     """
 
+    cutout_axis_order = "ZYX"
+    cutout_chunk_size = (64, 64, 64)
+
     def __init__(self, cfg_file_or_dict=None):
         """Constructor.
 
@@ -114,6 +120,7 @@ class Remote(object):
             (KeyError): if given invalid version.
         """
 
+        from intern.service.mesh.service import MeshService
         self._mesh = MeshService()
 
     @property
@@ -178,7 +185,7 @@ class Remote(object):
             id_list, parallel = parallel, **kwargs
         )
 
-    def create_cutout(self, resource, resolution, x_range, y_range, z_range, data, time_range=None):
+    def create_cutout(self, resource, resolution, x_range, y_range, z_range, data, time_range=None, **kwargs):
         """Upload a cutout to the volume service.
 
         Args:
@@ -189,6 +196,7 @@ class Remote(object):
             z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
             data (object): Type depends on implementation.
             time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            kwargs: Passed to the volume service, such as `progress` and `cancel` for the Boss.
 
         Returns:
             (): Return type depends on volume service's implementation.
@@ -200,7 +208,128 @@ class Remote(object):
         if not resource.valid_volume():
             raise RuntimeError('Resource incompatible with the volume service.')
         return self._volume.create_cutout(
-            resource, resolution, x_range, y_range, z_range, data, time_range)
+            resource, resolution, x_range, y_range, z_range, data, time_range, **kwargs)
+
+    def get_cutout_chunking(self, resource, resolution):
+        """Get the native chunk grid of the data store.
+
+        Reads and writes that line up with this grid avoid partial-chunk
+        updates on the server.
+
+        Args:
+            resource (intern.resource.Resource): Resource compatible with cutout operations.
+            resolution (int): 0 indicates native resolution.
+
+        Returns:
+            (tuple): (chunk_size, origin), both in XYZ order.
+        """
+        return tuple(self.cutout_chunk_size), (0, 0, 0)
+
+    def transfer_cutout(
+            self, resource, resolution, x_range, y_range, z_range,
+            dest_remote, dest_resource, dest_resolution=None, **kwargs):
+        """Stream a region of this remote's data to another remote.
+
+        The region is moved in blocks aligned to the destination's chunk grid,
+        with downloads, axis reordering and uploads overlapping. Memory use is
+        bounded by the number of blocks in flight, not by the region size.
+
+        Args:
+            resource (intern.resource.Resource): Resource compatible with cutout operations.
+            resolution (int): 0 indicates native resolution.
+            x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+            y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+            z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+            dest_remote (intern.remote.Remote): Remote to upload to.
+            dest_resource (intern.resource.Resource): Resource to upload to.
+            dest_resolution (optional[int]): Resolution to write. Defaults to `resolution`.
+            kwargs: Passed to intern.utils.transfer.transfer_cutout
+                (block_size, max_workers, get_kwargs, progress, cancel).
+
+        Returns:
+            (int): The number of blocks transferred.
+
+        Raises:
+            RuntimeError when given invalid resource.
+        """
+        if not resource.valid_volume() or not dest_resource.valid_volume():
+            raise RuntimeError('Resource incompatible with the volume service.')
+        from intern.utils.transfer import transfer_cutout
+        return transfer_cutout(
+            self, resource, dest_remote, dest_resource, resolution,
+            x_range, y_range, z_range, dest_resolution=dest_resolution, **kwargs)
+
+    def ingest_cutout(
+            self, resource, resolution, x_range, y_range, z_range, data,
+            manifest=None, time_range=None, **kwargs):
+        """Upload a large region in concurrent blocks, resumably.
+
+        With a manifest, uploaded blocks are recorded as they finish and
+        skipped when the same ingest is run again, so an interrupted ingest
+        picks up where it stopped.
+
+        Args:
+            resource (intern.resource.Resource): Resource compatible with cutout operations.
+            resolution (int): 0 indicates native resolution.
+            x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+            y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+            z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+            data (array-like): The region, in the same axis order as `create_cutout`.
+                Numpy memmaps and other lazily loaded arrays are read one block at a time.
+            manifest (optional[Union[intern.utils.ingest.IngestManifest, str]]): Manifest,
+                or path of its SQLite file.
+            time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            kwargs: Passed to intern.utils.ingest.ingest_cutout
+                (block_size, max_workers, progress, cancel).
+
+        Returns:
+            (int): The number of blocks uploaded.
+
+        Raises:
+            RuntimeError when given invalid resource.
+        """
+        if not resource.valid_volume():
+            raise RuntimeError('Resource incompatible with the volume service.')
+        from intern.utils.ingest import ingest_cutout
+        return ingest_cutout(
+            self, resource, resolution, x_range, y_range, z_range, data,
+            manifest=manifest, time_range=time_range, **kwargs)
+
+    def build_pyramid(
+            self, resource, resolution, x_range, y_range, z_range, num_levels,
+            factor="anisotropic", method=None, **kwargs):
+        """Downsample a region into the levels above a resolution, on the client.
+
+        Each level is computed from the one below it, one block at a time,
+        and uploaded with several blocks in flight, so the hierarchy doesn't
+        wait on server-side downsampling.
+
+        Args:
+            resource (intern.resource.Resource): Resource compatible with cutout operations.
+            resolution (int): Level holding the data to downsample, 0 for native resolution.
+            x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+            y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+            z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+            num_levels (int): Number of levels to write above `resolution`.
+            factor (optional[Union[str, tuple[int]]]): "anisotropic" (halves x and y),
+                "isotropic" (halves x, y and z) or an XYZ downsampling factor.
+            method (optional[str]): "mean" or "mode". Defaults to "mode" for
+                annotation channels and "mean" otherwise.
+            kwargs: Passed to intern.utils.pyramid.build_pyramid
+                (block_size, max_workers, progress, cancel).
+
+        Returns:
+            (int): The number of blocks uploaded.
+
+        Raises:
+            RuntimeError when given invalid resource.
+        """
+        if not resource.valid_volume():
+            raise RuntimeError('Resource incompatible with the volume service.')
+        from intern.utils.pyramid import build_pyramid
+        return build_pyramid(
+            self, resource, resolution, x_range, y_range, z_range, num_levels,
+            factor=factor, method=method, **kwargs)
 
     def reserve_ids(self, resource, num_ids):
         """Reserve a block of unique, sequential ids for annotations.
@@ -278,7 +407,8 @@ class Remote(object):
             x_range, y_range, z_range, time_range=None, 
             id_list=[], voxel_unit=VoxelUnits.nm, 
             voxel_size=[4,4,40], simp_fact = 0, max_simplification_error=60,
-            normals=False, **kwargs):
+            normals=False, mesh_chunk_size=None, mesh_parallel=True,
+            stream=False, max_workers=4, cache=None, **kwargs):
         """Generate a mesh of the specified IDs
 
         Args:
@@ -295,9 +425,23 @@ class Remote(object):
             simp_fact (optional int): mesh simplification factor, reduces triangles by given factor
             max_simplification_error (optional int): Max tolerable error in physical distance
             normals (optional bool): if true will calculate normals
+            mesh_chunk_size (optional [list]): if set, mesh the downloaded volume in
+                sub-blocks of this shape (ZYX for Boss cutouts) on a process pool.
+            mesh_parallel (Union[int, bool]: True): Number of meshing processes when
+                mesh_chunk_size is set or stream is True. True uses all available CPUs.
+            stream (optional bool): if true, download the region in blocks and mesh each
+                block as soon as it arrives instead of downloading the whole region first.
+                mesh_chunk_size (ZYX) is then the download block size, and defaults to a
+                multiple of the data store's chunk size.
+            max_workers (optional int): Number of blocks downloaded concurrently when streaming.
+            cache (optional [intern.service.mesh.MeshCache or str]): mesh cache, or the
+                directory of one. Meshes found in the cache are not recomputed, and only
+                the ids missing from it are downloaded and meshed.
 
         Returns:
-            mesh (intern.service.mesh.Mesh): mesh class
+            mesh (intern.service.mesh.Mesh): mesh class, with one mesh per id. Its raw
+                volume is None when streaming or when every mesh came from the cache.
+                Use `mesh_fragments` for the per-block fragments of a streamed mesh.
 
         Raises:
             RuntimeError when given invalid resource.
@@ -307,9 +451,102 @@ class Remote(object):
 
         if not resource.valid_volume():
             raise RuntimeError('Resource incompatible with the volume service.')
-        volume = self._volume.get_cutout(
-            resource, resolution, x_range, y_range, z_range, time_range, id_list, **kwargs)
-        mesh = self._mesh.create(
-            volume, x_range, y_range, z_range, time_range, id_list, voxel_unit, voxel_size,
-            simp_fact, max_simplification_error, normals)
-        return mesh
\ No newline at end of file
+        from intern.service.mesh.service import Mesh, MeshCache
+        cached = {}
+        all_ids = not id_list
+        if cache is not None:
+            if not isinstance(cache, MeshCache):
+                cache = MeshCache(cache)
+            key = cache.key(
+                resource, resolution, x_range, y_range, z_range, time_range,
+                voxel_unit, voxel_size, simp_fact, max_simplification_error, normals)
+            wanted = list(id_list) if id_list else cache.get_ids(key)
+            if wanted is not None:
+                all_ids = False
+                cached = {oid: cache.get(key, oid) for oid in wanted}
+                id_list = [oid for oid, m in cached.items() if m is None]
+                if not id_list:
+                    return Mesh([None, cached])
+
+        if stream:
+            fragments = self.mesh_fragments(
+                resource, resolution, x_range, y_range, z_range, time_range,
+                id_list, voxel_unit, voxel_size, mesh_chunk_size, mesh_parallel,
+                max_workers, **kwargs)
+            mesh = Mesh([None, {
+                oid: fragments.merge(oid, normals, simp_fact, max_simplification_error)
+                for oid in (id_list or fragments.ids())
+            }])
+        else:
+            volume = self._volume.get_cutout(
+                resource, resolution, x_range, y_range, z_range, time_range, id_list, **kwargs)
+            mesh = self._mesh.create(
+                volume, x_range, y_range, z_range, time_range, id_list, voxel_unit, voxel_size,
+                simp_fact, max_simplification_error, normals,
+                chunk_size=mesh_chunk_size, parallel=mesh_parallel)
+
+        if cache is not None:
+            for oid in mesh.ids():
+                cached[oid] = mesh.mesh(oid)
+                cache.put(key, oid, cached[oid])
+            if all_ids:
+                cache.put_ids(key, mesh.ids())
+            mesh = Mesh([mesh._raw_vol, cached])
+        return mesh
+
+    def mesh_fragments(self, resource, resolution,
+            x_range, y_range, z_range, time_range=None,
+            id_list=[], voxel_unit=VoxelUnits.nm, voxel_size=[4,4,40],
+            mesh_chunk_size=None, mesh_parallel=True, max_workers=4, **kwargs):
+        """Mesh a region block by block, as each block downloads, without merging the blocks.
+
+        Args:
+            resource (intern.resource.Resource): Resource compatible with cutout operations.
+            resolution (int): 0 indicates native resolution.
+            x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+            y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+            z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+            time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            id_list (optional [list]): list of object ids to filter the volume by.
+            voxel_unit (optional VoxelUnit): voxel unit of measurement to derive conversion factor.
+            voxel_size (optional [list]): list in form [x,y,z] of voxel size. Defaults to 4x4x40nm
+            mesh_chunk_size (optional [list]): ZYX download block size. Defaults to a
+                multiple of the data store's chunk size.
+            mesh_parallel (Union[int, bool]: True): Number of meshing processes.
+                True uses all available CPUs.
+            max_workers (optional int): Number of blocks downloaded concurrently.
+
+        Returns:
+            (intern.service.mesh.MeshFragments): per-id fragments, which can be merged
+                or written out as Neuroglancer fragments.
+
+        Raises:
+            RuntimeError when given invalid resource.
+        """
+        if not resource.valid_volume():
+            raise RuntimeError('Resource incompatible with the volume service.')
+        return self._mesh.create_from_blocks(
+            self._iter_mesh_blocks(
+                resource, resolution, x_range, y_range, z_range, time_range,
+                id_list, mesh_chunk_size, max_workers, **kwargs),
+            x_range, y_range, z_range, id_list, voxel_unit, voxel_size,
+            parallel=mesh_parallel)
+
+    def _iter_mesh_blocks(self, resource, resolution, x_range, y_range, z_range,
+            time_range, id_list, chunk_size, max_workers, **kwargs):
+        """Download blocks for streaming meshing, overlapping by one voxel, as ZYX arrays."""
+        from intern.utils.transfer import iter_cutout_blocks
+        get_kwargs = dict(kwargs)
+        if time_range is not None:
+            get_kwargs['time_range'] = time_range
+        if id_list:
+            get_kwargs['id_list'] = id_list
+        block_size = None if chunk_size is None else tuple(chunk_size)[::-1]
+        blocks = iter_cutout_blocks(
+            self, resource, resolution, x_range, y_range, z_range,
+            block_size=block_size, overlap=1, max_workers=max_workers,
+            get_kwargs=get_kwargs)
+        for bounds, block in blocks:
+            if self.cutout_axis_order == "XYZ":
+                block = block.T
+            yield bounds, block
@@ -0,0 +1,165 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.remote import Remote
+from intern.resource.zarr.resource import ZarrResource
+from intern.service.zarr.volume import VolumeService
+from intern.service.zarr.metadata import MetadataService
+from intern.service.zarr.project import ProjectService
+
+import os
+
+
+class ZarrRemote(Remote):
+    """Remote for volumes in local Zarr and N5 stores.
+
+    Useful to mirror a dataset onto local disk and read it with the same
+    code as a Boss or CloudVolume dataset, for example with
+    `transfer_cutout`. Requires the optional `zarr` package.
+    """
+
+    # Arrays are stored in ZYX order, like Boss cutouts.
+    cutout_axis_order = "ZYX"
+
+    def __init__(self, cfg_file_or_dict=None):
+        """Constructor.
+
+        Args:
+            cfg_file_or_dict (optional[string|dict]): Path to config file in
+                INI format or a dict of config parameters. The optional "root"
+                key is a directory that relative store paths are resolved against.
+        """
+        Remote.__init__(self, {} if cfg_file_or_dict is None else cfg_file_or_dict)
+        self.root = self._config["Default"].get("root", "")
+        # Init the services
+        self._volume = VolumeService()
+        self._metadata = MetadataService()
+        self._project = ProjectService()
+
+    def _path(self, path):
+        return os.path.join(os.path.expanduser(self.root), path)
+
+    def get_resource(self, path, mode="r+"):
+        """
+        Opens an existing Zarr or N5 store.
+
+        Args:
+            path (str): Directory of the store, relative to the configured root.
+                N5 is used if it ends with ".n5".
+            mode (str): "r" for read only, "r+" to read and write.
+
+        Returns:
+            ZarrResource
+        """
+        return ZarrResource(self._path(path), mode)
+
+    def create_resource(
+        self,
+        path,
+        data_type,
+        volume_size,
+        chunk_size=(64, 64, 64),
+        voxel_offset=(0, 0, 0),
+        num_res=1,
+        factor=(2, 2, 1),
+        overwrite=False,
+    ):
+        """
+        Creates a Zarr or N5 store with one array per resolution level.
+
+        Args:
+            path (str): Directory of the store, relative to the configured root.
+                N5 is used if it ends with ".n5".
+            data_type (str): e.g. "uint8", "uint16", "uint64", "float32"
+            volume_size (tuple[int]): XYZ extent of resolution 0.
+            chunk_size (tuple[int]): XYZ chunk size of every level.
+            voxel_offset (tuple[int]): XYZ coordinates of the first voxel of resolution 0.
+            num_res (int): Number of resolution levels.
+            factor (tuple[int]): XYZ downsampling factor between levels.
+            overwrite (bool): Replace an existing store at path.
+
+        Returns:
+            ZarrResource
+        """
+        return self._project.create_volume(
+            self._path(path), data_type, volume_size, chunk_size, voxel_offset,
+            num_res, factor, overwrite)
+
+    def get_cutout(self, resource, res, x_range, y_range, z_range, parallel=True):
+        """
+        Method to read a cutout of data
+        Args:
+            resource (ZarrResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+            parallel (Union[int, bool]: True): Number of threads reading chunks.
+        Returns:
+            data (numpy array) : ZYX array of the region
+        """
+        return self._volume.get_cutout(resource, res, x_range, y_range, z_range, parallel)
+
+    def create_cutout(self, resource, res, x_range, y_range, z_range, data, parallel=True):
+        """
+        Method to write a cutout of data
+        Args:
+            resource (ZarrResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+            data (numpy array) : ZYX array of the region
+            parallel (Union[int, bool]: True): Number of threads writing chunks.
+        Returns:
+            None
+        """
+        return self._volume.create_cutout(
+            resource, res, x_range, y_range, z_range, data, parallel)
+
+    def get_cutout_chunking(self, resource, res):
+        """
+        Get the chunk grid of a Zarr resource at a resolution level.
+
+        Args:
+            resource (ZarrResource object)
+            res (int): resolution level
+
+        Returns:
+            tuple: (chunk_size, voxel_offset), both in XYZ order
+        """
+        return self._metadata.get_chunking(resource, res)
+
+    def get_extents(self, resource, res=0):
+        """
+        Gets extents of a Zarr resource
+        Args:
+            resource (ZarrResource object)
+            res (int): resolution level
+        Returns:
+            extents (list): [[x-min, x-max], [y-min, y-max], [z-min, z-max]]
+        """
+        return self._metadata.get_extents(resource, res)
+
+    def list_res(self, resource):
+        """
+        What resolution(s) are available to read and write to in the resource.
+
+        Args:
+            resource (ZarrResource object)
+
+        Returns:
+            list: list of ints denoting resolution levels
+        """
+        return self._metadata.list_res(resource)
@@ -0,0 +1,104 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    import zarr
+    from intern.remote.zarr import ZarrRemote
+    HAS_ZARR = True
+except ImportError:
+    HAS_ZARR = False
+
+import numpy as np
+import shutil
+import tempfile
+import unittest
+import warnings
+
+
+@unittest.skipIf(not HAS_ZARR, "zarr not installed. Skipping test.")
+class TestZarrRemote(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.remote = ZarrRemote({"root": self.root})
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _roundtrip(self, path, dtype, parallel):
+        resource = self.remote.create_resource(
+            path, dtype, (100, 80, 40), chunk_size=(32, 32, 16), voxel_offset=(10, 0, 5))
+        data = np.random.randint(0, 200, (30, 70, 85)).astype(dtype)
+
+        # Unaligned, so the edge chunks are only partly written.
+        self.remote.create_cutout(resource, 0, [13, 98], [5, 75], [7, 37], data, parallel=parallel)
+
+        cutout = self.remote.get_cutout(
+            resource, 0, [13, 98], [5, 75], [7, 37], parallel=parallel)
+        np.testing.assert_array_equal(data, cutout)
+        cutout = self.remote.get_cutout(resource, 0, [20, 52], [10, 42], [10, 26])
+        np.testing.assert_array_equal(data[3:19, 5:37, 7:39], cutout)
+
+    def test_cutout_uint8(self):
+        self._roundtrip("uint8.zarr", "uint8", True)
+
+    def test_cutout_uint64_serial(self):
+        self._roundtrip("uint64.zarr", "uint64", False)
+
+    def test_cutout_threads(self):
+        self._roundtrip("threads.zarr", "uint16", 3)
+
+    def test_cutout_n5(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            self._roundtrip("volume.n5", "uint16", True)
+
+    def test_metadata(self):
+        resource = self.remote.create_resource(
+            "meta.zarr", "uint8", (100, 80, 40), chunk_size=(32, 32, 16),
+            voxel_offset=(10, 0, 4), num_res=3)
+
+        self.assertEqual([0, 1, 2], self.remote.list_res(resource))
+        self.assertEqual([[10, 110], [0, 80], [4, 44]], self.remote.get_extents(resource))
+        self.assertEqual([[2, 27], [0, 20], [4, 44]], self.remote.get_extents(resource, 2))
+        self.assertEqual(((32, 32, 16), (5, 0, 4)), self.remote.get_cutout_chunking(resource, 1))
+
+    def test_get_resource(self):
+        self.remote.create_resource("existing.zarr", "uint8", (64, 64, 16))
+
+        resource = self.remote.get_resource("existing.zarr", mode="r")
+
+        self.assertEqual((16, 64, 64), resource.array(0).shape)
+        with self.assertRaises(KeyError):
+            resource.array(1)
+
+    def test_single_array(self):
+        zarr.open(self.root + "/plain.zarr", mode="w", shape=(8, 16, 32), chunks=(4, 8, 8), dtype="uint8")
+
+        resource = self.remote.get_resource("plain.zarr")
+
+        self.assertEqual([0], self.remote.list_res(resource))
+        self.assertEqual([[0, 32], [0, 16], [0, 8]], self.remote.get_extents(resource))
+
+    def test_out_of_bounds(self):
+        resource = self.remote.create_resource(
+            "bounds.zarr", "uint8", (64, 64, 16), voxel_offset=(10, 0, 0))
+        with self.assertRaises(ValueError):
+            self.remote.get_cutout(resource, 0, [0, 20], [0, 10], [0, 10])
+        with self.assertRaises(ValueError):
+            self.remote.create_cutout(
+                resource, 0, [10, 20], [0, 10], [0, 10], np.zeros((10, 10, 5), np.uint8))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 from intern.resource import Resource
-from cloudvolume import CloudVolume, Vec
 
 import numpy as np
 from os import path
@@ -66,6 +65,9 @@ class CloudVolumeResource(Resource):
                 )
             )
 
+        # Imported here so that importing intern.remote.cv stays cheap.
+        from cloudvolume import CloudVolume
+
         self.url = protokey + cloudpath
         self.cloudvolume = CloudVolume(
             self.url, mip=mip, info=info, parallel=parallel, cache=cache, **kwargs
@@ -0,0 +1,152 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.resource import Resource
+
+import json
+import os
+import threading
+
+import numpy as np
+
+# Version of the info.json layout written by LocalRemote.create_resource.
+LOCAL_FORMAT = 1
+INFO_FILE = "info.json"
+
+
+class LocalResource(Resource):
+
+    """
+    A volume stored as one memory-mapped file per resolution level.
+
+    The volume's directory holds an "info.json" sidecar and the ZYX array of
+    each level, either as a .npy file or as a raw C-order file whose dtype and
+    shape are given by the sidecar:
+
+        {
+            "format": 1,
+            "data_type": "uint8",
+            "voxel_unit": "nanometers",
+            "chunk_size": [64, 64, 64],
+            "scales": [
+                {"file": "0.npy", "size": [x, y, z],
+                 "voxel_offset": [x, y, z], "voxel_size": [x, y, z]},
+                ...
+            ]
+        }
+
+    Sizes, offsets and voxel sizes are in XYZ order. `chunk_size` is the
+    block size used to split transfers; the files themselves are not chunked.
+    """
+
+    def __init__(self, path, mode="r+"):
+        """
+        Opens a volume written by LocalRemote.create_resource.
+
+        Args:
+            path (str): Directory of the volume.
+            mode (str): "r" for read only, "r+" to read and write.
+
+        Raises:
+            ValueError if the directory's info.json is not one this version can read.
+        """
+        Resource.__init__(self)
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        with open(os.path.join(self.path, INFO_FILE)) as fp:
+            self.info = json.load(fp)
+        if self.info.get("format") != LOCAL_FORMAT:
+            raise ValueError("{} is not a local volume this version can read.".format(self.path))
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def valid_volume(self):
+        """Returns True if resource is something that can access the volume service.
+        Args:
+        Returns:
+            (bool) : True if calls to volume service may be made.
+        """
+        return True
+
+    @property
+    def data_type(self):
+        return self.info["data_type"]
+
+    def list_res(self):
+        """
+        Returns:
+            (list[int]): The resolution levels of the volume.
+        """
+        return list(range(len(self.info["scales"])))
+
+    def scale(self, res):
+        """
+        Args:
+            res (int): Resolution level.
+
+        Returns:
+            (dict): The sidecar's description of that level.
+
+        Raises:
+            KeyError if the volume has no such level.
+        """
+        if not 0 <= res < len(self.info["scales"]):
+            raise KeyError("{} has no resolution {}.".format(self.path, res))
+        return self.info["scales"][res]
+
+    def array(self, res):
+        """
+        Args:
+            res (int): Resolution level.
+
+        Returns:
+            (numpy.memmap): The array of that level, in ZYX order. Maps are
+                opened once and shared.
+
+        Raises:
+            KeyError if the volume has no such level.
+        """
+        with self._lock:
+            if res not in self._arrays:
+                scale = self.scale(res)
+                filename = os.path.join(self.path, scale["file"])
+                if filename.endswith(".npy"):
+                    array = np.load(filename, mmap_mode=self.mode)
+                else:
+                    array = np.memmap(
+                        filename, dtype=self.data_type, mode=self.mode,
+                        shape=tuple(scale["size"][::-1]))
+                self._arrays[res] = array
+            return self._arrays[res]
+
+    def voxel_offset(self, res):
+        """
+        Returns:
+            (tuple[int]): XYZ coordinates of the first voxel of a level.
+        """
+        return tuple(int(o) for o in self.scale(res).get("voxel_offset", (0, 0, 0)))
+
+    def voxel_size(self, res):
+        """
+        Returns:
+            (tuple[float]): XYZ size of the voxels of a level, in `info["voxel_unit"]`.
+        """
+        return tuple(self.scale(res).get("voxel_size", (1, 1, 1)))
+
+    def flush(self):
+        """Write changes made through the maps back to their files."""
+        with self._lock:
+            arrays = list(self._arrays.values())
+        for array in arrays:
+            array.flush()
@@ -0,0 +1,97 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.resource import Resource
+
+import os
+
+
+class ZarrResource(Resource):
+
+    """
+    A volume in a local Zarr or N5 store.
+
+    Resolution levels are the arrays "0", "1", ... of a group (or "s0", "s1",
+    ... in N5 stores), or a single array holding resolution 0. Arrays are
+    stored in ZYX order, and the XYZ voxel offset of each level is kept in its
+    "voxel_offset" attribute.
+    """
+
+    def __init__(self, path, mode="r+"):
+        """
+        Opens a Zarr store, or an N5 store if the path ends with ".n5".
+
+        Args:
+            path (str): Directory of the store.
+            mode (str): "r" for read only, "r+" to read and write.
+        """
+        Resource.__init__(self)
+
+        # Imported here so that zarr stays an optional dependency.
+        import zarr
+
+        self.path = os.path.expanduser(path)
+        if self.path.rstrip("/").endswith(".n5"):
+            store = zarr.N5Store(self.path)
+        else:
+            store = zarr.DirectoryStore(self.path)
+        self.node = zarr.open(store, mode=mode)
+
+    def valid_volume(self):
+        """Returns True if resource is something that can access the volume service.
+        Args:
+        Returns:
+            (bool) : True if calls to volume service may be made.
+        """
+        return True
+
+    def list_res(self):
+        """
+        Returns:
+            (list[int]): The resolution levels in the store.
+        """
+        if not hasattr(self.node, "array_keys"):
+            return [0]
+        names = set(self.node.array_keys())
+        res = 0
+        while str(res) in names or "s{}".format(res) in names:
+            res += 1
+        return list(range(res))
+
+    def array(self, res):
+        """
+        Args:
+            res (int): Resolution level.
+
+        Returns:
+            (zarr.Array): The array of that level, in ZYX order.
+
+        Raises:
+            KeyError if the store has no such level.
+        """
+        if not hasattr(self.node, "array_keys"):
+            if res != 0:
+                raise KeyError("{} only holds resolution 0.".format(self.path))
+            return self.node
+        for name in (str(res), "s{}".format(res)):
+            if name in self.node:
+                return self.node[name]
+        raise KeyError("{} has no resolution {}.".format(self.path, res))
+
+    def voxel_offset(self, res):
+        """
+        Returns:
+            (tuple[int]): XYZ coordinates of the first voxel of a level.
+        """
+        return tuple(int(o) for o in self.array(res).attrs.get("voxel_offset", (0, 0, 0)))
@@ -0,0 +1,317 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A local, searchable index of Boss resources.
+
+A ResourceCatalog is a SQLite file holding the collections, experiments,
+channels and coordinate frames of a Boss, as returned by
+`BossRemote.walk_resources`. Searches run against the file, without any
+network requests:
+
+    with ResourceCatalog("~/.intern/catalog.sqlite") as catalog:
+        rmt.refresh_catalog(catalog, max_age=24 * 3600)
+        chans = catalog.find_channels(name="*synapse*", datatype="uint64",
+                                      min_extent=(10000, 10000, 100))
+
+Refreshes are incremental: each collection remembers when it was last
+crawled, and only new or stale collections are crawled again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS collections ("
+    " name TEXT PRIMARY KEY, refreshed_at REAL NOT NULL, raw TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS experiments ("
+    " collection TEXT NOT NULL, name TEXT NOT NULL, coord_frame TEXT, raw TEXT NOT NULL,"
+    " PRIMARY KEY (collection, name))",
+    "CREATE TABLE IF NOT EXISTS channels ("
+    " collection TEXT NOT NULL, experiment TEXT NOT NULL, name TEXT NOT NULL,"
+    " type TEXT, datatype TEXT, raw TEXT NOT NULL,"
+    " PRIMARY KEY (collection, experiment, name))",
+    "CREATE TABLE IF NOT EXISTS coordinate_frames ("
+    " name TEXT PRIMARY KEY,"
+    " x_extent INTEGER, y_extent INTEGER, z_extent INTEGER,"
+    " x_voxel_size REAL, y_voxel_size REAL, z_voxel_size REAL, voxel_unit TEXT,"
+    " raw TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS channels_name ON channels (name)",
+    "CREATE INDEX IF NOT EXISTS channels_datatype ON channels (datatype)",
+]
+
+
+class ResourceCatalog(object):
+    """SQLite index of the resources of a Boss.
+
+    Resources returned by the find methods are fully populated, rebuilt from
+    the JSON the Boss returned when they were crawled.
+    """
+
+    def __init__(self, path):
+        """Constructor.
+
+        Args:
+            path (str): SQLite file to use. Created if it doesn't exist.
+                ":memory:" keeps the catalog in memory.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path if path == ":memory:" else os.path.expanduser(path),
+            check_same_thread=False, isolation_level=None)
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def refreshed_at(self):
+        """
+        Returns:
+            (dict): Time each collection was last crawled, in seconds since the epoch, by name.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT name, refreshed_at FROM collections").fetchall()
+        return dict(rows)
+
+    def stale_collections(self, names, max_age=None):
+        """Collections that a refresh should crawl.
+
+        Args:
+            names (list[str]): Names of the collections on the Boss.
+            max_age (optional[float]): Seconds a crawled collection stays fresh.
+                Defaults to forever, so only new collections are stale.
+
+        Returns:
+            (list[str]): The collections in `names` that are new or older than max_age.
+        """
+        refreshed = self.refreshed_at()
+        now = time.time()
+        return [
+            name for name in names
+            if name not in refreshed or (max_age is not None and now - refreshed[name] >= max_age)
+        ]
+
+    def update(self, snapshot, collections=None):
+        """Replace the catalog's contents with a snapshot's.
+
+        Args:
+            snapshot (intern.service.boss.snapshot.ResourceSnapshot): Resources crawled.
+            collections (optional[list[str]]): Collections the snapshot was
+                crawled for. Only these collections are replaced, and the others
+                are kept. Defaults to all: collections missing from the snapshot
+                are removed. Coordinate frames are always replaced.
+        """
+        if collections is not None:
+            collections = list(collections)
+
+        def _delete(table, column):
+            if collections is None:
+                self._conn.execute("DELETE FROM {}".format(table))
+            else:
+                self._conn.executemany(
+                    "DELETE FROM {} WHERE {} = ?".format(table, column),
+                    [(name,) for name in collections])
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                _delete("collections", "name")
+                _delete("experiments", "collection")
+                _delete("channels", "collection")
+                self._conn.execute("DELETE FROM coordinate_frames")
+
+                self._conn.executemany(
+                    "INSERT INTO collections VALUES (?, ?, ?)",
+                    [(c.name, snapshot.taken_at, json.dumps(c.raw)) for c in snapshot.collections])
+                self._conn.executemany(
+                    "INSERT INTO experiments VALUES (?, ?, ?, ?)",
+                    [(e.coll_name, e.name, e.coord_frame, json.dumps(e.raw))
+                     for e in snapshot.experiments])
+                self._conn.executemany(
+                    "INSERT INTO channels VALUES (?, ?, ?, ?, ?, ?)",
+                    [(c.coll_name, c.exp_name, c.name, c.type, c.datatype, json.dumps(c.raw))
+                     for c in snapshot.channels])
+                self._conn.executemany(
+                    "INSERT INTO coordinate_frames VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(cf.name,
+                      cf.x_stop - cf.x_start, cf.y_stop - cf.y_start, cf.z_stop - cf.z_start,
+                      cf.x_voxel_size, cf.y_voxel_size, cf.z_voxel_size, cf.voxel_unit,
+                      json.dumps(cf.raw))
+                     for cf in snapshot.coordinate_frames])
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def find_channels(
+        self,
+        name=None,
+        datatype=None,
+        type=None,
+        collection=None,
+        experiment=None,
+        min_extent=None,
+        max_extent=None,
+        voxel_size=None,
+        voxel_unit=None,
+    ):
+        """Search the catalog's channels.
+
+        Extents and voxel sizes are those of the coordinate frame of the
+        channel's experiment. Criteria left as None match everything.
+
+        Args:
+            name (optional[str]): Channel name, with shell-style wildcards (`*`, `?`).
+            datatype (optional[str]): Such as 'uint8' or 'uint64'.
+            type (optional[str]): 'image' or 'annotation'.
+            collection (optional[str]): Name of the parent collection.
+            experiment (optional[str]): Name of the parent experiment.
+            min_extent (optional[Tuple[int, int, int]]): Smallest XYZ size of the frame, in voxels.
+            max_extent (optional[Tuple[int, int, int]]): Largest XYZ size of the frame, in voxels.
+            voxel_size (optional[Tuple[float, float, float]]): XYZ voxel size of the frame.
+            voxel_unit (optional[str]): Such as 'nanometers'.
+
+        Returns:
+            (list[ChannelResource]): Sorted by collection, experiment and name.
+        """
+        clauses, args = [], []
+        for column, value in (
+            ("c.datatype", datatype), ("c.type", type), ("c.collection", collection),
+            ("c.experiment", experiment), ("f.voxel_unit", voxel_unit),
+        ):
+            if value is not None:
+                clauses.append("{} = ?".format(column))
+                args.append(value)
+        if name is not None:
+            clauses.append("c.name GLOB ?")
+            args.append(name)
+        _frame_clauses("f", min_extent, max_extent, voxel_size, clauses, args)
+
+        sql = (
+            "SELECT c.collection, c.experiment, c.raw FROM channels c"
+            " LEFT JOIN experiments e ON e.collection = c.collection AND e.name = c.experiment"
+            " LEFT JOIN coordinate_frames f ON f.name = e.coord_frame"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY c.collection, c.experiment, c.name"
+
+        project = _project()
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [project._get_channel(json.loads(raw), coll, exp) for coll, exp, raw in rows]
+
+    def find_experiments(self, name=None, collection=None, coord_frame=None,
+                         min_extent=None, max_extent=None, voxel_size=None):
+        """Search the catalog's experiments.
+
+        Args:
+            name (optional[str]): Experiment name, with shell-style wildcards (`*`, `?`).
+            collection (optional[str]): Name of the parent collection.
+            coord_frame (optional[str]): Name of the coordinate frame.
+            min_extent (optional[Tuple[int, int, int]]): Smallest XYZ size of the frame, in voxels.
+            max_extent (optional[Tuple[int, int, int]]): Largest XYZ size of the frame, in voxels.
+            voxel_size (optional[Tuple[float, float, float]]): XYZ voxel size of the frame.
+
+        Returns:
+            (list[ExperimentResource]): Sorted by collection and name.
+        """
+        clauses, args = [], []
+        for column, value in (("e.collection", collection), ("e.coord_frame", coord_frame)):
+            if value is not None:
+                clauses.append("{} = ?".format(column))
+                args.append(value)
+        if name is not None:
+            clauses.append("e.name GLOB ?")
+            args.append(name)
+        _frame_clauses("f", min_extent, max_extent, voxel_size, clauses, args)
+
+        sql = (
+            "SELECT e.collection, e.raw FROM experiments e"
+            " LEFT JOIN coordinate_frames f ON f.name = e.coord_frame"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.collection, e.name"
+
+        project = _project()
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [project._get_experiment(json.loads(raw), coll) for coll, raw in rows]
+
+    def find_coordinate_frames(self, name=None, min_extent=None, max_extent=None,
+                               voxel_size=None, voxel_unit=None):
+        """Search the catalog's coordinate frames.
+
+        Args:
+            name (optional[str]): Frame name, with shell-style wildcards (`*`, `?`).
+            min_extent (optional[Tuple[int, int, int]]): Smallest XYZ size, in voxels.
+            max_extent (optional[Tuple[int, int, int]]): Largest XYZ size, in voxels.
+            voxel_size (optional[Tuple[float, float, float]]): XYZ voxel size.
+            voxel_unit (optional[str]): Such as 'nanometers'.
+
+        Returns:
+            (list[CoordinateFrameResource]): Sorted by name.
+        """
+        clauses, args = [], []
+        if name is not None:
+            clauses.append("f.name GLOB ?")
+            args.append(name)
+        if voxel_unit is not None:
+            clauses.append("f.voxel_unit = ?")
+            args.append(voxel_unit)
+        _frame_clauses("f", min_extent, max_extent, voxel_size, clauses, args)
+
+        sql = "SELECT f.raw FROM coordinate_frames f"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY f.name"
+
+        project = _project()
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [project._get_coordinate(json.loads(raw)) for raw, in rows]
+
+
+def _frame_clauses(table, min_extent, max_extent, voxel_size, clauses, args):
+    """Add the WHERE clauses matching a coordinate frame's extent and voxel size."""
+    for axis, i in (("x", 0), ("y", 1), ("z", 2)):
+        if min_extent is not None:
+            clauses.append("{}.{}_extent >= ?".format(table, axis))
+            args.append(min_extent[i])
+        if max_extent is not None:
+            clauses.append("{}.{}_extent <= ?".format(table, axis))
+            args.append(max_extent[i])
+        if voxel_size is not None:
+            clauses.append("{}.{}_voxel_size = ?".format(table, axis))
+            args.append(voxel_size[i])
+
+
+def _project():
+    # Resources are rebuilt from the Boss' JSON the same way the project
+    # service builds them from a response.
+    from intern.service.boss.v1.project import ProjectService_1
+    return ProjectService_1()
+
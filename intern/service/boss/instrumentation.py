@@ -0,0 +1,227 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Instrumentation of the Boss volume service.
+
+Listeners registered on an Instrumentation object receive one RequestEvent
+for every HTTP request made for a cutout, and one CutoutEvent summarizing
+each get_cutout, create_cutout or create_cutout_to_black call:
+
+    rmt = BossRemote(...)
+    rmt.add_instrumentation_listener(print)
+
+requests does not expose DNS and TLS timings separately, so a request's time
+is split into `server_seconds` (from sending the request until the response
+headers arrived: connection setup, upload and server time), `transfer_seconds`
+(downloading the body) and `codec_seconds` (blosc compression or decompression).
+
+Listeners are called on the thread that made the request. Requests made by
+multiprocessing workers are buffered in the worker and replayed in the parent
+when the worker's chunk comes back. Worker threads count their requests
+towards the caller's cutout with `counting_towards`.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+import threading
+import time
+
+RequestEvent = namedtuple("RequestEvent", [
+    "method",           # HTTP verb
+    "url",
+    "status_code",
+    "bytes_sent",       # request body size, compressed
+    "bytes_received",   # response body size, compressed
+    "raw_bytes",        # uncompressed size of the cuboid sent or received
+    "server_seconds",   # until the response headers arrived
+    "transfer_seconds", # downloading the response body
+    "codec_seconds",    # blosc compression or decompression
+    "total_seconds",
+    "retries",          # retries made by the session's urllib3 adapter
+])
+
+CutoutEvent = namedtuple("CutoutEvent", [
+    "operation",        # "get_cutout", "create_cutout" or "create_cutout_to_black"
+    "resource",         # cutout route of the channel
+    "resolution",
+    "x_range",
+    "y_range",
+    "z_range",
+    "requests",
+    "bytes_sent",
+    "bytes_received",
+    "raw_bytes",
+    "compression_ratio", # raw bytes per compressed byte, None if nothing was compressed
+    "seconds",
+    "codec_seconds",
+    "reassembly_seconds", # copying downloaded chunks into the result
+    "retries",
+    "error",            # the exception raised by the call, or None
+])
+
+
+class Instrumentation(object):
+    """Collects request timings and dispatches events to listeners.
+
+    Attributes:
+        listeners (list[callable]): Called with each RequestEvent and CutoutEvent.
+    """
+
+    def __init__(self):
+        self.listeners = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._buffer = None
+
+    def __getstate__(self):
+        # Sent to multiprocessing workers: listeners stay in the parent, and
+        # the worker buffers its events until they are collected with drain().
+        return {"listeners": [], "_buffer": []}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Call `callback(event)` for every event."""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def emit(self, event):
+        """Send an event to the listeners, or buffer it in a worker process."""
+        if self._buffer is not None:
+            self._buffer.append(event)
+            return
+        for listener in list(self.listeners):
+            listener(event)
+
+    def drain(self):
+        """Return and clear the events buffered in a worker process."""
+        events, self._buffer = self._buffer, []
+        return events
+
+    def replay(self, events):
+        """Emit events collected from a worker, and count them towards the current cutout."""
+        for event in events or []:
+            self._count(event)
+            self.emit(event)
+
+    @contextmanager
+    def cutout(self, operation, resource, resolution, x_range, y_range, z_range):
+        """Summarize the requests made inside the block as one CutoutEvent.
+
+        Nested calls (such as the per-chunk recursion of get_cutout) are
+        counted towards the outermost one.
+        """
+        if self._buffer is not None or getattr(self._local, "summary", None) is not None:
+            yield
+            return
+
+        summary = self._local.summary = {
+            "requests": 0, "bytes_sent": 0, "bytes_received": 0, "raw_bytes": 0,
+            "compressed_bytes": 0, "codec_seconds": 0.0, "reassembly_seconds": 0.0,
+            "retries": 0,
+        }
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._local.summary = None
+            compressed = summary.pop("compressed_bytes")
+            self.emit(CutoutEvent(
+                operation=operation,
+                resource=resource.get_cutout_route(),
+                resolution=resolution,
+                x_range=list(x_range), y_range=list(y_range), z_range=list(z_range),
+                compression_ratio=summary["raw_bytes"] / compressed if compressed else None,
+                seconds=time.perf_counter() - start,
+                error=error,
+                **summary
+            ))
+
+    def current_cutout(self):
+        """The summary of the cutout in progress on this thread, or None.
+
+        Hand it to `counting_towards` on worker threads.
+        """
+        return getattr(self._local, "summary", None)
+
+    @contextmanager
+    def counting_towards(self, summary):
+        """Count the requests made in the block, on a worker thread, towards another thread's cutout."""
+        self._local.summary = summary
+        try:
+            yield
+        finally:
+            self._local.summary = None
+
+    @contextmanager
+    def reassembly(self):
+        """Count the time spent in the block as reassembly of the current cutout."""
+        start = time.perf_counter()
+        yield
+        summary = getattr(self._local, "summary", None)
+        if summary is not None:
+            with self._lock:
+                summary["reassembly_seconds"] += time.perf_counter() - start
+
+    def request(self, prep, resp, total_seconds, raw_bytes=0, codec_seconds=0.0):
+        """Record one HTTP request.
+
+        Args:
+            prep (requests.PreparedRequest): The request sent.
+            resp (requests.Response): Its response, with the body already read.
+            total_seconds (float): Time spent in session.send().
+            raw_bytes (optional[int]): Uncompressed size of the data sent or received.
+            codec_seconds (optional[float]): Time spent compressing or decompressing.
+        """
+        server_seconds = resp.elapsed.total_seconds()
+        retries = getattr(getattr(resp.raw, "retries", None), "history", None) or ()
+        event = RequestEvent(
+            method=prep.method,
+            url=prep.url,
+            status_code=resp.status_code,
+            bytes_sent=len(prep.body) if prep.body else 0,
+            bytes_received=len(resp.content) if resp.content else 0,
+            raw_bytes=raw_bytes,
+            server_seconds=server_seconds,
+            transfer_seconds=max(0.0, total_seconds - server_seconds),
+            codec_seconds=codec_seconds,
+            total_seconds=total_seconds + codec_seconds,
+            retries=len(retries),
+        )
+        self._count(event)
+        self.emit(event)
+
+    def _count(self, event):
+        summary = getattr(self._local, "summary", None)
+        if summary is None:
+            return
+        with self._lock:
+            summary["requests"] += 1
+            summary["bytes_sent"] += event.bytes_sent
+            summary["bytes_received"] += event.bytes_received
+            summary["raw_bytes"] += event.raw_bytes
+            if event.raw_bytes:
+                summary["compressed_bytes"] += event.bytes_sent + event.bytes_received
+            summary["codec_seconds"] += event.codec_seconds
+            summary["retries"] += event.retries
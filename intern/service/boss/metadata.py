@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from intern.service.boss import BossService
-from intern.service.boss.v1.metadata import MetadataService_1
+from intern.service.boss.v1.metadata import MetadataService_1, METADATA_PARALLEL
 
 
 class MetadataService(BossService):
@@ -119,3 +119,62 @@ class MetadataService(BossService):
         self.service.delete(
             resource, keys, self.url_prefix, self.auth, self.session,
             self.session_send_opts)
+
+    def create_bulk(self, resources_keys_vals, max_workers=METADATA_PARALLEL):
+        """Create key-value pairs for many resources, sending several requests at once.
+
+        Args:
+            resources_keys_vals (list[tuple]): (resource, keys_vals dictionary) pairs.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.service.create_bulk(
+            resources_keys_vals, self.url_prefix, self.auth, self.session,
+            self.session_send_opts, max_workers)
+
+    def get_bulk(self, resources_keys, max_workers=METADATA_PARALLEL):
+        """Get metadata of many resources, sending several requests at once.
+
+        Args:
+            resources_keys (list[tuple]): (resource, keys list) pairs.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (list[dictionary]): The requested metadata of each resource, in the given order.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        return self.service.get_bulk(
+            resources_keys, self.url_prefix, self.auth, self.session,
+            self.session_send_opts, max_workers)
+
+    def update_bulk(self, resources_keys_vals, max_workers=METADATA_PARALLEL):
+        """Update key-value pairs of many resources, sending several requests at once.
+
+        Args:
+            resources_keys_vals (list[tuple]): (resource, keys_vals dictionary) pairs.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.service.update_bulk(
+            resources_keys_vals, self.url_prefix, self.auth, self.session,
+            self.session_send_opts, max_workers)
+
+    def delete_bulk(self, resources_keys, max_workers=METADATA_PARALLEL):
+        """Delete metadata of many resources, sending several requests at once.
+
+        Args:
+            resources_keys (list[tuple]): (resource, keys list) pairs.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        self.service.delete_bulk(
+            resources_keys, self.url_prefix, self.auth, self.session,
+            self.session_send_opts, max_workers)
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from intern.service.boss import BossService
-from intern.service.boss.v1.project import ProjectService_1
+from intern.service.boss.v1.project import ProjectService_1, WALK_PARALLEL
 
 
 class ProjectService(BossService):
@@ -401,6 +401,24 @@ class ProjectService(BossService):
             resource, self.url_prefix, self.auth, self.session,
             self.session_send_opts)
 
+    def walk(self, collections=None, max_workers=WALK_PARALLEL):
+        """Get every collection, experiment, channel and coordinate frame, several requests at once.
+
+        Args:
+            collections (optional[list[string]]): Names of the collections to walk. Defaults to all.
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (dict): Lists of fully populated resources, keyed by 'collections',
+                'experiments', 'channels' and 'coordinate_frames'.
+
+        Raises:
+            requests.HTTPError on failure.
+        """
+        return self.service.walk(
+            collections, self.url_prefix, self.auth, self.session,
+            self.session_send_opts, max_workers)
+
     def create(self, resource):
         """Create the given resource.
 
@@ -0,0 +1,169 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Snapshots of the Boss resource tree.
+
+A ResourceSnapshot holds the fully populated collections, experiments,
+channels and coordinate frames returned by `BossRemote.walk_resources`, and
+answers the same lookups as the remote's list and get calls without any
+network requests. Snapshots can be saved to and loaded from a JSON file.
+"""
+
+import json
+import os
+import time
+
+SNAPSHOT_FORMAT = 1
+
+
+class ResourceSnapshot(object):
+    """The resources of a Boss, as of one moment.
+
+    Attributes:
+        collections (list[CollectionResource])
+        experiments (list[ExperimentResource])
+        channels (list[ChannelResource])
+        coordinate_frames (list[CoordinateFrameResource])
+        taken_at (float): Time the snapshot was taken, in seconds since the epoch.
+    """
+
+    def __init__(self, collections, experiments, channels, coordinate_frames, taken_at=None):
+        self.collections = list(collections)
+        self.experiments = list(experiments)
+        self.channels = list(channels)
+        self.coordinate_frames = list(coordinate_frames)
+        self.taken_at = time.time() if taken_at is None else taken_at
+
+        self._collections = {c.name: c for c in self.collections}
+        self._experiments = {(e.coll_name, e.name): e for e in self.experiments}
+        self._channels = {(c.coll_name, c.exp_name, c.name): c for c in self.channels}
+        self._coordinate_frames = {cf.name: cf for cf in self.coordinate_frames}
+
+    def __repr__(self):
+        return "<ResourceSnapshot: {} collections, {} experiments, {} channels, {} coordinate frames>".format(
+            len(self.collections), len(self.experiments), len(self.channels),
+            len(self.coordinate_frames))
+
+    def list_collections(self):
+        """
+        Returns:
+            (list[string]): Names of all collections.
+        """
+        return [c.name for c in self.collections]
+
+    def list_experiments(self, collection_name):
+        """
+        Returns:
+            (list[string]): Names of the experiments of a collection.
+        """
+        return [e.name for e in self.experiments if e.coll_name == collection_name]
+
+    def list_channels(self, collection_name, experiment_name):
+        """
+        Returns:
+            (list[string]): Names of the channels of an experiment.
+        """
+        return [
+            c.name for c in self.channels
+            if c.coll_name == collection_name and c.exp_name == experiment_name
+        ]
+
+    def list_coordinate_frames(self):
+        """
+        Returns:
+            (list[string]): Names of all coordinate frames.
+        """
+        return [cf.name for cf in self.coordinate_frames]
+
+    def get_collection(self, name):
+        """
+        Raises:
+            KeyError if the snapshot has no such collection.
+        """
+        return self._collections[name]
+
+    def get_experiment(self, coll_name, exp_name):
+        """
+        Raises:
+            KeyError if the snapshot has no such experiment.
+        """
+        return self._experiments[(coll_name, exp_name)]
+
+    def get_channel(self, chan_name, coll_name, exp_name):
+        """
+        Raises:
+            KeyError if the snapshot has no such channel.
+        """
+        return self._channels[(coll_name, exp_name, chan_name)]
+
+    def get_coordinate_frame(self, name):
+        """
+        Raises:
+            KeyError if the snapshot has no such coordinate frame.
+        """
+        return self._coordinate_frames[name]
+
+    def save(self, path):
+        """Write the snapshot to a JSON file, replacing it atomically."""
+        path = os.path.expanduser(path)
+        doc = {
+            "format": SNAPSHOT_FORMAT,
+            "taken_at": self.taken_at,
+            "collections": [c.raw for c in self.collections],
+            "experiments": [
+                {"collection": e.coll_name, "raw": e.raw} for e in self.experiments
+            ],
+            "channels": [
+                {"collection": c.coll_name, "experiment": c.exp_name, "raw": c.raw}
+                for c in self.channels
+            ],
+            "coordinate_frames": [cf.raw for cf in self.coordinate_frames],
+        }
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp, "w") as fp:
+            json.dump(doc, fp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by `save`.
+
+        Raises:
+            ValueError if the file is not a snapshot this version can read.
+        """
+        # Resources are rebuilt from the Boss' JSON the same way the project
+        # service builds them from a response.
+        from intern.service.boss.v1.project import ProjectService_1
+
+        with open(os.path.expanduser(path)) as fp:
+            doc = json.load(fp)
+        if doc.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("{} is not a resource snapshot this version can read.".format(path))
+
+        project = ProjectService_1()
+        return cls(
+            [project._get_collection(raw) for raw in doc["collections"]],
+            [project._get_experiment(e["raw"], e["collection"]) for e in doc["experiments"]],
+            [
+                project._get_channel(c["raw"], c["collection"], c["experiment"])
+                for c in doc["channels"]
+            ],
+            [project._get_coordinate(raw) for raw in doc["coordinate_frames"]],
+            taken_at=doc["taken_at"],
+        )
+
+    def age(self):
+        """Seconds since the snapshot was taken."""
+        return time.time() - self.taken_at
@@ -0,0 +1,131 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.boss.catalog import ResourceCatalog
+from intern.service.boss.snapshot import ResourceSnapshot
+from intern.service.boss.v1.project import ProjectService_1
+import os
+import shutil
+import tempfile
+import unittest
+
+
+def make_snapshot(collections, taken_at=None):
+    """A snapshot of two frames and, per collection, one experiment on each frame
+    with an image and an annotation channel."""
+    prj = ProjectService_1()
+    colls, exps, chans = [], [], []
+    for coll in collections:
+        colls.append(prj._get_collection({'name': coll, 'description': '', 'creator': 'me'}))
+        for exp, frame in (('small_exp', 'small'), ('large_exp', 'large')):
+            exps.append(prj._get_experiment({
+                'name': exp, 'description': '', 'creator': 'me', 'coord_frame': frame,
+                'num_hierarchy_levels': 1, 'hierarchy_method': 'isotropic',
+                'num_time_samples': 1, 'time_step': 0, 'time_step_unit': 'seconds'}, coll))
+            for chan, chan_type, datatype in (('em', 'image', 'uint8'),
+                                              ('synapses', 'annotation', 'uint64')):
+                chans.append(prj._get_channel({
+                    'name': chan, 'description': '', 'creator': 'me',
+                    'default_time_sample': 0, 'datatype': datatype, 'base_resolution': 0,
+                    'type': chan_type, 'sources': [], 'related': [],
+                    'downsample_status': 'NOT_DOWNSAMPLED'}, coll, exp))
+    frames = [
+        prj._get_coordinate({
+            'name': 'small', 'description': '', 'x_start': 0, 'x_stop': 100,
+            'y_start': 0, 'y_stop': 100, 'z_start': 0, 'z_stop': 10,
+            'x_voxel_size': 4, 'y_voxel_size': 4, 'z_voxel_size': 40, 'voxel_unit': 'nanometers'}),
+        prj._get_coordinate({
+            'name': 'large', 'description': '', 'x_start': 1000, 'x_stop': 21000,
+            'y_start': 0, 'y_stop': 20000, 'z_start': 0, 'z_stop': 500,
+            'x_voxel_size': 8, 'y_voxel_size': 8, 'z_voxel_size': 40, 'voxel_unit': 'nanometers'}),
+    ]
+    return ResourceSnapshot(colls, exps, chans, frames, taken_at=taken_at)
+
+
+class TestResourceCatalog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'catalog.sqlite')
+        self.catalog = ResourceCatalog(self.path)
+        self.catalog.update(make_snapshot(['col1', 'col2'], taken_at=100))
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.dir)
+
+    def test_find_channels(self):
+        found = self.catalog.find_channels(datatype='uint64', collection='col1')
+
+        self.assertEqual(
+            [('col1', 'large_exp', 'synapses'), ('col1', 'small_exp', 'synapses')],
+            [(c.coll_name, c.exp_name, c.name) for c in found])
+        self.assertEqual('annotation', found[0].type)
+        self.assertEqual(8, len(self.catalog.find_channels()))
+
+    def test_find_channels_by_name(self):
+        self.assertEqual(4, len(self.catalog.find_channels(name='syn*')))
+        self.assertEqual(0, len(self.catalog.find_channels(name='syn')))
+
+    def test_find_channels_by_frame(self):
+        found = self.catalog.find_channels(min_extent=(10000, 10000, 100), type='image')
+        self.assertEqual(
+            [('col1', 'large_exp'), ('col2', 'large_exp')],
+            [(c.coll_name, c.exp_name) for c in found])
+
+        found = self.catalog.find_channels(max_extent=(100, 100, 10), voxel_size=(4, 4, 40))
+        self.assertEqual({'small_exp'}, {c.exp_name for c in found})
+
+        self.assertEqual([], self.catalog.find_channels(voxel_size=(1, 1, 1)))
+
+    def test_find_experiments(self):
+        found = self.catalog.find_experiments(coord_frame='large')
+        self.assertEqual([('col1', 'large_exp'), ('col2', 'large_exp')],
+                         [(e.coll_name, e.name) for e in found])
+        self.assertEqual(4, len(self.catalog.find_experiments(name='*_exp')))
+
+    def test_find_coordinate_frames(self):
+        found = self.catalog.find_coordinate_frames(min_extent=(20000, 20000, 1))
+        self.assertEqual(['large'], [cf.name for cf in found])
+        self.assertEqual(1000, found[0].x_start)
+        self.assertEqual(['small'], [cf.name for cf in self.catalog.find_coordinate_frames(
+            voxel_size=(4, 4, 40), voxel_unit='nanometers')])
+
+    def test_update_collections(self):
+        self.catalog.update(make_snapshot(['col2', 'col3'], taken_at=200),
+                            collections=['col2', 'col3'])
+
+        self.assertEqual({'col1': 100, 'col2': 200, 'col3': 200}, self.catalog.refreshed_at())
+        self.assertEqual(12, len(self.catalog.find_channels()))
+
+        self.catalog.update(make_snapshot([], taken_at=300), collections=['col1'])
+        self.assertEqual(['col2', 'col3'], sorted(self.catalog.refreshed_at()))
+        self.assertEqual([], self.catalog.find_channels(collection='col1'))
+
+    def test_update_all(self):
+        self.catalog.update(make_snapshot(['col3']))
+        self.assertEqual(['col3'], list(self.catalog.refreshed_at()))
+
+    def test_stale_collections(self):
+        self.assertEqual(['col3'], self.catalog.stale_collections(['col1', 'col3']))
+        self.assertEqual(['col1', 'col3'],
+                         self.catalog.stale_collections(['col1', 'col3'], max_age=60))
+
+    def test_reopen(self):
+        self.catalog.close()
+        self.catalog = ResourceCatalog(self.path)
+        self.assertEqual(8, len(self.catalog.find_channels()))
+
+
+if __name__ == '__main__':
+    unittest.main()
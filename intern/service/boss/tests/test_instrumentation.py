@@ -0,0 +1,165 @@
+# Copyright 2016 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.boss.instrumentation import Instrumentation, RequestEvent, CutoutEvent
+from intern.service.boss.v1.volume import VolumeService_1
+from intern.remote.boss import BossRemote
+from intern.resource.boss.resource import ChannelResource
+import blosc
+import datetime
+import numpy
+import pickle
+from requests import HTTPError, Response
+import unittest
+from mock import patch
+
+
+def _response(status_code, content=b""):
+    resp = Response()
+    resp.status_code = status_code
+    resp._content = content
+    resp.elapsed = datetime.timedelta(milliseconds=5)
+    return resp
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.vol = VolumeService_1()
+        self.vol.instrumentation = Instrumentation()
+        self.events = []
+        self.vol.instrumentation.add_listener(self.events.append)
+        self.chan = ChannelResource('chan', 'foo', 'bar', 'image', datatype='uint16')
+
+    def _requests(self):
+        return [e for e in self.events if isinstance(e, RequestEvent)]
+
+    def _cutouts(self):
+        return [e for e in self.events if isinstance(e, CutoutEvent)]
+
+    @patch('requests.Session', autospec=True)
+    def test_get_cutout_events(self, mock_session):
+        data = numpy.random.randint(0, 3000, (20, 20, 20), numpy.uint16)
+        compressed = blosc.compress(data, typesize=16)
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.return_value = _response(200, compressed)
+
+        self.vol.get_cutout(
+            self.chan, 0, [20, 40], [50, 70], [30, 50], None, [],
+            'https://api.theboss.io', 'mytoken', mock_session, {})
+
+        request, = self._requests()
+        self.assertEqual(request.method, 'GET')
+        self.assertEqual(request.status_code, 200)
+        self.assertEqual(request.bytes_received, len(compressed))
+        self.assertEqual(request.raw_bytes, data.nbytes)
+        self.assertAlmostEqual(request.server_seconds, 0.005)
+        self.assertEqual(request.retries, 0)
+
+        cutout, = self._cutouts()
+        self.assertEqual(cutout.operation, 'get_cutout')
+        self.assertEqual(cutout.resource, 'foo/bar/chan')
+        self.assertEqual(cutout.requests, 1)
+        self.assertEqual(cutout.raw_bytes, data.nbytes)
+        self.assertAlmostEqual(cutout.compression_ratio, data.nbytes / len(compressed))
+        self.assertIsNone(cutout.error)
+        self.assertIs(self.events[-1], cutout)
+
+    @patch('requests.Session', autospec=True)
+    def test_chunked_get_cutout_is_one_summary(self, mock_session):
+        chunk = numpy.zeros((8, 16, 16), numpy.uint16)
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.side_effect = lambda *args, **kwargs: _response(
+            200, blosc.compress(chunk, typesize=16))
+
+        self.vol.get_cutout(
+            self.chan, 0, [0, 32], [0, 32], [0, 16], None, [],
+            'https://api.theboss.io', 'mytoken', mock_session, {},
+            parallel=False, chunk_size=(16, 16, 8))
+
+        self.assertEqual(len(self._requests()), 8)
+        cutout, = self._cutouts()
+        self.assertEqual(cutout.requests, 8)
+        self.assertEqual(cutout.raw_bytes, 8 * chunk.nbytes)
+        self.assertEqual([cutout.x_range, cutout.y_range, cutout.z_range], [[0, 32], [0, 32], [0, 16]])
+        self.assertGreater(cutout.reassembly_seconds, 0)
+
+    @patch('requests.Session', autospec=True)
+    def test_create_cutout_failure_is_reported(self, mock_session):
+        data = numpy.ones((20, 20, 20), numpy.uint16)
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.return_value = _response(403)
+
+        with self.assertRaises(HTTPError):
+            self.vol.create_cutout(
+                self.chan, 0, [20, 40], [50, 70], [30, 50], None, data,
+                'https://api.theboss.io', 'mytoken', mock_session, {})
+
+        request, = self._requests()
+        self.assertEqual(request.method, 'POST')
+        self.assertEqual(request.status_code, 403)
+        self.assertGreater(request.bytes_sent, 0)
+        self.assertEqual(request.raw_bytes, data.nbytes)
+        cutout, = self._cutouts()
+        self.assertEqual(cutout.operation, 'create_cutout')
+        self.assertIsInstance(cutout.error, HTTPError)
+
+    @patch('requests.Session', autospec=True)
+    def test_parallel_to_black_is_one_summary(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.side_effect = lambda *args, **kwargs: _response(200)
+
+        self.vol.create_cutout_to_black(
+            self.chan, 0, [0, 4096], [0, 4096], [0, 64], None,
+            'https://api.theboss.io', 'mytoken', mock_session, {}, parallel=4)
+
+        self.assertEqual(len(self._requests()), 16)
+        cutout, = self._cutouts()
+        self.assertEqual(cutout.operation, 'create_cutout_to_black')
+        self.assertEqual(cutout.requests, 16)
+
+    def test_worker_events_are_replayed(self):
+        worker = pickle.loads(pickle.dumps(self.vol.instrumentation))
+        self.assertEqual(worker.listeners, [])
+        event = RequestEvent(
+            'GET', 'url', 200, 0, 10, 100, 0.1, 0.1, 0.01, 0.21, 1)
+        with worker.cutout('get_cutout', self.chan, 0, [0, 1], [0, 1], [0, 1]):
+            worker.emit(event)
+        events = worker.drain()
+        self.assertEqual(events, [event])
+        self.assertEqual(worker.drain(), [])
+
+        with self.vol.instrumentation.cutout('get_cutout', self.chan, 0, [0, 1], [0, 1], [0, 1]):
+            self.vol.instrumentation.replay(events)
+        self.assertEqual(self.events[0], event)
+        cutout, = self._cutouts()
+        self.assertEqual((cutout.requests, cutout.raw_bytes, cutout.retries), (1, 100, 1))
+        self.assertEqual(cutout.compression_ratio, 10)
+
+
+class TestRemoteListeners(unittest.TestCase):
+    def test_add_and_remove(self):
+        rmt = BossRemote({"protocol": "https", "host": "test.com", "token": "my_secret"})
+        volume = rmt.volume_service.service
+        self.assertIsNone(volume.instrumentation)
+        events = []
+        rmt.add_instrumentation_listener(events.append)
+        self.assertEqual(volume.instrumentation.listeners, [events.append])
+        rmt.remove_instrumentation_listener(events.append)
+        self.assertIsNone(volume.instrumentation)
+        with self.assertRaises(ValueError):
+            rmt.remove_instrumentation_listener(events.append)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.boss.snapshot import ResourceSnapshot
+from intern.service.boss.v1.project import ProjectService_1
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+
+def make_snapshot(taken_at=None):
+    prj = ProjectService_1()
+    coll = prj._get_collection({'name': 'col1', 'description': 'a', 'creator': 'me'})
+    exp = prj._get_experiment({
+        'name': 'exp1', 'description': '', 'creator': 'me', 'coord_frame': 'frame',
+        'num_hierarchy_levels': 2, 'hierarchy_method': 'isotropic',
+        'num_time_samples': 1, 'time_step': 0, 'time_step_unit': 'seconds'}, 'col1')
+    chan = prj._get_channel({
+        'name': 'chan1', 'description': '', 'creator': 'me', 'default_time_sample': 0,
+        'datatype': 'uint16', 'base_resolution': 0, 'type': 'image', 'sources': [],
+        'related': [], 'downsample_status': 'DOWNSAMPLED'}, 'col1', 'exp1')
+    frame = prj._get_coordinate({
+        'name': 'frame', 'description': '', 'x_start': 0, 'x_stop': 100,
+        'y_start': 0, 'y_stop': 200, 'z_start': 0, 'z_stop': 30,
+        'x_voxel_size': 4, 'y_voxel_size': 4, 'z_voxel_size': 40, 'voxel_unit': 'nanometers'})
+    return ResourceSnapshot([coll], [exp], [chan], [frame], taken_at=taken_at)
+
+
+class TestResourceSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'snapshot.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_lookups(self):
+        snap = make_snapshot()
+
+        self.assertEqual(['col1'], snap.list_collections())
+        self.assertEqual(['exp1'], snap.list_experiments('col1'))
+        self.assertEqual([], snap.list_experiments('missing'))
+        self.assertEqual(['chan1'], snap.list_channels('col1', 'exp1'))
+        self.assertEqual(['frame'], snap.list_coordinate_frames())
+        self.assertEqual('uint16', snap.get_channel('chan1', 'col1', 'exp1').datatype)
+        self.assertEqual(2, snap.get_experiment('col1', 'exp1').num_hierarchy_levels)
+        with self.assertRaises(KeyError):
+            snap.get_collection('missing')
+
+    def test_save_load(self):
+        make_snapshot(taken_at=1234.5).save(self.path)
+
+        snap = ResourceSnapshot.load(self.path)
+
+        self.assertEqual(1234.5, snap.taken_at)
+        self.assertEqual('a', snap.get_collection('col1').description)
+        exp = snap.get_experiment('col1', 'exp1')
+        self.assertEqual('col1', exp.coll_name)
+        self.assertEqual('frame', exp.coord_frame)
+        chan = snap.get_channel('chan1', 'col1', 'exp1')
+        self.assertEqual(('col1', 'exp1'), (chan.coll_name, chan.exp_name))
+        self.assertEqual('DOWNSAMPLED', chan.downsample_status)
+        self.assertEqual(200, snap.get_coordinate_frame('frame').y_stop)
+        self.assertEqual(['snapshot.json'], os.listdir(self.dir))
+
+    def test_load_unknown_format(self):
+        with open(self.path, 'w') as fp:
+            json.dump({'format': 999}, fp)
+
+        with self.assertRaises(ValueError):
+            ResourceSnapshot.load(self.path)
+
+    def test_age(self):
+        self.assertGreaterEqual(make_snapshot().age(), 0)
+        self.assertGreater(make_snapshot(taken_at=0).age(), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
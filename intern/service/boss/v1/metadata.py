@@ -13,9 +13,14 @@
 # limitations under the License.
 from intern.resource.boss.resource import *
 from intern.service.boss.httperrorlist import HTTPErrorList
-from requests import HTTPError
+from requests import HTTPError, RequestException
 from intern.service.boss import BaseVersion
 from intern.service.boss.v1 import BOSS_API_VERSION
+from concurrent.futures import ThreadPoolExecutor
+
+# Requests sent at once by metadata operations. Kept below the default
+# connection pool size of a requests.Session (10) so connections are reused.
+METADATA_PARALLEL = 8
 
 
 class MetadataService_1(BaseVersion):
@@ -74,28 +79,36 @@ class MetadataService_1(BaseVersion):
         Raises:
             HTTPErrorList on failure.
         """
-        success = True
-        exc = HTTPErrorList('At least one key-value create failed.')
-
-        for pair in keys_vals.items():
-            key = pair[0]
-            value = pair[1]
-            req = self.get_metadata_request(
-                resource, 'POST', 'application/json', url_prefix, auth,
-                key, value)
-            prep = session.prepare_request(req)
-            resp = session.send(prep, **send_opts)
-            if resp.status_code == 201:
-                continue
+        self.create_bulk([(resource, keys_vals)], url_prefix, auth, session, send_opts)
 
-            err = (
-                'Create failed for {}: {}:{}, got HTTP response: ({}) - {}'
-                .format(resource.name, key, value, resp.status_code, resp.text))
-            exc.http_errors.append(HTTPError(err, request=req, response=resp))
-            success = False
+    def create_bulk(
+            self, resources_keys_vals, url_prefix, auth, session, send_opts,
+            max_workers=METADATA_PARALLEL):
+        """Create key-value pairs for many resources, sending several requests at once.
 
-        if not success:
-            raise exc
+        Will attempt to create all key-value pairs even if a failure is encountered.
+
+        Args:
+            resources_keys_vals (list[tuple]): (resource, keys_vals dictionary) pairs.
+            url_prefix (string): Protocol + host such as https://api.theboss.io
+            auth (string): Token to send in the request header.
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        ops = []
+        for resource, keys_vals in resources_keys_vals:
+            for key, value in keys_vals.items():
+                req = self.get_metadata_request(
+                    resource, 'POST', 'application/json', url_prefix, auth,
+                    key, value)
+                ops.append((req, 201, 'Create failed for {}: {}:{}'.format(resource.name, key, value)))
+
+        self._send_all(
+            ops, session, send_opts, max_workers, 'At least one key-value create failed.')
 
     def get(self, resource, keys, url_prefix, auth, session, send_opts):
         """Get metadata key-value pairs associated with the given resource.
@@ -114,27 +127,43 @@ class MetadataService_1(BaseVersion):
         Raises:
             HTTPErrorList on failure.
         """
-        resDict = {}
-        success = True
-        exc = HTTPErrorList('At least one key-value update failed.')
-
-        for key in keys:
-            req = self.get_metadata_request(
-                resource, 'GET', 'application/json', url_prefix, auth, key)
-            prep = session.prepare_request(req)
-            resp = session.send(prep, **send_opts)
-            if resp.status_code == 200:
-                resDict[key] = resp.json()['value']
-            else:
-                err = ('Get failed on {}, got HTTP response: ({}) - {}'.format(
-                    resource.name, resp.status_code, resp.text))
-                exc.http_errors.append(HTTPError(err, request=req, response=resp))
-                success = False
-
-        if not success:
-            raise exc
+        return self.get_bulk([(resource, keys)], url_prefix, auth, session, send_opts)[0]
+
+    def get_bulk(
+            self, resources_keys, url_prefix, auth, session, send_opts,
+            max_workers=METADATA_PARALLEL):
+        """Get metadata of many resources, sending several requests at once.
 
-        return resDict
+        Args:
+            resources_keys (list[tuple]): (resource, keys list) pairs.
+            url_prefix (string): Protocol + host such as https://api.theboss.io
+            auth (string): Token to send in the request header.
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (list[dictionary]): The requested metadata of each resource, in the given order.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        ops = []
+        keys_per_resource = []
+        for resource, keys in resources_keys:
+            keys = list(keys)
+            keys_per_resource.append(keys)
+            for key in keys:
+                req = self.get_metadata_request(
+                    resource, 'GET', 'application/json', url_prefix, auth, key)
+                ops.append((req, 200, 'Get failed on {}'.format(resource.name)))
+
+        responses = iter(self._send_all(
+            ops, session, send_opts, max_workers, 'At least one key-value update failed.'))
+        return [
+            {key: next(responses).json()['value'] for key in keys}
+            for keys in keys_per_resource
+        ]
 
     def update(self, resource, keys_vals, url_prefix, auth, session, send_opts):
         """Update the given key-value pairs for the given resource.
@@ -153,29 +182,37 @@ class MetadataService_1(BaseVersion):
         Raises:
             HTTPErrorList on failure.
         """
-        success = True
-        exc = HTTPErrorList('At least one key-value update failed.')
-
-        for pair in keys_vals.items():
-            key = pair[0]
-            value = pair[1]
-            req = self.get_metadata_request(
-                resource, 'PUT', 'application/json', url_prefix, auth,
-                key, value)
-            prep = session.prepare_request(req)
-            resp = session.send(prep, **send_opts)
-
-            if resp.status_code == 200:
-                continue
+        self.update_bulk([(resource, keys_vals)], url_prefix, auth, session, send_opts)
 
-            err = (
-                'Update failed for {}: {}:{}, got HTTP response: ({}) - {}'
-                .format(resource.name, key, value, resp.status_code, resp.text))
-            exc.http_errors.append(HTTPError(err, request=req, response=resp))
-            success = False
+    def update_bulk(
+            self, resources_keys_vals, url_prefix, auth, session, send_opts,
+            max_workers=METADATA_PARALLEL):
+        """Update key-value pairs of many resources, sending several requests at once.
 
-        if not success:
-            raise exc
+        Keys must already exist before they may be updated.  Will attempt to
+        update all key-value pairs even if a failure is encountered.
+
+        Args:
+            resources_keys_vals (list[tuple]): (resource, keys_vals dictionary) pairs.
+            url_prefix (string): Protocol + host such as https://api.theboss.io
+            auth (string): Token to send in the request header.
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        ops = []
+        for resource, keys_vals in resources_keys_vals:
+            for key, value in keys_vals.items():
+                req = self.get_metadata_request(
+                    resource, 'PUT', 'application/json', url_prefix, auth,
+                    key, value)
+                ops.append((req, 200, 'Update failed for {}: {}:{}'.format(resource.name, key, value)))
+
+        self._send_all(
+            ops, session, send_opts, max_workers, 'At least one key-value update failed.')
 
     def delete(self, resource, keys, url_prefix, auth, session, send_opts):
         """Delete metadata key-value pairs associated with the given resource.
@@ -194,21 +231,85 @@ class MetadataService_1(BaseVersion):
         Raises:
             HTTPErrorList on failure.
         """
-        success = True
-        exc = HTTPErrorList('At least one key-value update failed.')
-
-        for key in keys:
-            req = self.get_metadata_request(
-                resource, 'DELETE', 'application/json', url_prefix, auth, key)
-            prep = session.prepare_request(req)
-            resp = session.send(prep, **send_opts)
-            if resp.status_code == 204:
+        self.delete_bulk([(resource, keys)], url_prefix, auth, session, send_opts)
+
+    def delete_bulk(
+            self, resources_keys, url_prefix, auth, session, send_opts,
+            max_workers=METADATA_PARALLEL):
+        """Delete metadata of many resources, sending several requests at once.
+
+        Will attempt to delete all given key-value pairs even if a failure
+        occurs.
+
+        Args:
+            resources_keys (list[tuple]): (resource, keys list) pairs.
+            url_prefix (string): Protocol + host such as https://api.theboss.io
+            auth (string): Token to send in the request header.
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Raises:
+            HTTPErrorList on failure.
+        """
+        ops = []
+        for resource, keys in resources_keys:
+            for key in keys:
+                req = self.get_metadata_request(
+                    resource, 'DELETE', 'application/json', url_prefix, auth, key)
+                ops.append((req, 204, 'Delete failed for {}: {}'.format(resource.name, key)))
+
+        self._send_all(
+            ops, session, send_opts, max_workers, 'At least one key-value update failed.')
+
+    def _send_all(self, ops, session, send_opts, max_workers, message):
+        """Send requests, several at once, and collect every failure.
+
+        Args:
+            ops (list[tuple]): (requests.Request, expected status code, error message prefix).
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            max_workers (int): Number of requests to send at once.
+            message (string): Message of the HTTPErrorList raised on failure.
+
+        Returns:
+            (list[requests.Response]): Responses in the order of ops.
+
+        Raises:
+            HTTPErrorList if any response has an unexpected status code, or
+            any request failed to send (connection error, timeout).
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0.")
+
+        def _send(req):
+            # Transport errors are returned rather than raised, so that one
+            # failed request doesn't stop the others from being collected.
+            try:
+                prep = session.prepare_request(req)
+                return session.send(prep, **send_opts)
+            except RequestException as e:
+                return e
+
+        reqs = [op[0] for op in ops]
+        if max_workers == 1 or len(reqs) < 2:
+            responses = [_send(req) for req in reqs]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                responses = list(executor.map(_send, reqs))
+
+        exc = HTTPErrorList(message)
+        for (req, status_code, err), resp in zip(ops, responses):
+            if isinstance(resp, RequestException):
+                exc.http_errors.append(
+                    HTTPError('{}, request failed: {}'.format(err, resp), request=req))
                 continue
-            err = (
-                'Delete failed for {}: {}, got HTTP response: ({}) - {}'
-                .format(resource.name, key, resp.status_code, resp.text))
+            if resp.status_code == status_code:
+                continue
+            err = '{}, got HTTP response: ({}) - {}'.format(err, resp.status_code, resp.text)
             exc.http_errors.append(HTTPError(err, request=req, response=resp))
-            success = False
 
-        if not success:
+        if exc.http_errors:
             raise exc
+
+        return responses
@@ -15,8 +15,13 @@ from intern.service.boss import BaseVersion
 from intern.service.boss.v1 import BOSS_API_VERSION
 from intern.resource.boss.resource import *
 from requests import HTTPError
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import copy
 
+# Requests sent at once by walk(). Kept below the default connection pool
+# size of a requests.Session (10) so connections are reused.
+WALK_PARALLEL = 8
+
 
 class ProjectService_1(BaseVersion):
     """The Boss API v1 project service.
@@ -855,6 +860,91 @@ class ProjectService_1(BaseVersion):
             resource.name, resp.status_code, resp.text))
         raise HTTPError(err, request = req, response = resp)
 
+    def walk(self, collections, url_prefix, auth, session, send_opts, max_workers=WALK_PARALLEL):
+        """Get every collection, experiment, channel and coordinate frame, several requests at once.
+
+        Each resource is listed and then fetched in full. Children are
+        requested as soon as their parent's listing arrives, so the crawl
+        doesn't wait for one level to finish before starting the next.
+
+        Args:
+            collections (list[string]|None): Names of the collections to walk, or None for all of them.
+            url_prefix (string): Protocol + host such as https://api.theboss.io
+            auth (string): Token to send in the request header.
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (dict): Lists of fully populated resources, keyed by 'collections',
+                'experiments', 'channels' and 'coordinate_frames', each sorted by name.
+
+        Raises:
+            requests.HTTPError on failure.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0.")
+
+        def _get(resource):
+            return self.get(resource, url_prefix, auth, session, send_opts)
+
+        def _list(resource):
+            return self.list(resource, url_prefix, auth, session, send_opts)
+
+        # Each task returns (key of the result list, resource or None, child tasks).
+        def _list_collections():
+            names = _list(CollectionResource(name=''))
+            return None, None, [(_collection, name) for name in names]
+
+        def _list_coordinate_frames():
+            names = _list(CoordinateFrameResource(name=''))
+            return None, None, [(_coordinate_frame, name) for name in names]
+
+        def _collection(name):
+            coll = _get(CollectionResource(name))
+            exps = _list(ExperimentResource(
+                name='', collection_name=name, coord_frame='foo'))
+            return 'collections', coll, [(_experiment, name, exp) for exp in exps]
+
+        def _experiment(coll_name, name):
+            exp = _get(ExperimentResource(name, coll_name))
+            chans = _list(ChannelResource(
+                name='', collection_name=coll_name, experiment_name=name, type='image'))
+            return 'experiments', exp, [(_channel, coll_name, name, chan) for chan in chans]
+
+        def _channel(coll_name, exp_name, name):
+            return 'channels', _get(ChannelResource(name, coll_name, exp_name)), []
+
+        def _coordinate_frame(name):
+            return 'coordinate_frames', _get(CoordinateFrameResource(name)), []
+
+        if collections is None:
+            tasks = [(_list_collections,)]
+        else:
+            tasks = [(_collection, name) for name in collections]
+        tasks.append((_list_coordinate_frames,))
+
+        found = {'collections': [], 'experiments': [], 'channels': [], 'coordinate_frames': []}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {executor.submit(*task) for task in tasks}
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key, resource, children = future.result()
+                        if key is not None:
+                            found[key].append(resource)
+                        pending.update(executor.submit(*task) for task in children)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        found['collections'].sort(key=lambda r: r.name)
+        found['experiments'].sort(key=lambda r: (r.coll_name, r.name))
+        found['channels'].sort(key=lambda r: (r.coll_name, r.exp_name, r.name))
+        found['coordinate_frames'].sort(key=lambda r: r.name)
+        return found
+
     def _get_resource_params(self, resource, for_update=False):
         """Get dictionary containing all parameters for the given resource.
 
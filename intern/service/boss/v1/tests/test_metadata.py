@@ -13,9 +13,9 @@
 # limitations under the License.
 
 from intern.service.boss.v1.metadata import MetadataService_1
-from intern.resource.boss.resource import ChannelResource
+from intern.resource.boss.resource import ChannelResource, ExperimentResource
 from intern.service.boss.httperrorlist import HTTPErrorList
-from requests import HTTPError, PreparedRequest, Response, Session
+from requests import HTTPError, PreparedRequest, Response, Session, Timeout
 import unittest
 from mock import patch
 
@@ -188,5 +188,78 @@ class TestMetadata_v1(unittest.TestCase):
         with self.assertRaises(HTTPErrorList):
             self.meta.delete(self.chan, keys, url_prefix, auth, mock_session, send_opts)
 
+    @patch('requests.Session', autospec=True)
+    def test_meta_create_bulk_sends_every_key(self, mock_session):
+        exp = ExperimentResource('exp', 'foo', 'coord')
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        fake_resp = Response()
+        fake_resp.status_code = 201
+        mock_session.send.return_value = fake_resp
+
+        self.meta.create_bulk(
+            [(self.chan, {'foo': 'bar', 'day': 'night'}), (exp, {'foo': 'baz'})],
+            'https://api.theboss.io', 'mytoken', mock_session, {}, max_workers=3)
+
+        urls = sorted(call[0][0].url for call in mock_session.send.call_args_list)
+        self.assertEqual(3, len(urls))
+        self.assertIn('https://api.theboss.io/v1/meta/foo/exp/?key=foo&value=baz', urls)
+
+    @patch('requests.Session', autospec=True)
+    def test_meta_bulk_failures_are_aggregated(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+
+        def _send(prep, **kwargs):
+            resp = Response()
+            resp.status_code = 404 if 'key=bad' in prep.url else 200
+            resp._content = b'{"key": "good", "value": "1"}'
+            return resp
+        mock_session.send.side_effect = _send
+
+        with self.assertRaises(HTTPErrorList) as err:
+            self.meta.update_bulk(
+                [(self.chan, {'good': '1', 'bad': '2'}), (self.chan, {'bad': '3'})],
+                'https://api.theboss.io', 'mytoken', mock_session, {})
+        self.assertEqual(2, len(err.exception.http_errors))
+        self.assertEqual(3, mock_session.send.call_count)
+
+    @patch('requests.Session', autospec=True)
+    def test_meta_bulk_transport_errors_are_aggregated(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+
+        def _send(prep, **kwargs):
+            if 'key=slow' in prep.url:
+                raise Timeout('timed out')
+            resp = Response()
+            resp.status_code = 404 if 'key=bad' in prep.url else 200
+            resp._content = b'{"key": "good", "value": "1"}'
+            return resp
+        mock_session.send.side_effect = _send
+
+        with self.assertRaises(HTTPErrorList) as err:
+            self.meta.update_bulk(
+                [(self.chan, {'good': '1', 'bad': '2', 'slow': '3'})],
+                'https://api.theboss.io', 'mytoken', mock_session, {}, max_workers=2)
+        self.assertEqual(2, len(err.exception.http_errors))
+        self.assertEqual(3, mock_session.send.call_count)
+        self.assertIn('timed out', str(err.exception.http_errors[1]))
+
+    @patch('requests.Session', autospec=True)
+    def test_meta_get_bulk_keeps_order(self, mock_session):
+        exp = ExperimentResource('exp', 'foo', 'coord')
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+
+        def _send(prep, **kwargs):
+            resp = Response()
+            resp.status_code = 200
+            resp._content = '{{"value": "{}"}}'.format(prep.url.split('/')[-2]).encode()
+            return resp
+        mock_session.send.side_effect = _send
+
+        actual = self.meta.get_bulk(
+            [(self.chan, ['a', 'b']), (exp, ['c'])],
+            'https://api.theboss.io', 'mytoken', mock_session, {})
+        self.assertEqual([{'a': 'chan', 'b': 'chan'}, {'c': 'exp'}], actual)
+
+
 if __name__ == '__main__':
     unittest.main()
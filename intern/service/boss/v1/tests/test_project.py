@@ -15,6 +15,7 @@
 from intern.service.boss.v1.project import ProjectService_1
 from intern.resource.boss.resource import *
 from requests import HTTPError, PreparedRequest, Response, Session
+import json
 import unittest
 from mock import patch
 
@@ -374,5 +375,93 @@ class TestProject_v1(unittest.TestCase):
         self.assertEqual(dict, actual.raw)
 
 
+class TestProjectWalk_v1(unittest.TestCase):
+    """Walk a small tree served by a fake session that answers by URL."""
+
+    def setUp(self):
+        self.prj = ProjectService_1()
+        self.url_prefix = 'https://api.theboss.io'
+        self.routes = {
+            'collection/': {'collections': ['col1', 'col2']},
+            'coord/': {'coords': ['frame']},
+            'coord/frame': {
+                'name': 'frame', 'description': '', 'x_start': 0, 'x_stop': 10,
+                'y_start': 0, 'y_stop': 10, 'z_start': 0, 'z_stop': 10,
+                'x_voxel_size': 1, 'y_voxel_size': 1, 'z_voxel_size': 1,
+                'voxel_unit': 'nanometers'},
+        }
+        for coll, exps in (('col1', ['exp1', 'exp2']), ('col2', [])):
+            self.routes['collection/{}'.format(coll)] = {
+                'name': coll, 'description': '', 'creator': 'me'}
+            self.routes['collection/{}/experiment/'.format(coll)] = {'experiments': exps}
+            for exp in exps:
+                self.routes['collection/{}/experiment/{}'.format(coll, exp)] = {
+                    'name': exp, 'description': '', 'creator': 'me', 'coord_frame': 'frame',
+                    'num_hierarchy_levels': 1, 'hierarchy_method': 'isotropic',
+                    'num_time_samples': 1, 'time_step': 0, 'time_step_unit': 'seconds'}
+                self.routes['collection/{}/experiment/{}/channel/'.format(coll, exp)] = {
+                    'channels': ['chan']}
+                self.routes['collection/{}/experiment/{}/channel/chan'.format(coll, exp)] = {
+                    'name': 'chan', 'description': '', 'creator': 'me',
+                    'default_time_sample': 0, 'datatype': 'uint8', 'base_resolution': 0,
+                    'type': 'image', 'sources': [], 'related': [], 'downsample_status': 'NOT_DOWNSAMPLED'}
+        self.requested = []
+
+    def _send(self, prep, **kwargs):
+        path = prep.url[len(self.url_prefix + '/v1/'):]
+        self.requested.append(path)
+        resp = Response()
+        if path in self.routes:
+            resp.status_code = 200
+            resp._content = json.dumps(self.routes[path]).encode()
+        else:
+            resp.status_code = 404
+            resp._content = b'not found'
+        return resp
+
+    @patch('requests.Session', autospec=True)
+    def test_walk(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.side_effect = self._send
+
+        found = self.prj.walk(None, self.url_prefix, 'mytoken', mock_session, {}, max_workers=4)
+
+        self.assertEqual(['col1', 'col2'], [c.name for c in found['collections']])
+        self.assertEqual(
+            [('col1', 'exp1'), ('col1', 'exp2')],
+            [(e.coll_name, e.name) for e in found['experiments']])
+        self.assertEqual(
+            [('col1', 'exp1', 'chan'), ('col1', 'exp2', 'chan')],
+            [(c.coll_name, c.exp_name, c.name) for c in found['channels']])
+        self.assertEqual('uint8', found['channels'][0].datatype)
+        self.assertEqual(['frame'], [cf.name for cf in found['coordinate_frames']])
+        self.assertEqual(10, found['coordinate_frames'][0].x_stop)
+        self.assertEqual(sorted(self.routes), sorted(self.requested))
+
+    @patch('requests.Session', autospec=True)
+    def test_walk_selected_collections(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.side_effect = self._send
+
+        found = self.prj.walk(['col2'], self.url_prefix, 'mytoken', mock_session, {})
+
+        self.assertEqual(['col2'], [c.name for c in found['collections']])
+        self.assertEqual([], found['experiments'])
+        self.assertNotIn('collection/', self.requested)
+
+    @patch('requests.Session', autospec=True)
+    def test_walk_failure(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        mock_session.send.side_effect = self._send
+        del self.routes['collection/col1/experiment/exp2']
+
+        with self.assertRaises(HTTPError):
+            self.prj.walk(None, self.url_prefix, 'mytoken', mock_session, {})
+
+    def test_walk_requires_a_worker(self):
+        with self.assertRaises(ValueError):
+            self.prj.walk(None, self.url_prefix, 'mytoken', None, {}, max_workers=0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -14,10 +14,12 @@
 
 from intern.service.boss.v1.volume import VolumeService_1
 from intern.service.boss import BaseVersion
-from intern.service.boss.v1.volume import CacheMode
+from intern.service.boss.v1.volume import CacheMode, MAX_CUTOUT_VOXELS
 from intern.resource.boss.resource import ChannelResource
+from intern.utils.progress import CancellationToken, TransferCancelled
 import blosc
 import numpy
+import re
 from requests import HTTPError, PreparedRequest, Response, Session
 import unittest
 from mock import patch, ANY
@@ -71,6 +73,66 @@ class TestVolume_v1(unittest.TestCase):
             self.chan, resolution, x_range, y_range, z_range, time_range, data,
             url_prefix, auth, mock_session, send_opts)
 
+    @patch('requests.Session', autospec=True)
+    def test_create_large_cutout_reports_progress(self, mock_session):
+        x_range = [0, 2048]
+        y_range = [0, 1024]
+        z_range = [0, 64]
+        data = numpy.ones((64, 1024, 2048), numpy.uint8)
+        chan = ChannelResource('chan', 'foo', 'bar', 'image', datatype='uint8')
+
+        mock_session.prepare_request.return_value = PreparedRequest()
+        fake_response = Response()
+        fake_response.status_code = 201
+        mock_session.send.return_value = fake_response
+        reports = []
+
+        self.vol.create_cutout(
+            chan, 0, x_range, y_range, z_range, None, data,
+            'https://api.theboss.io', 'mytoken', mock_session, {}, progress=reports.append)
+
+        self.assertEqual([1, 2, 3, 4], [p.chunks_done for p in reports])
+        self.assertEqual(data.nbytes, reports[-1].bytes_done)
+
+    @patch('requests.Session', autospec=True)
+    def test_create_cutout_to_black_coalesces_blocks(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        fake_response = Response()
+        fake_response.status_code = 200
+        mock_session.send.return_value = fake_response
+
+        self.vol.create_cutout_to_black(
+            self.chan, 0, [0, 4096], [0, 4096], [0, 64], None,
+            'https://api.theboss.io', 'mytoken', mock_session, {})
+
+        # 1024x1024x32 blocks would take 32 requests.
+        self.assertEqual(16, mock_session.send.call_count)
+        urls = set(call[0][0].url for call in mock_session.send.call_args_list)
+        self.assertEqual(len(urls), 16)
+        voxels = 0
+        for url in urls:
+            ranges = [list(map(int, r.split(':'))) for r in url.rstrip('/').split('/')[-3:]]
+            for (start, stop), cuboid in zip(ranges, (512, 512, 16)):
+                self.assertEqual(0, start % cuboid)
+                self.assertEqual(0, stop % cuboid)
+            size = numpy.prod([stop - start for start, stop in ranges])
+            self.assertLessEqual(size, MAX_CUTOUT_VOXELS)
+            voxels += size
+        self.assertEqual(4096 * 4096 * 64, voxels)
+
+    @patch('requests.Session', autospec=True)
+    def test_create_cutout_to_black_serial_failure(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        fake_response = Response()
+        fake_response.status_code = 403
+        mock_session.send.return_value = fake_response
+
+        with self.assertRaises(HTTPError):
+            self.vol.create_cutout_to_black(
+                self.chan, 0, [0, 4096], [0, 4096], [0, 64], None,
+                'https://api.theboss.io', 'mytoken', mock_session, {}, parallel=False)
+        self.assertEqual(1, mock_session.send.call_count)
+
     @patch('requests.Session', autospec=True)
     def test_create_cutout_failure(self, mock_session):
         resolution = 0
@@ -93,6 +155,34 @@ class TestVolume_v1(unittest.TestCase):
                 self.chan, resolution, x_range, y_range, z_range, time_range, data,
                 url_prefix, auth, mock_session, send_opts)
 
+    @patch('requests.Session', autospec=True)
+    def test_create_cutout_transposed_view(self, mock_session):
+        """A transposed (Fortran-ordered) view is uploaded in C order."""
+        resolution = 0
+        x_range = [20, 40]
+        y_range = [50, 70]
+        z_range = [30, 46]
+        xyz = numpy.random.randint(1, 3000, (20, 20, 16), numpy.uint16)
+        data = xyz.T
+        url_prefix = 'https://api.theboss.io'
+        auth = 'mytoken'
+
+        mock_session.prepare_request.return_value = PreparedRequest()
+        fake_response = Response()
+        fake_response.status_code = 201
+        mock_session.send.return_value = fake_response
+        send_opts = {}
+
+        with patch.object(
+                BaseVersion, 'get_cutout_request', autospec=True, wraps=BaseVersion.get_cutout_request) as req_spy:
+            self.vol.create_cutout(
+                self.chan, resolution, x_range, y_range, z_range, None, data,
+                url_prefix, auth, mock_session, send_opts)
+            compressed = req_spy.call_args[1]['numpyVolume']
+
+        sent = numpy.frombuffer(blosc.decompress(compressed), dtype=numpy.uint16)
+        numpy.testing.assert_array_equal(numpy.ascontiguousarray(data).ravel(), sent)
+
     @patch('requests.Session', autospec=True)
     def test_get_cutout_success(self, mock_session):
         resolution = 0
@@ -122,6 +212,107 @@ class TestVolume_v1(unittest.TestCase):
 
         numpy.testing.assert_array_equal(data, actual)
 
+    def _mock_chunk_responses(self, mock_session, chunk_shape):
+        mock_session.prepare_request.return_value = PreparedRequest()
+        mock_session.prepare_request.return_value.headers = {}
+
+        def _respond(*args, **kwargs):
+            fake_response = Response()
+            fake_response.status_code = 200
+            fake_response._content = blosc.compress(
+                numpy.ones(chunk_shape, numpy.uint16), typesize=16)
+            return fake_response
+        mock_session.send.side_effect = _respond
+
+    @patch('requests.Session', autospec=True)
+    def test_get_cutout_reports_progress(self, mock_session):
+        self._mock_chunk_responses(mock_session, (10, 10, 10))
+        reports = []
+
+        actual = self.vol.get_cutout(
+            self.chan, 0, [0, 20], [0, 20], [0, 20], None, [],
+            'https://api.theboss.io', 'mytoken', mock_session, {}, parallel=False,
+            chunk_size=(10, 10, 10), progress=reports.append)
+
+        self.assertEqual(8, len(reports))
+        self.assertEqual(list(range(1, 9)), [p.chunks_done for p in reports])
+        self.assertEqual(actual.nbytes, reports[-1].bytes_done)
+        self.assertEqual(actual.nbytes, reports[-1].bytes_total)
+
+    @patch('requests.Session', autospec=True)
+    def test_get_cutout_cancel(self, mock_session):
+        self._mock_chunk_responses(mock_session, (10, 10, 10))
+        token = CancellationToken()
+
+        def _cancel_after_two(progress):
+            if progress.chunks_done == 2:
+                token.cancel()
+
+        with self.assertRaises(TransferCancelled):
+            self.vol.get_cutout(
+                self.chan, 0, [0, 20], [0, 20], [0, 20], None, [],
+                'https://api.theboss.io', 'mytoken', mock_session, {}, parallel=False,
+                chunk_size=(10, 10, 10), progress=_cancel_after_two, cancel=token)
+        self.assertEqual(2, mock_session.send.call_count)
+
+    @patch('requests.Session', autospec=True)
+    def test_get_cutout_cancelled_before_start(self, mock_session):
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(TransferCancelled):
+            self.vol.get_cutout(
+                self.chan, 0, [0, 20], [0, 20], [0, 20], None, [],
+                'https://api.theboss.io', 'mytoken', mock_session, {}, cancel=token)
+        mock_session.send.assert_not_called()
+
+    def _mock_volume_responses(self, mock_session):
+        """Answer cutout requests from a volume whose voxels encode their XYZ position."""
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+
+        def _respond(prep, **kwargs):
+            ranges = re.search(r'/(\d+):(\d+)/(\d+):(\d+)/(\d+):(\d+)/', prep.url).groups()
+            x0, x1, y0, y1, z0, z1 = map(int, ranges)
+            z, y, x = numpy.mgrid[z0:z1, y0:y1, x0:x1]
+            fake_response = Response()
+            fake_response.status_code = 200
+            fake_response._content = blosc.compress(
+                (z * 10000 + y * 100 + x).astype(numpy.uint16), typesize=16)
+            return fake_response
+        mock_session.send.side_effect = _respond
+
+    @patch('requests.Session', autospec=True)
+    def test_get_cutouts(self, mock_session):
+        self._mock_volume_responses(mock_session)
+        regions = [
+            ([10, 20], [10, 20], [0, 4]),
+            ([15, 25], [12, 22], [1, 5]),   # overlaps the first
+            ([10, 20], [10, 20], [0, 4]),   # duplicate of the first
+            ([80, 84], [70, 74], [2, 3]),   # far from the others
+        ]
+
+        actual = self.vol.get_cutouts(
+            self.chan, 0, regions, None, [],
+            'https://api.theboss.io', 'mytoken', mock_session, {}, max_workers=2)
+
+        self.assertEqual(2, mock_session.send.call_count)
+        self.assertEqual(len(regions), len(actual))
+        for (x, y, z), data in zip(regions, actual):
+            zz, yy, xx = numpy.mgrid[z[0]:z[1], y[0]:y[1], x[0]:x[1]]
+            numpy.testing.assert_array_equal(zz * 10000 + yy * 100 + xx, data)
+        self.assertIsNone(actual[0].base)
+
+    @patch('requests.Session', autospec=True)
+    def test_get_cutouts_failure(self, mock_session):
+        mock_session.prepare_request.side_effect = lambda req: req.prepare()
+        fake_response = Response()
+        fake_response.status_code = 403
+        mock_session.send.return_value = fake_response
+
+        with self.assertRaises(HTTPError):
+            self.vol.get_cutouts(
+                self.chan, 0, [([0, 10], [0, 10], [0, 1])], None, [],
+                'https://api.theboss.io', 'mytoken', mock_session, {})
+
     @patch('requests.Session', autospec=True)
     def test_get_cutout_failure(self, mock_session):
         resolution = 0
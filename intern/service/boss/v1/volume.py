@@ -15,20 +15,81 @@ from intern.service.boss import BaseVersion
 from intern.service.boss.v1 import BOSS_API_VERSION
 from intern.resource.boss.resource import *
 from intern.utils.parallel import *
+from intern.utils.progress import ProgressTracker
 from requests import HTTPError
+from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
+import functools
+import time
 import blosc
 import numpy as np
 from enum import Enum
 
+# Largest region the Boss accepts in one cutout request, in voxels.
+MAX_CUTOUT_VOXELS = 1024 * 1024 * 32 * 2
+
+# Concurrent requests used by create_cutout_to_black when parallel=True.
+TO_BLACK_PARALLEL = 8
+
+# Concurrent requests used by get_cutouts.
+GET_CUTOUTS_PARALLEL = 8
+
 class CacheMode(str, Enum):
     cache = 'cache'
     no_cache = 'no-cache'
     raw = 'raw'
 
+def instrumented(fcn):
+    """Decorator that summarizes a cutout call as one CutoutEvent.
+
+    Args:
+        fcn (function): Method whose arguments start with resource, resolution,
+            x_range, y_range, z_range.
+
+    Returns:
+        (function): Wraps given function with one that reports to the
+            service's instrumentation, if it has any.
+    """
+    @functools.wraps(fcn)
+    def wrapper(self, resource, resolution, x_range, y_range, z_range, *args, **kwargs):
+        if self.instrumentation is None:
+            return fcn(self, resource, resolution, x_range, y_range, z_range, *args, **kwargs)
+        with self.instrumentation.cutout(
+                fcn.__name__, resource, resolution, x_range, y_range, z_range):
+            return fcn(self, resource, resolution, x_range, y_range, z_range, *args, **kwargs)
+    return wrapper
+
+
+class _NoInstrumentation(object):
+    """Stand-in for Instrumentation context managers when nothing is listening."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def _next_result(results, cancel, poll_seconds=0.1):
+    """Wait for the next result of Pool.imap*, checking the cancellation token while waiting.
+
+    Raises:
+        intern.utils.progress.TransferCancelled if cancel is cancelled.
+    """
+    if cancel is None:
+        return next(results)
+    while True:
+        cancel.raise_if_cancelled()
+        try:
+            return results.next(timeout=poll_seconds)
+        except multiprocessing.TimeoutError:
+            pass
+
+
 class VolumeService_1(BaseVersion):
     def __init__(self):
         BaseVersion.__init__(self)
+        # intern.service.boss.instrumentation.Instrumentation, or None.
+        self.instrumentation = None
 
     @property
     def version(self):
@@ -47,9 +108,10 @@ class VolumeService_1(BaseVersion):
 
         return bit_width
 
+    @instrumented
     def create_cutout(
         self, resource, resolution, x_range, y_range, z_range, time_range, numpyVolume,
-        url_prefix, auth, session, send_opts):
+        url_prefix, auth, session, send_opts, progress=None, cancel=None):
         """Upload a cutout to the Boss data store.
 
         Args:
@@ -64,6 +126,10 @@ class VolumeService_1(BaseVersion):
             auth (string): Token to send in the request header.
             session (requests.Session): HTTP session to use for request.
             send_opts (dictionary): Additional arguments to pass to session.send().
+            progress (optional[callable]): Called with an intern.utils.progress.Progress
+                after each block is uploaded.
+            cancel (optional[intern.utils.progress.CancellationToken]): Stops the upload
+                before its next block, raising TransferCancelled.
         """
         if np.sum(numpyVolume) == 0:
             return
@@ -90,7 +156,7 @@ class VolumeService_1(BaseVersion):
                 (x_range[1] - x_range[0]) *
                 (y_range[1] - y_range[0]) *
                 (z_range[1] - z_range[0])
-        ) > 1024 * 1024 * 32 * 2:
+        ) > MAX_CUTOUT_VOXELS:
             blocks = block_compute(
                 x_range[0], x_range[1],
                 y_range[0], y_range[1],
@@ -98,41 +164,59 @@ class VolumeService_1(BaseVersion):
                 block_size=(1024, 1024, 32)
             )
 
+            # Blocks are sliced as views and only made contiguous one at a
+            # time (inside the recursive call), so a transposed input is
+            # never copied in full.
+            tracker = ProgressTracker(len(blocks), numpyVolume.nbytes, progress)
             for b in blocks:
-                _data = np.ascontiguousarray(
-                    numpyVolume[
-                        b[2][0] - z_range[0]: b[2][1] - z_range[0],
-                        b[1][0] - y_range[0]: b[1][1] - y_range[0],
-                        b[0][0] - x_range[0]: b[0][1] - x_range[0]
-                    ],
-                    dtype=numpyVolume.dtype
-                )
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                _data = numpyVolume[
+                    b[2][0] - z_range[0]: b[2][1] - z_range[0],
+                    b[1][0] - y_range[0]: b[1][1] - y_range[0],
+                    b[0][0] - x_range[0]: b[0][1] - x_range[0]
+                ]
                 self.create_cutout(
                     resource, resolution, b[0], b[1], b[2],
                     time_range, _data, url_prefix, auth, session, send_opts
                 )
+                tracker.update(_data.nbytes)
             return
 
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+
+        start = time.perf_counter()
         compressed = blosc.compress(
-            numpyVolume, typesize=self.get_bit_width(resource)
+            ascontiguousarray_blocked(numpyVolume),
+            typesize=self.get_bit_width(resource)
         )
+        codec_seconds = time.perf_counter() - start
         req = self.get_cutout_request(
             resource, 'POST', 'application/blosc',
             url_prefix, auth,
             resolution, x_range, y_range, z_range, time_range, numpyVolume=compressed)
         prep = session.prepare_request(req)
+        start = time.perf_counter()
         resp = session.send(prep, **send_opts)
+        if self.instrumentation is not None:
+            self.instrumentation.request(
+                prep, resp, time.perf_counter() - start,
+                raw_bytes=numpyVolume.nbytes, codec_seconds=codec_seconds)
 
         if resp.status_code == 201:
+            if progress is not None:
+                ProgressTracker(1, numpyVolume.nbytes, progress).update(numpyVolume.nbytes)
             return
 
         msg = ('Create cutout failed on {}, got HTTP response: ({}) - {}'.format(
             resource.name, resp.status_code, resp.text))
         raise HTTPError(msg, request=req, response=resp)
 
+    @instrumented
     def create_cutout_to_black(
         self, resource, resolution, x_range, y_range, z_range, time_range, url_prefix, 
-        auth, session, send_opts):
+        auth, session, send_opts, parallel=True):
         """Upload a black cutout to the Boss data store.
 
         Args:
@@ -146,26 +230,69 @@ class VolumeService_1(BaseVersion):
             auth (string): Token to send in the request header.
             session (requests.Session): HTTP session to use for request.
             send_opts (dictionary): Additional arguments to pass to session.send().
+            parallel (Union[int, bool]: True): Number of requests to send concurrently
+                when the region needs several. True uses TO_BLACK_PARALLEL, False sends
+                them one at a time.
         """
 
-        # Check to see if this volume is larger than 1GB. If so, chunk it into
-        # several smaller bites:
+        # Check to see if this volume is larger than a single request. If so,
+        # split it into as few cuboid-aligned blocks as the size limit allows:
+        blocks = []
         if (
                 (x_range[1] - x_range[0]) *
                 (y_range[1] - y_range[0]) *
                 (z_range[1] - z_range[0])
-        ) > 1024 * 1024 * 32 * 2:
+        ) > MAX_CUTOUT_VOXELS:
+            block_size = coalesced_block_size(
+                x_range[0], x_range[1],
+                y_range[0], y_range[1],
+                z_range[0], z_range[1],
+                max_voxels=MAX_CUTOUT_VOXELS
+            )
             blocks = block_compute(
                 x_range[0], x_range[1],
                 y_range[0], y_range[1],
                 z_range[0], z_range[1],
-                block_size=(1024, 1024, 32)
+                block_size=block_size
             )
-            for b in blocks:
-                self.create_cutout_to_black(
-                    resource, resolution, b[0], b[1], b[2],
-                    time_range, url_prefix, auth, session, send_opts
-                )
+
+        if len(blocks) > 1:
+            if type(parallel) == bool:
+                parallel = TO_BLACK_PARALLEL if parallel else 1
+            elif parallel > 0:
+                parallel = int(parallel)
+            else:
+                raise ValueError("Parallel must be greater than 0.")
+
+            if parallel == 1:
+                for b in blocks:
+                    self.create_cutout_to_black(
+                        resource, resolution, b[0], b[1], b[2],
+                        time_range, url_prefix, auth, session, send_opts
+                    )
+                return
+
+            summary = None
+            if self.instrumentation is not None:
+                summary = self.instrumentation.current_cutout()
+
+            def _to_black(b):
+                with self._counting_towards(summary):
+                    self.create_cutout_to_black(
+                        resource, resolution, b[0], b[1], b[2],
+                        time_range, url_prefix, auth, session, send_opts
+                    )
+
+            # Requests carry no body, so threads are enough to keep several
+            # in flight. The first failure stops the blocks not yet started.
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                futures = [executor.submit(_to_black, b) for b in blocks]
+                try:
+                    for future in futures:
+                        future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
             return
 
         req = self.get_cutout_to_black_request(
@@ -173,7 +300,10 @@ class VolumeService_1(BaseVersion):
             url_prefix, auth,
             resolution, x_range, y_range, z_range, time_range)
         prep = session.prepare_request(req)
+        start = time.perf_counter()
         resp = session.send(prep, **send_opts)
+        if self.instrumentation is not None:
+            self.instrumentation.request(prep, resp, time.perf_counter() - start)
 
         if resp.status_code == 200:
             return
@@ -182,6 +312,7 @@ class VolumeService_1(BaseVersion):
             resource.name, resp.status_code, resp.text))
         raise HTTPError(msg, request=req, response=resp)
 
+    @instrumented
     def get_cutout(
             self, resource, resolution, x_range, y_range, z_range, time_range, id_list,
             url_prefix, auth, session, send_opts, access_mode=CacheMode.no_cache, parallel=True, **kwargs
@@ -210,6 +341,10 @@ class VolumeService_1(BaseVersion):
             parallel (Union[int, bool]: True): Whether downloads should be parallelized using 
                 multiprocessing. If set to True, will use all available CPUs. If set to False,
                 will use only one CPU. If set to an integer, will spawn that number of threads.
+            progress (optional[callable]): Called with an intern.utils.progress.Progress
+                after each chunk is downloaded.
+            cancel (optional[intern.utils.progress.CancellationToken]): Stops the download
+                before its next chunk, raising TransferCancelled. Parallel workers are terminated.
 
         Returns:
             (numpy.array): A 3D or 4D numpy matrix in ZXY(time) order.
@@ -217,10 +352,14 @@ class VolumeService_1(BaseVersion):
         Raises:
             requests.HTTPError
         """
+        progress = kwargs.pop("progress", None)
+        cancel = kwargs.pop("cancel", None)
+
         if parallel:
             # Parallel downloads are faster with a smaller chunk size but can easily overwhelm
             # the endpoint if its too small. Therefore from empirical testing (512, 512, 96) 
             # USUALLY is the fastest. There is some variabiity on number of threads. 
+            # Compare chunk sizes with `python -m benchmarks.cutout_throughput`.
             chunk_size = kwargs.pop("chunk_size", (512, 512, 16 * 6))
         else:
             # Single thread downloads are faster with a large chunk size, but can't surpass 
@@ -260,6 +399,7 @@ class VolumeService_1(BaseVersion):
                 y_range[1] - y_range[0],
                 x_range[1] - x_range[0]
             ), dtype=resource.datatype)
+            tracker = ProgressTracker(len(blocks), result.nbytes, progress)
 
             if parallel:
                 if type(parallel) == bool:
@@ -268,38 +408,52 @@ class VolumeService_1(BaseVersion):
                     parallel = int(parallel)
                 else:
                     raise ValueError("Parallel must be greater than 0.")
-                pool = multiprocessing.Pool(processes=parallel)
-                chunks = pool.starmap(self.get_cutout, [
-                    (
-                        resource, resolution, b[0], b[1], b[2],
-                        time_range, id_list, url_prefix, auth, session, send_opts,
-                        access_mode
-                        # TODO: kwargs
-                    )
-                 for b in blocks])
-
-                for b, data in zip(blocks, chunks):
-                    result[
-                        b[2][0] - z_range[0] : b[2][1] - z_range[0],
-                        b[1][0] - y_range[0] : b[1][1] - y_range[0],
-                        b[0][0] - x_range[0] : b[0][1] - x_range[0]
-                    ] = data
+                # Leaving the block terminates the workers, including when the
+                # download is cancelled or a chunk fails.
+                with multiprocessing.Pool(processes=parallel) as pool:
+                    chunks = pool.imap_unordered(self._get_cutout_chunk, [
+                        (i, (
+                            resource, resolution, b[0], b[1], b[2],
+                            time_range, id_list, url_prefix, auth, session, send_opts,
+                            access_mode
+                            # TODO: kwargs
+                        ))
+                     for i, b in enumerate(blocks)])
+
+                    for _ in blocks:
+                        i, data, events = _next_result(chunks, cancel)
+                        b = blocks[i]
+                        if self.instrumentation is not None:
+                            self.instrumentation.replay(events)
+                        with self._reassembly():
+                            result[
+                                b[2][0] - z_range[0] : b[2][1] - z_range[0],
+                                b[1][0] - y_range[0] : b[1][1] - y_range[0],
+                                b[0][0] - x_range[0] : b[0][1] - x_range[0]
+                            ] = data
+                        tracker.update(data.nbytes)
             else:
                 for b in blocks:
+                    if cancel is not None:
+                        cancel.raise_if_cancelled()
                     _data = self.get_cutout(
                         resource, resolution, b[0], b[1], b[2],
                         time_range, id_list, url_prefix, auth, session, send_opts,
                         access_mode, **kwargs
                     )
 
-                    result[
-                        b[2][0] - z_range[0] : b[2][1] - z_range[0],
-                        b[1][0] - y_range[0] : b[1][1] - y_range[0],
-                        b[0][0] - x_range[0] : b[0][1] - x_range[0]
-                    ] = _data
+                    with self._reassembly():
+                        result[
+                            b[2][0] - z_range[0] : b[2][1] - z_range[0],
+                            b[1][0] - y_range[0] : b[1][1] - y_range[0],
+                            b[0][0] - x_range[0] : b[0][1] - x_range[0]
+                        ] = _data
+                    tracker.update(_data.nbytes)
 
             return result
 
+        if cancel is not None:
+            cancel.raise_if_cancelled()
         req = self.get_cutout_request(
             resource, 'GET', 'application/blosc',
             url_prefix, auth,
@@ -309,10 +463,18 @@ class VolumeService_1(BaseVersion):
         prep = session.prepare_request(req)
         # Hack in Accept header for now.
         prep.headers['Accept'] = 'application/blosc'
+        start = time.perf_counter()
         resp = session.send(prep, **send_opts)
+        sent = time.perf_counter()
 
         if resp.status_code == 200:
             raw_data = blosc.decompress(resp.content)
+            if self.instrumentation is not None:
+                self.instrumentation.request(
+                    prep, resp, sent - start,
+                    raw_bytes=len(raw_data), codec_seconds=time.perf_counter() - sent)
+            if progress is not None:
+                ProgressTracker(1, len(raw_data), progress).update(len(raw_data))
             data_mat = np.frombuffer(raw_data, dtype=resource.datatype)
 
             if time_range:
@@ -331,10 +493,107 @@ class VolumeService_1(BaseVersion):
                                    x_range[1] - x_range[0]),
                                   order='C')
 
+        if self.instrumentation is not None:
+            self.instrumentation.request(prep, resp, sent - start)
         msg = ('Get cutout failed on {}, got HTTP response: ({}) - {}'.format(
             resource.name, resp.status_code, resp.text))
         raise HTTPError(msg, request=req, response=resp)
 
+    def get_cutouts(
+            self, resource, resolution, regions, time_range, id_list,
+            url_prefix, auth, session, send_opts, access_mode=CacheMode.no_cache,
+            max_workers=GET_CUTOUTS_PARALLEL, max_ratio=2.0
+        ):
+        """
+        Get many cutouts of one resource at once.
+
+        Overlapping and nearby regions are merged with merge_regions, so
+        voxels shared by several regions are downloaded once. The merged
+        boxes are downloaded concurrently and each region is sliced out of
+        its box.
+
+        Args:
+            resource (intern.resource.resource.Resource): Resource compatible
+                with cutout operations
+            resolution (int): 0 indicates native resolution.
+            regions (list[tuple]): (x_range, y_range, z_range) of each cutout.
+            time_range ([list[int]]|None): time range such as [30, 40] which means t>=30 and t<40.
+            id_list (list[int]): list of object ids to filter the cutouts by.
+            url_prefix (string): Protocol + host such as https://api.theboss.io
+            auth (string): Token to send in the request header.
+            session (requests.Session): HTTP session to use for request.
+            send_opts (dictionary): Additional arguments to pass to session.send().
+            access_mode (optional [Enum]): Identifies one of three cache access options:
+                cache = Will check both cache and for dirty keys
+                no_cache = Will skip cache check but check for dirty keys
+                raw = Will skip both the cache and dirty keys check
+            max_workers (optional[int]): Number of boxes to download at once.
+            max_ratio (optional[float]): Largest ratio of a merged box to the
+                voxels its regions cover, see merge_regions.
+
+        Returns:
+            (list[numpy.array]): A 3D or 4D numpy matrix in (time)ZYX order per region,
+                in the order of `regions`.
+
+        Raises:
+            requests.HTTPError
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0.")
+
+        def _get(box):
+            # Each box is its own cutout, reported as such to instrumentation.
+            return self.get_cutout(
+                resource, resolution, box[0], box[1], box[2], time_range, id_list,
+                url_prefix, auth, session, send_opts, access_mode, parallel=False)
+
+        groups = merge_regions(regions, max_ratio)
+        results = [None] * len(regions)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_get, box) for box, _ in groups]
+            try:
+                for future, (box, members) in zip(futures, groups):
+                    data = future.result()
+                    if len(members) == 1:
+                        results[members[0]] = data
+                        continue
+                    for i in members:
+                        x, y, z = regions[i]
+                        results[i] = data[
+                            ...,
+                            z[0] - box[2][0] : z[1] - box[2][0],
+                            y[0] - box[1][0] : y[1] - box[1][0],
+                            x[0] - box[0][0] : x[1] - box[0][0]
+                        ].copy()
+            finally:
+                for future in futures:
+                    future.cancel()
+        return results
+
+    def _get_cutout_chunk(self, task):
+        """Get one chunk in a worker process, along with the events it buffered.
+
+        Args:
+            task (tuple): (index, get_cutout arguments)
+
+        Returns:
+            (tuple): (index, data, events)
+        """
+        i, args = task
+        data = self.get_cutout(*args)
+        events = self.instrumentation.drain() if self.instrumentation is not None else None
+        return i, data, events
+
+    def _reassembly(self):
+        if self.instrumentation is None:
+            return _NoInstrumentation()
+        return self.instrumentation.reassembly()
+
+    def _counting_towards(self, summary):
+        if self.instrumentation is None:
+            return _NoInstrumentation()
+        return self.instrumentation.counting_towards(summary)
+
     def reserve_ids(
             self, resource, num_ids,
             url_prefix, auth, session, send_opts):
@@ -15,7 +15,7 @@
 from intern.resource.boss import ChannelResource, PartialChannelResourceError
 from intern.service.boss import BossService
 from intern.service.boss.v1.volume import VolumeService_1
-from intern.service.boss.v1.volume import CacheMode
+from intern.service.boss.v1.volume import CacheMode, GET_CUTOUTS_PARALLEL
 
 def check_channel(fcn):
     """Decorator that ensures a valid channel passed in.
@@ -62,7 +62,8 @@ class VolumeService(BossService):
 
     @check_channel
     def create_cutout(
-        self, resource, resolution, x_range, y_range, z_range, numpyVolume, time_range=None):
+        self, resource, resolution, x_range, y_range, z_range, numpyVolume, time_range=None,
+        **kwargs):
         """Upload a cutout to the volume service.
 
         Args:
@@ -73,16 +74,17 @@ class VolumeService(BossService):
             z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
             numpyVolume (numpy.array): A 3D or 4D (time) numpy matrix in (time)ZYX order.
             time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            kwargs: progress and cancel, see VolumeService_1.create_cutout.
         """
 
 
         return self.service.create_cutout(
             resource, resolution, x_range, y_range, z_range, time_range, numpyVolume,
-            self.url_prefix, self.auth, self.session, self.session_send_opts)
+            self.url_prefix, self.auth, self.session, self.session_send_opts, **kwargs)
 
     @check_channel
     def create_cutout_to_black(
-        self, resource, resolution, x_range, y_range, z_range, time_range=None):
+        self, resource, resolution, x_range, y_range, z_range, time_range=None, parallel=True):
         """Upload a black cutout to the volume service.
 
         Args:
@@ -92,12 +94,13 @@ class VolumeService(BossService):
             y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
             z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
             time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            parallel (Union[int, bool]: True): Number of concurrent requests for large regions.
         """
 
 
         return self.service.create_cutout_to_black(
             resource, resolution, x_range, y_range, z_range, time_range,
-            self.url_prefix, self.auth, self.session, self.session_send_opts)
+            self.url_prefix, self.auth, self.session, self.session_send_opts, parallel)
 
     @check_channel
     def get_cutout(self, resource, resolution, x_range, y_range, z_range, time_range=None, id_list=[], access_mode=CacheMode.no_cache, parallel=True, **kwargs):
@@ -131,6 +134,35 @@ class VolumeService(BossService):
             resource, resolution, x_range, y_range, z_range, time_range, id_list,
             self.url_prefix, self.auth, self.session, self.session_send_opts, access_mode, parallel, **kwargs)
 
+    @check_channel
+    def get_cutouts(
+        self, resource, resolution, regions, time_range=None, id_list=[],
+        access_mode=CacheMode.no_cache, max_workers=GET_CUTOUTS_PARALLEL):
+        """Get many cutouts of one resource, downloading shared voxels once.
+
+        Args:
+            resource (intern.resource.boss.resource.ChannelResource): Channel or layer resource.
+            resolution (int): 0 indicates native resolution.
+            regions (list[tuple]): (x_range, y_range, z_range) of each cutout.
+            time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+            id_list (optional [list[int]]): list of object ids to filter the cutouts by.
+            access_mode (optional [Enum]): Identifies one of three cache access options:
+                cache = Will check both cache and for dirty keys
+                no_cache = Will skip cache check but check for dirty keys
+                raw = Will skip both the cache and dirty keys check
+            max_workers (optional[int]): Number of requests to send at once.
+
+        Returns:
+            (list[numpy.array]): A 3D or 4D (time) numpy matrix in (time)ZYX order per region.
+
+        Raises:
+            requests.HTTPError on error.
+        """
+        return self.service.get_cutouts(
+            resource, resolution, regions, time_range, id_list,
+            self.url_prefix, self.auth, self.session, self.session_send_opts,
+            access_mode, max_workers)
+
     @check_channel
     def reserve_ids(self, resource, num_ids):
         """Reserve a block of unique, sequential ids for annotations.
@@ -190,3 +190,19 @@ class MetadataService(CloudVolumeService):
             [min_point[2], max_point[2]],
         ]
         return extents
+
+    def get_chunking(self, resource, res):
+        """
+        Gets the chunk grid of a cloudvolume resource at a given mip
+        Args:
+            resource : cloudvolume resource to which to relate metadata
+            res (int): mip level
+        Returns:
+            (tuple): (chunk_size, voxel_offset), both in XYZ order
+        """
+        chunk_size = resource.cloudvolume.meta.chunk_size(res)
+        voxel_offset = resource.cloudvolume.meta.voxel_offset(res)
+        return (
+            tuple(int(c) for c in chunk_size),
+            tuple(int(o) for o in voxel_offset),
+        )
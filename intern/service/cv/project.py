@@ -16,8 +16,6 @@ from intern.service.cv.service import CloudVolumeService
 from intern.service.cv.metadata import MetadataService
 from intern.resource.cv.resource import CloudVolumeResource
 
-from cloudvolume import CloudVolume, Vec
-
 
 class ProjectService(CloudVolumeService):
     """
@@ -107,6 +105,8 @@ class ProjectService(CloudVolumeService):
 
         Returns: dict representing a single mip level that's JSON encodable
         """
+        from cloudvolume import CloudVolume
+
         return CloudVolume.create_new_info(
             num_channels,
             layer_type,
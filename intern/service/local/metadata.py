@@ -0,0 +1,64 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.local.service import LocalService
+
+
+class MetadataService(LocalService):
+    """
+    MetadataService for local memory-mapped volumes.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        LocalService.__init__(self)
+
+    def list_res(self, resource):
+        """
+        What resolution(s) are available to read and write to in the resource.
+
+        Args:
+            resource (LocalResource object)
+
+        Returns:
+            (list) list of ints denoting resolution levels
+        """
+        return resource.list_res()
+
+    def get_extents(self, resource, res=0):
+        """
+        Gets extents of a local resource at a resolution level
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+        Returns:
+             extents (list): [[x-min, x-max], [y-min, y-max], [z-min, z-max]]
+        """
+        size = resource.scale(res)["size"]
+        offset = resource.voxel_offset(res)
+        return [[o, o + s] for o, s in zip(offset, size)]
+
+    def get_chunking(self, resource, res):
+        """
+        Gets the block grid of a local resource at a resolution level
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+        Returns:
+            (tuple): (chunk_size, voxel_offset), both in XYZ order
+        """
+        chunk_size = tuple(int(c) for c in resource.info["chunk_size"])
+        return chunk_size, resource.voxel_offset(res)
@@ -0,0 +1,106 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.local.service import LocalService
+from intern.resource.local.resource import LocalResource, LOCAL_FORMAT, INFO_FILE
+
+import json
+import os
+
+import numpy as np
+
+
+class ProjectService(LocalService):
+    """
+    ProjectService for local memory-mapped volumes.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        LocalService.__init__(self)
+
+    def create_volume(
+        self, path, data_type, volume_size, chunk_size, voxel_offset, voxel_size,
+        voxel_unit, num_res, factor, file_format, overwrite
+    ):
+        """
+        Creates a volume with one file per resolution level.
+
+        The files are created sparse, so creating a large volume is cheap and
+        unwritten regions read as zeros.
+
+        Args:
+            path (str): Directory of the volume.
+            data_type (str): e.g. "uint8", "uint16", "uint64", "float32"
+            volume_size (tuple[int]): XYZ extent of resolution 0.
+            chunk_size (tuple[int]): XYZ block size used to split transfers.
+            voxel_offset (tuple[int]): XYZ coordinates of the first voxel of resolution 0.
+            voxel_size (tuple[float]): XYZ voxel size of resolution 0.
+            voxel_unit (str): Unit of voxel_size, such as "nanometers".
+            num_res (int): Number of resolution levels.
+            factor (tuple[int]): XYZ downsampling factor between levels.
+            file_format (str): "npy" or "raw".
+            overwrite (bool): Replace an existing volume at path.
+
+        Returns:
+            LocalResource
+
+        Raises:
+            FileExistsError if path already holds a volume and overwrite is False.
+            ValueError if file_format is unknown.
+        """
+        if file_format not in ("npy", "raw"):
+            raise ValueError("file_format must be 'npy' or 'raw', not {}.".format(file_format))
+        path = os.path.expanduser(path)
+        info_path = os.path.join(path, INFO_FILE)
+        if os.path.exists(info_path) and not overwrite:
+            raise FileExistsError("{} already holds a volume.".format(path))
+        os.makedirs(path, exist_ok=True)
+
+        scales = []
+        for res in range(num_res):
+            scale = [f ** res for f in factor]
+            size = [-(-v // s) for v, s in zip(volume_size, scale)]
+            filename = "{}.{}".format(res, file_format)
+            shape = tuple(size[::-1])
+            if file_format == "npy":
+                array = np.lib.format.open_memmap(
+                    os.path.join(path, filename), mode="w+", dtype=data_type, shape=shape)
+            else:
+                array = np.memmap(
+                    os.path.join(path, filename), mode="w+", dtype=data_type, shape=shape)
+            array.flush()
+            del array
+            scales.append({
+                "file": filename,
+                "size": size,
+                "voxel_offset": [o // s for o, s in zip(voxel_offset, scale)],
+                "voxel_size": [v * s for v, s in zip(voxel_size, scale)],
+            })
+
+        info = {
+            "format": LOCAL_FORMAT,
+            "data_type": str(np.dtype(data_type)),
+            "voxel_unit": voxel_unit,
+            "chunk_size": list(chunk_size),
+            "scales": scales,
+        }
+        # Written last, so an interrupted create doesn't leave a readable volume.
+        tmp = "{}.{}.tmp".format(info_path, os.getpid())
+        with open(tmp, "w") as fp:
+            json.dump(info, fp, indent=2)
+        os.replace(tmp, info_path)
+        return LocalResource(path)
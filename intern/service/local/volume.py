@@ -0,0 +1,88 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.local.service import LocalService
+
+import numpy as np
+
+
+class VolumeService(LocalService):
+    """
+    VolumeService for local memory-mapped volumes.
+
+    Cutouts are read-only views of the mapped files: nothing is read from
+    disk until the data are used, and then only the pages touched. Copy a
+    cutout to modify it.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        LocalService.__init__(self)
+
+    def get_cutout(self, resource, res, x_range, y_range, z_range):
+        """
+        Method to read a cutout of data
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+        Returns:
+            data (numpy array) : read-only ZYX view of the region
+        """
+        array = resource.array(res)
+        cutout = array[_index(resource, res, x_range, y_range, z_range)].view(np.ndarray)
+        cutout.flags.writeable = False
+        return cutout
+
+    def create_cutout(self, resource, res, x_range, y_range, z_range, data):
+        """
+        Method to write a cutout of data
+        Args:
+            resource (LocalResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+            data (numpy array) : ZYX array of the region
+        Returns:
+            None
+        """
+        expected = tuple(r[1] - r[0] for r in (z_range, y_range, x_range))
+        if tuple(data.shape) != expected:
+            raise ValueError(
+                "data has shape {}, expected {} for the region.".format(tuple(data.shape), expected))
+        array = resource.array(res)
+        array[_index(resource, res, x_range, y_range, z_range)] = data
+
+
+def _index(resource, res, x_range, y_range, z_range):
+    """ZYX index of a region in a level's array.
+
+    Raises:
+        ValueError if the region is not inside the array.
+    """
+    offset = resource.voxel_offset(res)
+    size = resource.scale(res)["size"]
+    for axis, rng, o, s in zip("xyz", (x_range, y_range, z_range), offset, size):
+        if rng[0] < o or rng[1] > o + s or rng[0] >= rng[1]:
+            raise ValueError("{}_range {} is outside the extent [{}, {}].".format(
+                axis, list(rng), o, o + s))
+    return tuple(
+        slice(rng[0] - o, rng[1] - o)
+        for rng, o in zip((x_range, y_range, z_range), offset)
+    )[::-1]
@@ -17,4 +17,17 @@
 Author:
     Luis Rodriguez
 """
-from intern.service.mesh.service import MeshService
\ No newline at end of file
+import sys
+
+from intern.service.mesh.units import VoxelUnits
+
+# The mesh service needs numpy, so it is only imported the first time it is
+# used (PEP 562). Python 3.6 doesn't support module __getattr__.
+if sys.version_info < (3, 7):
+    from intern.service.mesh.service import MeshService
+else:
+    def __getattr__(name):
+        if name == "MeshService":
+            from intern.service.mesh.service import MeshService
+            return MeshService
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -13,22 +13,17 @@
 # limitations under the License.
 
 from intern.service.service import Service
-from enum import IntEnum
+from intern.service.mesh.units import VoxelUnits
+from intern.utils.parallel import block_compute
+from intern.utils.transfer import resource_key
+from collections import deque
+from contextlib import contextmanager
+import multiprocessing
+import hashlib
+import json
+import os
 import numpy as np
 
-class VoxelUnits(IntEnum):
-    """Enum with valid VoxelUnits
-    """
-    nm = 1
-    um = 1000
-    mm = 1000000
-    cm = 10000000
-    nanometers = 1
-    micrometers = 1000
-    millimeters = 1000000
-    centimeters = 10000000
-
-
 class MeshService(Service):
     """ Partial implementation of intern.service.service.Service for the Meshing' services.
 	"""
@@ -48,7 +43,7 @@ class MeshService(Service):
             x_range, y_range, z_range, time_range=None, 
             id_list=[], voxel_unit=VoxelUnits.nm, 
             voxel_size=[4,4,40], simp_fact=0, max_simplification_error=60,
-            normals=False, **kwargs):
+            normals=False, chunk_size=None, parallel=True, **kwargs):
         """Generate a mesh of the specified IDs
 
         Args:
@@ -64,18 +59,24 @@ class MeshService(Service):
             simp_fact (optional int): mesh simplification factor, reduces triangles by given factor
             max_simplification_error (optional int): Max tolerable error in physical distance
             normals (optional bool): if true will calculate normals
+            chunk_size (optional [list]): if set, mesh the volume in sub-blocks of this shape
+                (in the same axis order as `volume`) and stitch the fragments together.
+                Keeps the mesher's memory bounded and allows meshing on several cores.
+            parallel (Union[int, bool]: True): Only used with `chunk_size`. Whether sub-blocks
+                should be meshed using multiprocessing. If set to True, will use all available
+                CPUs. If set to False, will use only one CPU. If set to an integer, will spawn
+                that number of processes.
 
         Returns:
-            (): Return type depends on volume service's implementation.
+            (intern.service.mesh.Mesh): the volume and one mesh per id
 
         Raises:
-            RuntimeError when given invalid resource.
-            Other exceptions may be raised depending on the volume service's implementation.
+            ValueError when the volume is empty or given an invalid voxel unit.
 
         """
 
         from zmesh import Mesher
-        if np.unique(volume).shape[0] == 1:
+        if _is_empty(volume):
             raise ValueError("The volume provided only has one unique ID (0). ID 0 is considered background.")
 
         conv_factor = self._get_conversion_factor(voxel_unit)
@@ -87,23 +88,109 @@ class MeshService(Service):
 
         # Mesh
         mesher = Mesher((x_voxel_size,y_voxel_size,z_voxel_size))
-        mesher.mesh(volume)
+        if chunk_size is None:
+            mesher.mesh(volume)
+            fragments = None
+        else:
+            fragments = self.create_from_blocks(
+                _volume_blocks(volume, x_range, y_range, z_range, chunk_size),
+                x_range, y_range, z_range, id_list, voxel_unit, voxel_size,
+                parallel=parallel)
 
         # If the list is empty then just default to all ID's found in the volume
         if (id_list == []):
-            id_list = mesher.ids()
+            id_list = mesher.ids() if fragments is None else fragments.ids()
 
         # Run the mesher on all specified ID's
+        meshes = {}
         for oid in id_list:
-            mesh = mesher.get_mesh(
-                oid, 
-                normals=normals, 
-                simplification_factor=simp_fact,
-                max_simplification_error= max_simplification_error,
-                )
-            mesh.vertices += [x_range[0]*conv_factor, y_range[0]*conv_factor, z_range[0]*conv_factor]
+            if fragments is None:
+                mesh = mesher.get_mesh(
+                    oid, 
+                    normals=normals, 
+                    simplification_factor=simp_fact,
+                    max_simplification_error= max_simplification_error,
+                    )
+                mesh.vertices += [x_range[0]*conv_factor, y_range[0]*conv_factor, z_range[0]*conv_factor]
+            else:
+                mesh = fragments.merge(
+                    oid, normals, simp_fact, max_simplification_error)
+            meshes[oid] = mesh
+
+        return Mesh([volume, meshes])
+
+    def create_from_blocks(self, blocks,
+            x_range, y_range, z_range, id_list=[],
+            voxel_unit=VoxelUnits.nm, voxel_size=[4,4,40], parallel=True):
+        """Mesh a volume that arrives one block at a time.
+
+        Each block is handed to the meshing processes as soon as it is produced
+        by `blocks`, so when `blocks` downloads lazily (see
+        `intern.utils.transfer.iter_cutout_blocks`) the download of later blocks
+        overlaps with meshing of earlier ones.
+
+        Blocks must overlap their neighbors by one voxel on the high side so that
+        the fragments of an object meet exactly along block boundaries.
+
+        Args:
+            blocks (iterable): ((x_range, y_range, z_range), volume) pairs, where the
+                ranges are the bounds of the block and volume is its ZYX array.
+            x_range (list[int]): x range of the whole region.
+            y_range (list[int]): y range of the whole region.
+            z_range (list[int]): z range of the whole region.
+            id_list (optional [list]): only keep fragments of these ids (all ids if empty).
+            voxel_unit (optional VoxelUnit): voxel unit of measurement to derive conversion factor.
+            voxel_size (optional [list]): list in form [x,y,z] of voxel size. Defaults to 4x4x40nm
+            parallel (Union[int, bool]: True): Whether blocks should be meshed using
+                multiprocessing. If set to True, will use all available CPUs. If set to
+                False, will mesh in this process. If set to an integer, will spawn that
+                number of processes.
+
+        Returns:
+            (intern.service.mesh.MeshFragments): per-id fragments of the region
+
+        Raises:
+            ValueError on an invalid voxel unit or number of processes.
+        """
+        conv_factor = self._get_conversion_factor(voxel_unit)
+        voxel_res = tuple(float(v) * conv_factor for v in voxel_size)
+        origin = (x_range[0], y_range[0], z_range[0])
+        if parallel:
+            if type(parallel) == bool:
+                parallel = multiprocessing.cpu_count()
+            elif parallel > 0:
+                parallel = int(parallel)
+            else:
+                raise ValueError("Parallel must be greater than 0.")
+
+        def _tasks():
+            for bounds, block in blocks:
+                offset = [(bounds[i][0] - origin[i]) * voxel_res[i] for i in range(3)]
+                yield bounds, (block, offset, voxel_res, list(id_list))
+
+        fragments = {}
+
+        def _collect(bounds, result):
+            for oid, mesh in result.items():
+                fragments.setdefault(oid, []).append((bounds, mesh))
 
-        return Mesh([volume, mesh])
+        if parallel:
+            # Only a bounded number of blocks are handed to the pool at a
+            # time, so the copies sent to the workers don't pile up in memory.
+            with multiprocessing.Pool(processes=parallel) as pool:
+                pending = deque()
+                for bounds, task in _tasks():
+                    if len(pending) >= 2 * parallel:
+                        _collect(*_get(pending.popleft()))
+                    pending.append((bounds, pool.apply_async(_mesh_block, task)))
+                while pending:
+                    _collect(*_get(pending.popleft()))
+        else:
+            for bounds, task in _tasks():
+                _collect(bounds, _mesh_block(*task))
+
+        offset = [o * conv_factor for o in origin]
+        return MeshFragments(fragments, voxel_res, offset)
 
     def _get_conversion_factor(self, voxel_unit):
         """
@@ -123,36 +210,383 @@ class MeshService(Service):
         else:
             return voxel_unit.value
 
+def _is_empty(volume):
+    """
+    Check whether a volume is entirely background (0).
+
+    Scans one slab at a time and stops at the first non-zero slab, so this
+    is linear in the worst case and much faster than `np.unique` whenever
+    the volume has any labels.
+
+    Arguments:
+        volume (numpy.ndarray)
+
+    Returns:
+        bool
+    """
+    for slab in volume:
+        if slab.any():
+            return False
+    return True
+
+
+def _get(pending):
+    """Wait for one pending (bounds, AsyncResult) pair."""
+    bounds, result = pending
+    return bounds, result.get()
+
+
+def _volume_blocks(volume, x_range, y_range, z_range, chunk_size):
+    """
+    Split an in-memory ZYX volume into blocks for `MeshService.create_from_blocks`.
+
+    Each block overlaps its neighbors by one voxel on the high side.
+
+    Arguments:
+        volume (numpy.ndarray): Labeled 3D volume.
+        x_range (list[int]): x range of the volume.
+        y_range (list[int]): y range of the volume.
+        z_range (list[int]): z range of the volume.
+        chunk_size (list[int]): Shape of each block, in the axis order of `volume`.
+
+    Yields:
+        ((x_range, y_range, z_range), numpy.ndarray)
+    """
+    # block_compute works in (x, y, z), here it is applied to the array axes.
+    shape = volume.shape
+    blocks = block_compute(
+        0, shape[0], 0, shape[1], 0, shape[2], block_size=chunk_size)
+    for b in blocks:
+        block = volume[
+            b[0][0]: b[0][1] + 1,
+            b[1][0]: b[1][1] + 1,
+            b[2][0]: b[2][1] + 1
+        ]
+        # Array axis 2 is x.
+        bounds = tuple(
+            (r[0] + b[2 - i][0], r[0] + b[2 - i][0] + block.shape[2 - i])
+            for i, r in enumerate((x_range, y_range, z_range))
+        )
+        yield bounds, block
+
+
+def _mesh_block(block, offset, voxel_res, id_list):
+    """
+    Mesh one sub-block without simplification.
+
+    Module-level so it can be sent to a multiprocessing pool.
+
+    Arguments:
+        block (numpy.ndarray): Labeled sub-block.
+        offset (list[float]): Physical (x, y, z) position of the block's first voxel,
+            relative to the region being meshed.
+        voxel_res (tuple[float]): Physical (x, y, z) size of a voxel.
+        id_list (list[int]): Only keep fragments of these ids (all ids if empty).
+
+    Returns:
+        dict: {id: zmesh.Mesh}
+    """
+    from zmesh import Mesher
+    if _is_empty(block):
+        return {}
+
+    mesher = Mesher(voxel_res)
+    mesher.mesh(block)
+    ids = mesher.ids()
+    if id_list:
+        present = set(ids)
+        ids = [oid for oid in id_list if oid in present]
+
+    fragments = {}
+    for oid in ids:
+        mesh = mesher.get_mesh(oid, normals=False, simplification_factor=0)
+        mesh.vertices += np.asarray(offset, dtype=mesh.vertices.dtype)
+        fragments[oid] = mesh
+    mesher.clear()
+    return fragments
+
+
+class MeshFragments:
+    """Per-id mesh fragments of a region meshed one block at a time.
+
+    Fragments can be merged into one mesh per id, or written out as-is in
+    Neuroglancer's legacy precomputed mesh format, which loads an object from
+    several fragment files.
+    """
+    def __init__(self, fragments, voxel_res, offset):
+        """Constructor.
+
+        Args:
+            fragments (dict): {id: [((x_range, y_range, z_range), zmesh.Mesh), ...]},
+                vertices relative to the start of the region.
+            voxel_res (tuple[float]): physical (x, y, z) size of a voxel.
+            offset (list[float]): added to the vertices of every mesh returned or written.
+        """
+        self._fragments = fragments
+        self._voxel_res = voxel_res
+        self._offset = offset
+
+    def ids(self):
+        """Sorted list of the ids that have at least one fragment."""
+        return sorted(self._fragments)
+
+    def fragments(self, oid):
+        """Fragments of one id, with the offset applied.
+
+        Args:
+            oid (int): object id.
+
+        Returns:
+            (list[zmesh.Mesh])
+        """
+        return [self._shift(mesh) for _, mesh in self._fragments.get(oid, [])]
+
+    def merge(self, oid, normals=False, simp_fact=0, max_simplification_error=60):
+        """Join the fragments of one id into a single mesh.
+
+        Vertices shared along block boundaries are merged before simplifying,
+        so simplification sees one continuous surface.
+
+        Args:
+            oid (int): object id.
+            normals (optional bool): if true will calculate normals
+            simp_fact (optional int): mesh simplification factor, reduces triangles by given factor
+            max_simplification_error (optional int): Max tolerable error in physical distance
+
+        Returns:
+            (zmesh.Mesh): empty if the id has no fragments
+        """
+        from zmesh import Mesh as ZMesh, Mesher
+        fragments = [mesh for _, mesh in self._fragments.get(oid, [])]
+        if not fragments:
+            # Same as asking the mesher for an id that isn't in the volume.
+            return ZMesh(
+                np.zeros((0, 3), dtype=np.float32),
+                np.zeros((0, 3), dtype=np.uint32),
+                None,
+            )
+        mesh = ZMesh.concatenate(*fragments).consolidate()
+        mesher = Mesher(self._voxel_res)
+        if simp_fact:
+            mesh = mesher.simplify(
+                mesh,
+                reduction_factor=simp_fact,
+                max_error=max_simplification_error,
+                compute_normals=normals,
+            )
+        elif normals:
+            mesh = mesher.compute_normals(mesh)
+        return self._shift(mesh)
+
+    def write_precomputed(self, path):
+        """Write the fragments in Neuroglancer's legacy precomputed mesh format.
+
+        For every id, a manifest named "<id>:0" lists one fragment file per
+        block, named "<id>:0:<x0>-<x1>_<y0>-<y1>_<z0>-<z1>".
+
+        Args:
+            path (str): directory to write to, created if missing.
+
+        Returns:
+            (list[int]): ids written
+        """
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "info"), "w") as fp:
+            json.dump({"@type": "neuroglancer_legacy_mesh"}, fp)
+
+        for oid, fragments in self._fragments.items():
+            names = []
+            for bounds, mesh in fragments:
+                name = "{}:0:{}".format(
+                    oid, "_".join("{}-{}".format(*r) for r in bounds))
+                with open(os.path.join(path, name), "wb") as fp:
+                    fp.write(self._shift(mesh).to_precomputed())
+                names.append(name)
+            with open(os.path.join(path, "{}:0".format(oid)), "w") as fp:
+                json.dump({"fragments": names}, fp)
+        return self.ids()
+
+    def _shift(self, mesh):
+        mesh = mesh.clone()
+        mesh.vertices += np.asarray(self._offset, dtype=mesh.vertices.dtype)
+        return mesh
+
+
 class Mesh:
+    """Meshes of one or more objects, along with the volume they were made from."""
     def __init__(self, data):
         """Constructor.
 
         Args:
-            data (tuple[raw_volume, mesh]): tuple containing the raw data and the mesh data
+            data (tuple[raw_volume, meshes]): tuple containing the raw data and the mesh data,
+                either a dict {id: zmesh.Mesh} or a single mesh
         """
         self._raw_vol = data[0]
-        self._mesh = data[1]
+        meshes = data[1]
+        if not isinstance(meshes, dict):
+            meshes = {None: meshes}
+        self._meshes = meshes
+
+    @property
+    def _mesh(self):
+        return self.mesh()
+
+    def ids(self):
+        """List of the ids that have a mesh."""
+        return list(self._meshes)
+
+    def mesh(self, oid=None):
+        """Get the mesh of one object.
+
+        Args:
+            oid (optional int): object id. If omitted, the meshes of all objects
+                are combined into one, which is empty if no object was meshed.
+
+        Returns:
+            (zmesh.Mesh)
 
-    def ng_mesh(self):
+        Raises:
+            KeyError if there is no mesh for oid.
+        """
+        if oid is not None:
+            return self._meshes[oid]
+        if len(self._meshes) == 1:
+            return next(iter(self._meshes.values()))
+        from zmesh import Mesh as ZMesh
+        if not self._meshes:
+            return ZMesh(
+                np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint32), None)
+        return ZMesh.concatenate(*self._meshes.values())
+
+    def ng_mesh(self, oid=None):
         """Convert mesh to precompute format for Neuroglancer visualization
 
         Args:
-            mesh: mesh to convert.
+            oid (optional int): object id. If omitted, all objects are converted together.
 
         Returns:
             (): Returns mesh precompute format
 
         """
-        return self._mesh.to_precomputed()
+        return self.mesh(oid).to_precomputed()
         
-    def obj_mesh(self):
+    def obj_mesh(self, oid=None):
         """Convert mesh to obj
 
         Args:
-            mesh: mesh to convert.
+            oid (optional int): object id. If omitted, all objects are converted together.
 
         Returns:
             (): Returns mesh obj format
 
         """
-        return self._mesh.to_obj()
+        return self.mesh(oid).to_obj()
+
+
+class MeshCache:
+    """On-disk cache of meshes, so repeated requests don't re-mesh.
+
+    Meshes are stored one file per object under a directory named after a
+    hash of everything that determines them: the resource, resolution,
+    bounding box, voxel size and unit, and simplification parameters. Only
+    the ids missing from the cache need to be meshed again.
+
+    The resource is identified by its cutout route (or url), not by the
+    remote it lives on, so use one cache directory per data store.
+    """
+    def __init__(self, path):
+        """Constructor.
+
+        Args:
+            path (str): directory to keep the cache in, created if missing.
+        """
+        self._path = os.path.expanduser(path)
+
+    def key(self, resource, resolution, x_range, y_range, z_range, time_range=None,
+            voxel_unit=VoxelUnits.nm, voxel_size=[4,4,40], simp_fact=0,
+            max_simplification_error=60, normals=False):
+        """Cache key for the meshes of one region.
+
+        Args:
+            resource (intern.resource.Resource): Resource the region was cut out from.
+            (remaining): Same as `MeshService.create`.
+
+        Returns:
+            (str)
+        """
+        params = [
+            resource_key(resource), int(resolution),
+            [list(map(int, r)) for r in (x_range, y_range, z_range)],
+            None if time_range is None else list(map(int, time_range)),
+            int(voxel_unit), list(map(float, voxel_size)),
+            simp_fact, max_simplification_error, bool(normals),
+        ]
+        return hashlib.sha1(json.dumps(params).encode("utf-8")).hexdigest()
+
+    def get(self, key, oid):
+        """Get a cached mesh.
+
+        Args:
+            key (str): key of the region, from `key()`.
+            oid (int): object id.
+
+        Returns:
+            (zmesh.Mesh): None if the mesh isn't cached
+        """
+        from zmesh import Mesh as ZMesh
+        filename = os.path.join(self._path, key, "{}.npz".format(oid))
+        if not os.path.isfile(filename):
+            return None
+        with np.load(filename) as data:
+            normals = data["normals"] if "normals" in data else None
+            return ZMesh(data["vertices"], data["faces"], normals)
+
+    def put(self, key, oid, mesh):
+        """Add a mesh to the cache.
+
+        Args:
+            key (str): key of the region, from `key()`.
+            oid (int): object id.
+            mesh (zmesh.Mesh)
+        """
+        arrays = {"vertices": mesh.vertices, "faces": mesh.faces}
+        if mesh.normals is not None and len(mesh.normals):
+            arrays["normals"] = mesh.normals
+        with self._open(key, "{}.npz".format(oid), "wb") as fp:
+            np.savez(fp, **arrays)
+
+    def get_ids(self, key):
+        """Ids found in a region, if it was meshed without an id list.
+
+        Args:
+            key (str): key of the region, from `key()`.
+
+        Returns:
+            (list[int]): None if not known
+        """
+        filename = os.path.join(self._path, key, "ids.json")
+        if not os.path.isfile(filename):
+            return None
+        with open(filename) as fp:
+            return json.load(fp)
+
+    def put_ids(self, key, ids):
+        """Record the ids found in a region.
+
+        Args:
+            key (str): key of the region, from `key()`.
+            ids (list[int])
+        """
+        with self._open(key, "ids.json", "w") as fp:
+            json.dump([int(oid) for oid in ids], fp)
+
+    @contextmanager
+    def _open(self, key, name, mode):
+        # Write to a temporary file and rename it into place, so concurrent
+        # readers never see a partial file.
+        directory = os.path.join(self._path, key)
+        os.makedirs(directory, exist_ok=True)
+        tmp = os.path.join(directory, ".{}.{}".format(name, os.getpid()))
+        with open(tmp, mode) as fp:
+            yield fp
+        os.replace(tmp, os.path.join(directory, name))
@@ -14,7 +14,15 @@
 
 from intern.service.mesh.service import MeshService
 from intern.service.mesh.service import VoxelUnits
+from intern.service.mesh.service import MeshCache
+from intern.service.mesh.service import Mesh
+from intern.remote.boss import BossRemote
+from intern.resource.boss.resource import ChannelResource
+import json
 import numpy
+import os
+import shutil
+import tempfile
 import unittest
 from mock import patch, ANY
 import mock
@@ -60,4 +68,202 @@ class TestMesh(unittest.TestCase):
         self.assertEqual(voxel_conv, self.mesh._get_conversion_factor(voxel_unit))
         voxel_unit = VoxelUnits.cm
         voxel_conv = 10000000
-        self.assertEqual(voxel_conv, self.mesh._get_conversion_factor(voxel_unit))
\ No newline at end of file
+        self.assertEqual(voxel_conv, self.mesh._get_conversion_factor(voxel_unit))
+
+    def test_empty_volume(self):
+        volume = numpy.zeros((10, 20, 30), numpy.uint64)
+        with self.assertRaises(ValueError):
+            self.mesh.create(volume, self.x_rng, self.y_rng, self.z_rng)
+
+    def test_chunked_mesh_matches_single_pass(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+        volume[10:19, 2:12, 20:38] = 9
+
+        for oid in [7, 9]:
+            whole = self.mesh.create(
+                volume, self.x_rng, self.y_rng, self.z_rng, id_list=[oid])
+            chunked = self.mesh.create(
+                volume, self.x_rng, self.y_rng, self.z_rng, id_list=[oid],
+                chunk_size=(8, 16, 16), parallel=False)
+            self.assertEqual(_triangles(whole._mesh), _triangles(chunked._mesh))
+
+    def test_chunked_mesh_in_parallel(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+
+        whole = self.mesh.create(volume, self.x_rng, self.y_rng, self.z_rng)
+        chunked = self.mesh.create(
+            volume, self.x_rng, self.y_rng, self.z_rng,
+            chunk_size=(8, 16, 16), parallel=2)
+        self.assertEqual(_triangles(whole._mesh), _triangles(chunked._mesh))
+
+    def test_chunked_mesh_with_simplification(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+
+        whole = self.mesh.create(volume, self.x_rng, self.y_rng, self.z_rng)
+        chunked = self.mesh.create(
+            volume, self.x_rng, self.y_rng, self.z_rng, simp_fact=10,
+            normals=True, chunk_size=(8, 16, 16), parallel=False)
+        self.assertLess(len(chunked._mesh.faces), len(whole._mesh.faces))
+        self.assertEqual(chunked._mesh.normals.shape, chunked._mesh.vertices.shape)
+
+    def test_create_from_blocks_fragments_merge(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+        volume[10:19, 2:12, 20:38] = 9
+
+        whole = self.mesh.create(volume, self.x_rng, self.y_rng, self.z_rng, id_list=[9])
+        fragments = self.mesh.create_from_blocks(
+            _blocks(volume, self.x_rng, self.y_rng, self.z_rng, (16, 16, 8)),
+            self.x_rng, self.y_rng, self.z_rng, parallel=False)
+        self.assertEqual(fragments.ids(), [7, 9])
+        self.assertGreater(len(fragments.fragments(9)), 1)
+        self.assertEqual(_triangles(whole._mesh), _triangles(fragments.merge(9)))
+        self.assertEqual(len(fragments.merge(3).faces), 0)
+
+    def test_write_precomputed(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+        fragments = self.mesh.create_from_blocks(
+            _blocks(volume, self.x_rng, self.y_rng, self.z_rng, (16, 16, 8)),
+            self.x_rng, self.y_rng, self.z_rng, parallel=False)
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.assertEqual(fragments.write_precomputed(path), [7])
+        with open(os.path.join(path, "info")) as fp:
+            self.assertEqual(json.load(fp), {"@type": "neuroglancer_legacy_mesh"})
+        with open(os.path.join(path, "7:0")) as fp:
+            names = json.load(fp)["fragments"]
+        self.assertEqual(len(names), len(fragments.fragments(7)))
+        for name in names:
+            self.assertTrue(name.startswith("7:0:"))
+            self.assertTrue(os.path.isfile(os.path.join(path, name)))
+
+    def test_remote_stream_mesh(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+        x_rng, y_rng, z_rng = [100, 140], [200, 230], [10, 30]
+
+        def get_cutout(resource, resolution, x_range, y_range, z_range, **kwargs):
+            return volume[
+                z_range[0] - z_rng[0]: z_range[1] - z_rng[0],
+                y_range[0] - y_rng[0]: y_range[1] - y_rng[0],
+                x_range[0] - x_rng[0]: x_range[1] - x_rng[0]]
+
+        rmt = BossRemote({"protocol": "https", "host": "test.com", "token": "my_secret"})
+        chan = ChannelResource("seg", "col", "exp", type="annotation", datatype="uint64")
+        whole = self.mesh.create(volume, x_rng, y_rng, z_rng)
+        with patch.object(rmt, "get_cutout", side_effect=get_cutout) as fake:
+            mesh = rmt.mesh(
+                chan, 0, x_rng, y_rng, z_rng, stream=True,
+                mesh_chunk_size=(8, 16, 16), mesh_parallel=False)
+        self.assertGreater(fake.call_count, 1)
+        self.assertIsInstance(mesh, Mesh)
+        self.assertEqual(_triangles(whole._mesh), _triangles(mesh.mesh(7)))
+
+        with patch.object(rmt, "get_cutout", side_effect=get_cutout):
+            fragments = rmt.mesh_fragments(
+                chan, 0, x_rng, y_rng, z_rng,
+                mesh_chunk_size=(8, 16, 16), mesh_parallel=False)
+        self.assertGreater(len(fragments.fragments(7)), 1)
+        self.assertEqual(_triangles(whole._mesh), _triangles(fragments.merge(7)))
+
+    def test_empty_volume_gives_an_empty_mesh(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        x_rng, y_rng, z_rng = [100, 140], [200, 230], [10, 30]
+
+        def get_cutout(resource, resolution, x_range, y_range, z_range, **kwargs):
+            return volume[
+                z_range[0] - z_rng[0]: z_range[1] - z_rng[0],
+                y_range[0] - y_rng[0]: y_range[1] - y_rng[0],
+                x_range[0] - x_rng[0]: x_range[1] - x_rng[0]]
+
+        rmt = BossRemote({"protocol": "https", "host": "test.com", "token": "my_secret"})
+        chan = ChannelResource("seg", "col", "exp", type="annotation", datatype="uint64")
+        with patch.object(rmt, "get_cutout", side_effect=get_cutout):
+            mesh = rmt.mesh(
+                chan, 0, x_rng, y_rng, z_rng, stream=True,
+                mesh_chunk_size=(8, 16, 16), mesh_parallel=False)
+        self.assertIsInstance(mesh, Mesh)
+        self.assertEqual(mesh.ids(), [])
+        self.assertEqual(len(mesh.mesh().faces), 0)
+        self.assertEqual(len(mesh.mesh().vertices), 0)
+        self.assertIsInstance(mesh.ng_mesh(), bytes)
+        with self.assertRaises(KeyError):
+            mesh.mesh(7)
+
+    def test_create_keeps_every_mesh(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+        volume[10:19, 2:12, 20:38] = 9
+
+        mesh = self.mesh.create(volume, self.x_rng, self.y_rng, self.z_rng)
+        self.assertEqual(sorted(mesh.ids()), [7, 9])
+        single = self.mesh.create(volume, self.x_rng, self.y_rng, self.z_rng, id_list=[7])
+        self.assertEqual(_triangles(single.mesh(7)), _triangles(mesh.mesh(7)))
+        self.assertEqual(
+            len(mesh.mesh().faces), len(mesh.mesh(7).faces) + len(mesh.mesh(9).faces))
+        self.assertEqual(single.obj_mesh(), single.obj_mesh(7))
+
+    def test_remote_mesh_cache(self):
+        volume = numpy.zeros((20, 30, 40), numpy.uint64)
+        volume[5:15, 10:25, 3:30] = 7
+        volume[10:19, 2:12, 20:38] = 9
+        x_rng, y_rng, z_rng = [100, 140], [200, 230], [10, 30]
+
+        def get_cutout(resource, resolution, x_range, y_range, z_range, time_range, id_list, **kwargs):
+            if id_list:
+                return numpy.where(numpy.isin(volume, id_list), volume, 0)
+            return volume
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        rmt = BossRemote({"protocol": "https", "host": "test.com", "token": "my_secret"})
+        chan = ChannelResource("seg", "col", "exp", type="annotation", datatype="uint64")
+        with patch.object(rmt._volume, "get_cutout", side_effect=get_cutout) as fake:
+            first = rmt.mesh(chan, 0, x_rng, y_rng, z_rng, id_list=[7], cache=path)
+            both = rmt.mesh(chan, 0, x_rng, y_rng, z_rng, id_list=[7, 9], cache=path)
+            self.assertEqual(fake.call_count, 2)
+            self.assertEqual(fake.call_args[0][6], [9])
+            again = rmt.mesh(chan, 0, x_rng, y_rng, z_rng, id_list=[9, 7], cache=MeshCache(path))
+            self.assertEqual(fake.call_count, 2)
+            self.assertIsNone(again._raw_vol)
+
+            rmt.mesh(chan, 0, x_rng, y_rng, z_rng, cache=path)
+            everything = rmt.mesh(chan, 0, x_rng, y_rng, z_rng, cache=path)
+            self.assertEqual(fake.call_count, 3)
+
+            rmt.mesh(chan, 0, x_rng, y_rng, z_rng, id_list=[7], simp_fact=10, cache=path)
+            self.assertEqual(fake.call_count, 4)
+
+        self.assertEqual(sorted(everything.ids()), [7, 9])
+        for oid in [7, 9]:
+            self.assertEqual(_triangles(both.mesh(oid)), _triangles(again.mesh(oid)))
+        self.assertEqual(_triangles(first.mesh(7)), _triangles(again.mesh(7)))
+
+
+def _blocks(volume, x_range, y_range, z_range, block_size):
+    """Split a ZYX volume into blocks overlapping by one voxel, in reverse order."""
+    blocks = []
+    for z in range(0, volume.shape[0], block_size[2]):
+        for y in range(0, volume.shape[1], block_size[1]):
+            for x in range(0, volume.shape[2], block_size[0]):
+                block = volume[z:z + block_size[2] + 1, y:y + block_size[1] + 1, x:x + block_size[0] + 1]
+                bounds = (
+                    (x_range[0] + x, x_range[0] + x + block.shape[2]),
+                    (y_range[0] + y, y_range[0] + y + block.shape[1]),
+                    (z_range[0] + z, z_range[0] + z + block.shape[0]),
+                )
+                blocks.append((bounds, block))
+    return reversed(blocks)
+
+
+def _triangles(mesh):
+    """Triangles of a mesh as sorted vertex coordinates, independent of vertex order."""
+    return sorted(
+        tuple(sorted(map(tuple, mesh.vertices[face].tolist())))
+        for face in mesh.faces
+    )
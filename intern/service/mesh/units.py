@@ -0,0 +1,32 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Units of measurement for meshing.
+
+Kept apart from the mesh service so that it can be imported without numpy.
+"""
+from enum import IntEnum
+
+
+class VoxelUnits(IntEnum):
+    """Enum with valid VoxelUnits
+    """
+    nm = 1
+    um = 1000
+    mm = 1000000
+    cm = 10000000
+    nanometers = 1
+    micrometers = 1000
+    millimeters = 1000000
+    centimeters = 10000000
@@ -0,0 +1,72 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.zarr.service import ZarrService
+from intern.resource.zarr.resource import ZarrResource
+
+import os
+
+
+class ProjectService(ZarrService):
+    """
+    ProjectService for Zarr and N5 stores.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        ZarrService.__init__(self)
+
+    def create_volume(
+        self, path, data_type, volume_size, chunk_size, voxel_offset, num_res, factor, overwrite
+    ):
+        """
+        Creates a Zarr or N5 store with one array per resolution level.
+
+        Args:
+            path (str): Directory of the store. N5 is used if it ends with ".n5".
+            data_type (str): e.g. "uint8", "uint16", "uint64", "float32"
+            volume_size (tuple[int]): XYZ extent of resolution 0.
+            chunk_size (tuple[int]): XYZ chunk size of every level.
+            voxel_offset (tuple[int]): XYZ coordinates of the first voxel of resolution 0.
+            num_res (int): Number of resolution levels.
+            factor (tuple[int]): XYZ downsampling factor between levels.
+            overwrite (bool): Replace an existing store at path.
+
+        Returns:
+            ZarrResource
+        """
+        # Imported here so that zarr stays an optional dependency.
+        import zarr
+
+        path = os.path.expanduser(path)
+        if path.rstrip("/").endswith(".n5"):
+            store = zarr.N5Store(path)
+        else:
+            store = zarr.DirectoryStore(path)
+        group = zarr.group(store=store, overwrite=overwrite)
+        for res in range(num_res):
+            scale = [f ** res for f in factor]
+            size = [-(-v // s) for v, s in zip(volume_size, scale)]
+            offset = [o // s for o, s in zip(voxel_offset, scale)]
+            array = group.create_dataset(
+                str(res),
+                shape=size[::-1],
+                chunks=tuple(chunk_size)[::-1],
+                dtype=data_type,
+                overwrite=overwrite,
+            )
+            array.attrs["voxel_offset"] = offset
+        return ZarrResource(path)
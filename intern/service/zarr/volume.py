@@ -0,0 +1,155 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.service.zarr.service import ZarrService
+from intern.utils.parallel import block_compute
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class VolumeService(ZarrService):
+    """
+    VolumeService for Zarr and N5 stores.
+
+    Regions are split along the array's chunk grid and the chunks are read or
+    written on a thread pool; decompression releases the GIL, so chunks are
+    decoded in parallel. Every chunk is written by exactly one thread, so
+    unaligned writes are safe.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        ZarrService.__init__(self)
+
+    def get_cutout(self, resource, res, x_range, y_range, z_range, parallel=True):
+        """
+        Method to read a cutout of data
+        Args:
+            resource (ZarrResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+            parallel (Union[int, bool]: True): Number of threads reading chunks.
+                True picks one from the CPU count, False reads on the calling thread.
+        Returns:
+            data (numpy array) : ZYX array of the region
+        """
+        array, index, blocks = self._plan(resource, res, x_range, y_range, z_range)
+        workers = _workers(parallel)
+        if workers == 1 or len(blocks) == 1:
+            return array[index]
+
+        result = np.empty([r[1] - r[0] for r in (z_range, y_range, x_range)], dtype=array.dtype)
+        origin = (x_range[0], y_range[0], z_range[0])
+
+        def _read(block):
+            source, dest = _block_indexes(block, resource.voxel_offset(res), origin)
+            result[dest] = array[source]
+
+        _run(_read, blocks, workers)
+        return result
+
+    def create_cutout(self, resource, res, x_range, y_range, z_range, data, parallel=True):
+        """
+        Method to write a cutout of data
+        Args:
+            resource (ZarrResource object)
+            res (int): resolution level
+            x_range (list) : x range within the 3D space
+            y_range (list) : y range within the 3D space
+            z_range (list) : z range within the 3D space
+            data (numpy array) : ZYX array of the region
+            parallel (Union[int, bool]: True): Number of threads writing chunks.
+                True picks one from the CPU count, False writes on the calling thread.
+        Returns:
+            None
+        """
+        expected = tuple(r[1] - r[0] for r in (z_range, y_range, x_range))
+        if tuple(data.shape) != expected:
+            raise ValueError(
+                "data has shape {}, expected {} for the region.".format(tuple(data.shape), expected))
+
+        array, index, blocks = self._plan(resource, res, x_range, y_range, z_range)
+        workers = _workers(parallel)
+        if workers == 1 or len(blocks) == 1:
+            array[index] = data
+            return
+
+        origin = (x_range[0], y_range[0], z_range[0])
+
+        def _write(block):
+            dest, source = _block_indexes(block, resource.voxel_offset(res), origin)
+            array[dest] = data[source]
+
+        _run(_write, blocks, workers)
+
+    def _plan(self, resource, res, x_range, y_range, z_range):
+        """Check a region against a level's extents and split it along the chunk grid.
+
+        Returns:
+            (tuple): (zarr.Array, ZYX index of the whole region in the array,
+                chunk-aligned blocks in XYZ coordinates)
+
+        Raises:
+            ValueError if the region is not inside the array.
+        """
+        array = resource.array(res)
+        offset = resource.voxel_offset(res)
+        shape = array.shape[::-1]
+        for axis, rng, o, s in zip("xyz", (x_range, y_range, z_range), offset, shape):
+            if rng[0] < o or rng[1] > o + s or rng[0] >= rng[1]:
+                raise ValueError("{}_range {} is outside the extent [{}, {}].".format(
+                    axis, list(rng), o, o + s))
+
+        index, _ = _block_indexes((x_range, y_range, z_range), offset, offset)
+        blocks = block_compute(
+            x_range[0], x_range[1],
+            y_range[0], y_range[1],
+            z_range[0], z_range[1],
+            origin=offset,
+            block_size=array.chunks[::-1],
+        )
+        return array, index, blocks
+
+
+def _workers(parallel):
+    """Number of threads for a parallel argument; None lets ThreadPoolExecutor choose."""
+    if type(parallel) == bool:
+        return None if parallel else 1
+    if parallel > 0:
+        return int(parallel)
+    raise ValueError("Parallel must be greater than 0.")
+
+
+def _block_indexes(block, offset, origin):
+    """ZYX indexes of a block in the array (whose first voxel is at offset) and in the region (starting at origin)."""
+    in_array = tuple(slice(b[0] - o, b[1] - o) for b, o in zip(block, offset))[::-1]
+    in_region = tuple(slice(b[0] - o, b[1] - o) for b, o in zip(block, origin))[::-1]
+    return in_array, in_region
+
+
+def _run(fcn, blocks, workers):
+    """Call fcn on every block on a thread pool, raising the first failure."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fcn, block) for block in blocks]
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
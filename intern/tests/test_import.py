@@ -0,0 +1,77 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Heavy dependencies that must only be imported once they are needed.
+HEAVY = ["numpy", "requests", "blosc", "zmesh", "cloudvolume"]
+
+
+def _imported_after(statement):
+    """Run `statement` in a fresh interpreter and list the heavy modules it imported."""
+    code = "import json, sys\n{}\nprint(json.dumps(sorted(m for m in {!r} if m in sys.modules)))".format(
+        statement, HEAVY + ["intern.remote.boss", "intern.service.mesh.service"]
+    )
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "Lazy imports need module __getattr__ (PEP 562).")
+class TestImport(unittest.TestCase):
+    def test_import_intern_is_light(self):
+        self.assertEqual(_imported_after("import intern"), [])
+
+    def test_uri_parser_is_light(self):
+        self.assertEqual(_imported_after("from intern.convenience import parse_fquri"), [])
+
+    def test_remote_base_is_light(self):
+        self.assertEqual(_imported_after("from intern.remote import Remote"), [])
+        self.assertEqual(_imported_after("from intern.service.mesh import VoxelUnits"), [])
+
+    def test_cloudvolume_remote_does_not_import_cloudvolume(self):
+        imported = _imported_after("import intern.remote.cv")
+        self.assertNotIn("cloudvolume", imported)
+        self.assertNotIn("zmesh", imported)
+
+    def test_array_is_loaded_on_use(self):
+        imported = _imported_after(
+            "import intern\n"
+            "assert intern.array.__name__ == 'array'\n"
+            "from intern.convenience import array, AxisOrder\n"
+            "assert array is intern.array"
+        )
+        self.assertIn("intern.remote.boss", imported)
+
+    def test_array_is_the_class_after_submodule_import(self):
+        _imported_after(
+            "import intern.convenience.sampler\n"
+            "from intern.convenience import array\n"
+            "assert isinstance(array, type), array\n"
+            "import intern.convenience.array\n"
+            "assert isinstance(intern.convenience.array, type)\n"
+            "assert intern.array is array\n"
+            "from intern.convenience.array import AxisOrder\n"
+            "from intern.convenience import AxisOrder as order\n"
+            "assert order is AxisOrder"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,261 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Resumable bulk uploads.
+
+`ingest_cutout` uploads a large region block by block, several blocks at a
+time, and records every finished block in an IngestManifest (a small SQLite
+file). Running the same ingest again after a crash or a cancellation skips
+the blocks that the manifest lists as done:
+
+    with IngestManifest("ingest.sqlite") as manifest:
+        rmt.ingest_cutout(chan, 0, x_rng, y_rng, z_rng, np.load(path, mmap_mode="r"),
+                          manifest=manifest)
+
+The source data is only sliced one block at a time, so it can be a numpy
+memmap, an h5py dataset or any other array-like that loads lazily.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from intern.utils.parallel import block_compute
+from intern.utils.progress import ProgressTracker
+from intern.utils.transfer import resource_key, transfer_block_size
+
+
+class IngestManifest(object):
+    """SQLite record of the blocks of an ingest that have been uploaded.
+
+    Blocks are identified by resource, resolution, time range and their
+    bounds, so one manifest can track several ingests. Each block is
+    committed as soon as its upload succeeds.
+    """
+
+    def __init__(self, path):
+        """Constructor.
+
+        Args:
+            path (str): SQLite file to use. Created if it doesn't exist.
+                ":memory:" keeps the manifest in memory.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path if path == ":memory:" else os.path.expanduser(path),
+            check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " resource TEXT NOT NULL, resolution INTEGER NOT NULL, time_range TEXT NOT NULL,"
+            " x_start INTEGER NOT NULL, x_stop INTEGER NOT NULL,"
+            " y_start INTEGER NOT NULL, y_stop INTEGER NOT NULL,"
+            " z_start INTEGER NOT NULL, z_stop INTEGER NOT NULL,"
+            " PRIMARY KEY (resource, resolution, time_range,"
+            "  x_start, x_stop, y_start, y_stop, z_start, z_stop))"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def done_blocks(self, resource, resolution, time_range=None):
+        """Blocks recorded as uploaded.
+
+        Args:
+            resource (intern.resource.Resource): Resource uploaded to.
+            resolution (int): Resolution uploaded to.
+            time_range (optional [list[int]]): Time range uploaded, if any.
+
+        Returns:
+            (set[tuple]): ((x_start, x_stop), (y_start, y_stop), (z_start, z_stop)) of each block.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT x_start, x_stop, y_start, y_stop, z_start, z_stop FROM blocks"
+                " WHERE resource = ? AND resolution = ? AND time_range = ?",
+                (resource_key(resource), int(resolution), _time_key(time_range))
+            ).fetchall()
+        return {((r[0], r[1]), (r[2], r[3]), (r[4], r[5])) for r in rows}
+
+    def mark_done(self, resource, resolution, block, time_range=None):
+        """Record one block as uploaded.
+
+        Args:
+            resource (intern.resource.Resource): Resource uploaded to.
+            resolution (int): Resolution uploaded to.
+            block (tuple): (x_range, y_range, z_range) of the block.
+            time_range (optional [list[int]]): Time range uploaded, if any.
+        """
+        (x0, x1), (y0, y1), (z0, z1) = block
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (resource_key(resource), int(resolution), _time_key(time_range),
+                 int(x0), int(x1), int(y0), int(y1), int(z0), int(z1))
+            )
+
+    def reset(self, resource, resolution, time_range=None):
+        """Forget the uploaded blocks of one ingest, so that it starts over."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM blocks WHERE resource = ? AND resolution = ? AND time_range = ?",
+                (resource_key(resource), int(resolution), _time_key(time_range))
+            )
+
+
+def _time_key(time_range):
+    return "" if time_range is None else "{}:{}".format(*time_range)
+
+
+def ingest_cutout(
+    dest,
+    resource,
+    resolution,
+    x_range,
+    y_range,
+    z_range,
+    data,
+    manifest=None,
+    time_range=None,
+    block_size=None,
+    max_workers=4,
+    progress=None,
+    cancel=None,
+):
+    """
+    Upload a large region block by block, skipping blocks already uploaded.
+
+    Blocks are aligned to the destination's chunk grid and uploaded
+    concurrently. When a manifest is given, each block is recorded in it as
+    soon as its upload succeeds, and blocks it already lists are skipped, so
+    an interrupted ingest can be resumed by running it again with the same
+    arguments. Changing `block_size` between runs changes the block plan, so
+    blocks recorded by the earlier run are uploaded again.
+
+    Arguments:
+        dest (intern.remote.Remote): Remote to upload to.
+        resource (intern.resource.Resource): Resource to upload to.
+        resolution (int): 0 indicates native resolution.
+        x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+        y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+        z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+        data (array-like): The whole region, in the axis order `dest.create_cutout`
+            takes (with a leading time axis if `time_range` is given). It is
+            sliced one block at a time.
+        manifest (optional[Union[IngestManifest, str]]): Manifest, or path of
+            its SQLite file. Without one, the ingest can't be resumed.
+        time_range (optional [list[int]]): time range such as [30, 40] which means t>=30 and t<40.
+        block_size (optional[Tuple[int, int, int]]): Size of each block in XYZ
+            order. Defaults to a multiple of the destination chunk size.
+        max_workers (int: 4): Number of blocks to upload concurrently.
+        progress (optional[callable]): Called with an intern.utils.progress.Progress
+            after each block is uploaded. Skipped blocks are not counted.
+        cancel (optional[intern.utils.progress.CancellationToken]): Stops the
+            ingest before its next block, raising TransferCancelled once the
+            blocks in flight have finished.
+
+    Returns:
+        (int): The number of blocks uploaded by this call.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be greater than 0.")
+    expected = tuple(r[1] - r[0] for r in (x_range, y_range, z_range))
+    if dest.cutout_axis_order != "XYZ":
+        expected = expected[::-1]
+    if time_range is not None:
+        expected = (time_range[1] - time_range[0],) + expected
+    if tuple(data.shape) != expected:
+        raise ValueError(
+            "data has shape {}, expected {} for the region.".format(tuple(data.shape), expected))
+
+    if isinstance(manifest, str):
+        with IngestManifest(manifest) as opened:
+            return ingest_cutout(
+                dest, resource, resolution, x_range, y_range, z_range, data,
+                manifest=opened, time_range=time_range, block_size=block_size,
+                max_workers=max_workers, progress=progress, cancel=cancel)
+
+    chunk_size, origin = dest.get_cutout_chunking(resource, resolution)
+    if block_size is None:
+        block_size = transfer_block_size(chunk_size)
+
+    blocks = block_compute(
+        x_range[0], x_range[1],
+        y_range[0], y_range[1],
+        z_range[0], z_range[1],
+        origin=origin,
+        block_size=block_size,
+    )
+    if manifest is not None:
+        done = manifest.done_blocks(resource, resolution, time_range)
+        blocks = [b for b in blocks if tuple(map(tuple, b)) not in done]
+
+    itemsize = np.dtype(data.dtype).itemsize
+    tracker = ProgressTracker(
+        len(blocks),
+        sum(itemsize * int(np.prod([stop - start for start, stop in b])) for b in blocks),
+        progress,
+    )
+
+    def _upload(block):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        x, y, z = block
+        index = (
+            slice(x[0] - x_range[0], x[1] - x_range[0]),
+            slice(y[0] - y_range[0], y[1] - y_range[0]),
+            slice(z[0] - z_range[0], z[1] - z_range[0]),
+        )
+        if dest.cutout_axis_order != "XYZ":
+            index = index[::-1]
+        if time_range is not None:
+            index = (slice(None),) + index
+        block_data = np.asarray(data[index])
+        if time_range is None:
+            dest.create_cutout(resource, resolution, x, y, z, block_data)
+        else:
+            dest.create_cutout(resource, resolution, x, y, z, block_data, time_range=time_range)
+        if manifest is not None:
+            manifest.mark_done(resource, resolution, block, time_range)
+        tracker.update(block_data.nbytes)
+
+    # Keep a bounded window of blocks in flight so that only a few blocks
+    # of the source are ever loaded at once.
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for block in blocks:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                if len(in_flight) >= max_workers:
+                    in_flight.popleft().result()
+                in_flight.append(executor.submit(_upload, block))
+            while in_flight:
+                in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    return len(blocks)
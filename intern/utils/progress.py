@@ -0,0 +1,107 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Progress reporting and cooperative cancellation for chunked transfers.
+
+Long-running chunked operations accept a `progress` callback, called with a
+Progress after every chunk, and a `cancel` CancellationToken. Cancelling the
+token from another thread (for example a signal handler or a scheduler) stops
+the operation before its next chunk and raises TransferCancelled; chunks
+already transferred are not rolled back.
+"""
+
+from collections import namedtuple
+import threading
+import time
+
+Progress = namedtuple("Progress", [
+    "chunks_done",
+    "chunks_total",
+    "bytes_done",
+    "bytes_total",      # None if the size isn't known up front
+    "elapsed_seconds",
+    "eta_seconds",      # None until the first byte is done
+])
+
+
+class TransferCancelled(Exception):
+    """Raised by an operation that stopped because its CancellationToken was cancelled."""
+    pass
+
+
+class CancellationToken(object):
+    """Thread-safe flag used to ask a running transfer to stop."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Ask the operations using this token to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """
+        Raises:
+            TransferCancelled if the token was cancelled.
+        """
+        if self._event.is_set():
+            raise TransferCancelled("The transfer was cancelled.")
+
+
+class ProgressTracker(object):
+    """Counts finished chunks and reports them to a progress callback."""
+
+    def __init__(self, chunks_total, bytes_total, callback=None):
+        """Constructor.
+
+        Args:
+            chunks_total (int): Number of chunks in the operation.
+            bytes_total (optional[int]): Uncompressed size of the whole operation,
+                or None if it isn't known up front.
+            callback (optional[callable]): Called with a Progress after each chunk.
+        """
+        self.chunks_total = chunks_total
+        self.bytes_total = bytes_total
+        self.chunks_done = 0
+        self.bytes_done = 0
+        self._callback = callback
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def update(self, nbytes):
+        """Record one finished chunk of `nbytes` bytes.
+
+        Returns:
+            (Progress)
+        """
+        with self._lock:
+            self.chunks_done += 1
+            self.bytes_done += nbytes
+            elapsed = time.perf_counter() - self._start
+            eta = None
+            if self.bytes_total is not None and self.bytes_done:
+                eta = elapsed / self.bytes_done * max(0, self.bytes_total - self.bytes_done)
+            elif self.bytes_total is None:
+                eta = elapsed / self.chunks_done * max(0, self.chunks_total - self.chunks_done)
+            progress = Progress(
+                self.chunks_done, self.chunks_total, self.bytes_done, self.bytes_total,
+                elapsed, eta)
+        if self._callback is not None:
+            self._callback(progress)
+        return progress
@@ -0,0 +1,258 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client-side downsampling of a channel into a resolution hierarchy.
+
+`build_pyramid` reads each resolution level block by block, downsamples the
+blocks locally and uploads them to the next level, several blocks at a time.
+Images are averaged, and annotations take the most common non-zero label of
+each window, so the hierarchy is ready as soon as the upload finishes
+instead of waiting for the server to downsample:
+
+    rmt.create_cutout(chan, 0, x_rng, y_rng, z_rng, data)
+    rmt.build_pyramid(chan, 0, x_rng, y_rng, z_rng, num_levels=5)
+
+Levels are built one after another, since each is computed from the one
+below it. Blocks are aligned to the chunk grid of the level they write.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from intern.utils.parallel import block_compute
+from intern.utils.progress import ProgressTracker
+from intern.utils.transfer import _fetch_block, _region_bytes, transfer_block_size
+
+# XYZ downsampling factor between levels of each Boss hierarchy method.
+HIERARCHY_FACTORS = {
+    "anisotropic": (2, 2, 1),
+    "isotropic": (2, 2, 2),
+}
+
+
+def _windows(data, factor):
+    """View a ZYX array, whose shape is a multiple of the ZYX factor, as (z, y, x, window voxels)."""
+    nz, ny, nx = (s // f for s, f in zip(data.shape, factor))
+    fz, fy, fx = factor
+    return (
+        data.reshape(nz, fz, ny, fy, nx, fx)
+        .transpose(0, 2, 4, 1, 3, 5)
+        .reshape(nz, ny, nx, fz * fy * fx)
+    )
+
+
+def _padding(shape, factor, offset):
+    """Padding that aligns a ZYX array to the windows of a ZYX factor."""
+    return [(o, -(o + s) % f) for s, f, o in zip(shape, factor, offset)]
+
+
+def downsample_mean(data, factor, offset=(0, 0, 0)):
+    """
+    Downsample an image by averaging each window of voxels.
+
+    Windows cut by the edges of the array average the voxels they hold.
+
+    Arguments:
+        data (numpy.ndarray): ZYX image.
+        factor (Tuple[int, int, int]): XYZ downsampling factor.
+        offset (Tuple[int, int, int]): XYZ position of the first voxel of
+            `data` in its window, for arrays that don't start on the grid.
+
+    Returns:
+        numpy.ndarray: ZYX image, of the same dtype (integers are rounded).
+    """
+    factor = tuple(factor)[::-1]
+    padding = _padding(data.shape, factor, tuple(offset)[::-1])
+    totals = _windows(np.pad(data.astype(np.float64), padding), factor).sum(axis=-1)
+    if any(before or after for before, after in padding):
+        counts = _windows(np.pad(np.ones(data.shape, np.uint16), padding), factor).sum(axis=-1)
+    else:
+        counts = int(np.prod(factor))
+    means = totals / counts
+    if np.issubdtype(data.dtype, np.integer):
+        means = np.rint(means)
+    return means.astype(data.dtype)
+
+
+def downsample_mode(data, factor, offset=(0, 0, 0)):
+    """
+    Downsample annotations by taking the most common label of each window.
+
+    Background (0) is only kept for windows without any other label. Ties
+    go to the label found first in the window.
+
+    Arguments:
+        data (numpy.ndarray): ZYX annotations.
+        factor (Tuple[int, int, int]): XYZ downsampling factor.
+        offset (Tuple[int, int, int]): XYZ position of the first voxel of
+            `data` in its window, for arrays that don't start on the grid.
+
+    Returns:
+        numpy.ndarray: ZYX annotations, of the same dtype.
+    """
+    factor = tuple(factor)[::-1]
+    padding = _padding(data.shape, factor, tuple(offset)[::-1])
+    windows = _windows(np.pad(data, padding), factor)
+
+    # Windows are small (8 voxels for isotropic factors), so count the
+    # matches of every voxel against its whole window.
+    counts = np.zeros(windows.shape, np.uint16)
+    for i in range(windows.shape[-1]):
+        counts[..., i] = (windows == windows[..., i : i + 1]).sum(axis=-1)
+    counts[windows == 0] = 0
+    best = counts.argmax(axis=-1)
+    return np.take_along_axis(windows, best[..., None], axis=-1)[..., 0]
+
+
+def pyramid_regions(x_range, y_range, z_range, num_levels, factor):
+    """
+    Regions covered by each level of a pyramid.
+
+    Arguments:
+        x_range, y_range, z_range (list[int]): Region of the base level.
+        num_levels (int): Number of levels above the base.
+        factor (Tuple[int, int, int]): XYZ downsampling factor between levels.
+
+    Returns:
+        list[list[list[int]]]: [x_range, y_range, z_range] of the base level,
+            then of each level above it.
+    """
+    regions = [[list(x_range), list(y_range), list(z_range)]]
+    for _ in range(num_levels):
+        regions.append([
+            [rng[0] // f, -(-rng[1] // f)]
+            for rng, f in zip(regions[-1], factor)
+        ])
+    return regions
+
+
+def build_pyramid(
+    remote,
+    resource,
+    resolution,
+    x_range,
+    y_range,
+    z_range,
+    num_levels,
+    factor="anisotropic",
+    method=None,
+    block_size=None,
+    max_workers=4,
+    progress=None,
+    cancel=None,
+):
+    """
+    Downsample a region into the levels above a resolution, on the client.
+
+    Arguments:
+        remote (intern.remote.Remote): Remote to read and write.
+        resource (intern.resource.Resource): Resource to downsample.
+        resolution (int): Level holding the data to downsample.
+        x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+        y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+        z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+        num_levels (int): Number of levels to write above `resolution`.
+        factor (Union[str, Tuple[int, int, int]]): XYZ downsampling factor
+            between levels, or a hierarchy method ("anisotropic" or "isotropic").
+        method (optional[str]): "mean" or "mode". Defaults to "mode" for
+            annotation channels and "mean" otherwise.
+        block_size (optional[Tuple[int, int, int]]): Size of the blocks written,
+            in XYZ order. Defaults to a multiple of each level's chunk size.
+        max_workers (int: 4): Number of blocks to downsample concurrently.
+        progress (optional[callable]): Called with an intern.utils.progress.Progress
+            after each block is uploaded.
+        cancel (optional[intern.utils.progress.CancellationToken]): Stops the
+            build before its next block, raising TransferCancelled once the
+            blocks in flight have finished.
+
+    Returns:
+        int: The number of blocks uploaded.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be greater than 0.")
+    if isinstance(factor, str):
+        if factor not in HIERARCHY_FACTORS:
+            raise ValueError("{} is not a valid hierarchy method.".format(factor))
+        factor = HIERARCHY_FACTORS[factor]
+    factor = tuple(int(f) for f in factor)
+    if method is None:
+        method = "mode" if getattr(resource, "type", None) == "annotation" else "mean"
+    if method not in ("mean", "mode"):
+        raise ValueError("method must be 'mean' or 'mode', not {}.".format(method))
+    downsample = downsample_mean if method == "mean" else downsample_mode
+
+    regions = pyramid_regions(x_range, y_range, z_range, num_levels, factor)
+    plans = []
+    for level in range(1, num_levels + 1):
+        chunk_size, origin = remote.get_cutout_chunking(resource, resolution + level)
+        region = regions[level]
+        plans.append(block_compute(
+            region[0][0], region[0][1],
+            region[1][0], region[1][1],
+            region[2][0], region[2][1],
+            origin=origin,
+            block_size=block_size or transfer_block_size(chunk_size),
+        ))
+
+    tracker = ProgressTracker(
+        sum(len(blocks) for blocks in plans),
+        _region_bytes(resource, [b for blocks in plans for b in blocks]),
+        progress,
+    )
+    axis_order = remote.cutout_axis_order
+
+    def _downsample(level, block):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        below = regions[level - 1]
+        # Voxels of the level below that the block covers, clipped to the region.
+        source = [
+            [max(b[0] * f, r[0]), min(b[1] * f, r[1])]
+            for b, f, r in zip(block, factor, below)
+        ]
+        data = _fetch_block(
+            remote, resource, resolution + level - 1, source, axis_order, {})
+        if axis_order == "XYZ":
+            data = data.T
+        offset = [s[0] - b[0] * f for s, b, f in zip(source, block, factor)]
+        data = downsample(np.asarray(data), factor, offset)
+        if axis_order == "XYZ":
+            data = data.T
+        remote.create_cutout(
+            resource, resolution + level, block[0], block[1], block[2],
+            np.ascontiguousarray(data))
+        tracker.update(data.nbytes)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level, blocks in enumerate(plans, start=1):
+            # Keep a bounded window of blocks in flight so that memory use
+            # does not grow with the size of the region.
+            in_flight = deque()
+            try:
+                for block in blocks:
+                    if cancel is not None:
+                        cancel.raise_if_cancelled()
+                    if len(in_flight) >= max_workers:
+                        in_flight.popleft().result()
+                    in_flight.append(executor.submit(_downsample, level, block))
+                while in_flight:
+                    in_flight.popleft().result()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    return tracker.chunks_done
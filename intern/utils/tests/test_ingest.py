@@ -0,0 +1,121 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.utils.ingest import IngestManifest, ingest_cutout
+from intern.utils.progress import CancellationToken, TransferCancelled
+from intern.utils.tests.test_transfer import FakeRemote
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class FailingRemote(FakeRemote):
+    """FakeRemote whose uploads start failing after a number of writes."""
+
+    def __init__(self, volume, fail_after, **kwargs):
+        super(FailingRemote, self).__init__(volume, **kwargs)
+        self.fail_after = fail_after
+
+    def create_cutout(self, resource, resolution, x_range, y_range, z_range, data, time_range=None):
+        if self.fail_after is not None and len(self.writes) >= self.fail_after:
+            raise IOError("Upload failed")
+        super(FailingRemote, self).create_cutout(
+            resource, resolution, x_range, y_range, z_range, data)
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.zyx = np.random.randint(0, 255, (40, 50, 60), dtype=np.uint8)
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "ingest.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_ingest_uploads_every_block(self):
+        dest = FailingRemote(np.zeros_like(self.zyx), None)
+        count = ingest_cutout(
+            dest, None, 0, [0, 60], [0, 50], [0, 40], self.zyx, manifest=self.path,
+            block_size=(16, 16, 8), max_workers=3)
+        self.assertEqual(count, 4 * 4 * 5)
+        np.testing.assert_array_equal(dest.volume, self.zyx)
+        self.assertLessEqual(dest.max_concurrent, 3)
+
+    def test_ingest_resumes_after_failure(self):
+        dest = FailingRemote(np.zeros_like(self.zyx), 10)
+        with self.assertRaises(IOError):
+            ingest_cutout(
+                dest, None, 0, [0, 60], [0, 50], [0, 40], self.zyx, manifest=self.path,
+                block_size=(16, 16, 8), max_workers=1)
+        with IngestManifest(self.path) as manifest:
+            self.assertEqual(len(manifest.done_blocks(None, 0)), 10)
+
+        dest.fail_after = None
+        count = ingest_cutout(
+            dest, None, 0, [0, 60], [0, 50], [0, 40], self.zyx, manifest=self.path,
+            block_size=(16, 16, 8))
+        self.assertEqual(count, 4 * 4 * 5 - 10)
+        self.assertEqual(len(set(dest.writes)), len(dest.writes))
+        np.testing.assert_array_equal(dest.volume, self.zyx)
+
+    def test_ingest_xyz_with_offset(self):
+        xyz = np.ascontiguousarray(self.zyx.T)
+        dest = FakeRemote(np.zeros((70, 60, 50), dtype=np.uint8), axis_order="XYZ")
+        ingest_cutout(
+            dest, None, 0, [10, 70], [10, 60], [10, 50], xyz, block_size=(16, 16, 8))
+        np.testing.assert_array_equal(dest.volume[10:, 10:, 10:], xyz)
+
+    def test_ingest_cancel(self):
+        dest = FailingRemote(np.zeros_like(self.zyx), None)
+        token = CancellationToken()
+        with self.assertRaises(TransferCancelled):
+            ingest_cutout(
+                dest, None, 0, [0, 60], [0, 50], [0, 40], self.zyx, manifest=self.path,
+                block_size=(16, 16, 8), max_workers=1,
+                progress=lambda p: token.cancel(), cancel=token)
+        with IngestManifest(self.path) as manifest:
+            self.assertEqual(len(manifest.done_blocks(None, 0)), len(dest.writes))
+
+    def test_ingest_shape_must_match_region(self):
+        dest = FakeRemote(np.zeros_like(self.zyx))
+        with self.assertRaises(ValueError):
+            ingest_cutout(dest, None, 0, [0, 60], [0, 50], [0, 20], self.zyx)
+
+    def test_manifest_reset(self):
+        with IngestManifest(self.path) as manifest:
+            manifest.mark_done(None, 0, ([0, 16], [0, 16], [0, 8]))
+            manifest.mark_done(None, 1, ([0, 16], [0, 16], [0, 8]))
+            manifest.reset(None, 0)
+            self.assertEqual(manifest.done_blocks(None, 0), set())
+            self.assertEqual(manifest.done_blocks(None, 1), {((0, 16), (0, 16), (0, 8))})
+
+    def test_manifest_path_expands_user(self):
+        home = os.environ.get("HOME")
+        os.environ["HOME"] = self.tmp
+        try:
+            with IngestManifest("~/ingest.sqlite") as manifest:
+                manifest.mark_done(None, 0, ([0, 16], [0, 16], [0, 8]))
+        finally:
+            if home is None:
+                del os.environ["HOME"]
+            else:
+                os.environ["HOME"] = home
+        self.assertTrue(os.path.isfile(self.path))
+        self.assertFalse(os.path.exists("~"))
+
+
+if __name__ == '__main__':
+    unittest.main()
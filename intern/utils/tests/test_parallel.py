@@ -0,0 +1,105 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.utils.parallel import (
+    ascontiguousarray_blocked, block_compute, coalesced_block_size, merge_regions)
+import numpy as np
+import unittest
+
+
+class TestBlockCompute(unittest.TestCase):
+    def test_blocks_cover_region(self):
+        blocks = block_compute(5, 70, 0, 40, 3, 20, block_size=(32, 32, 16))
+        covered = np.zeros((20, 40, 70), dtype=int)
+        for x, y, z in blocks:
+            covered[z[0]:z[1], y[0]:y[1], x[0]:x[1]] += 1
+        self.assertTrue((covered[3:20, 0:40, 5:70] == 1).all())
+        self.assertEqual(covered.sum(), 17 * 40 * 65)
+
+    def test_coalesced_block_size(self):
+        limit = 1024 * 1024 * 64
+        size = coalesced_block_size(0, 10000, 0, 10000, 0, 1000, limit)
+        self.assertLessEqual(np.prod(size), limit)
+        self.assertEqual([s % c for s, c in zip(size, (512, 512, 16))], [0, 0, 0])
+        self.assertLess(
+            len(block_compute(0, 10000, 0, 10000, 0, 1000, block_size=size)),
+            len(block_compute(0, 10000, 0, 10000, 0, 1000, block_size=(1024, 1024, 32))))
+
+    def test_coalesced_block_size_small_region(self):
+        self.assertEqual(
+            coalesced_block_size(0, 600, 0, 600, 0, 20, 1024 * 1024 * 64), (1024, 1024, 32))
+
+
+class TestMergeRegions(unittest.TestCase):
+    def test_overlapping_regions_are_merged(self):
+        groups = merge_regions([
+            ([0, 64], [0, 64], [0, 64]),
+            ([1000, 1010], [0, 10], [0, 10]),
+            ([32, 96], [32, 96], [32, 96]),
+            ([0, 64], [0, 64], [0, 64]),
+        ])
+        self.assertEqual(sorted(groups), [
+            (([0, 96], [0, 96], [0, 96]), [0, 2, 3]),
+            (([1000, 1010], [0, 10], [0, 10]), [1]),
+        ])
+
+    def test_distant_regions_are_not_merged(self):
+        # Both fit in the same cuboid, but their bounding box would be mostly unused.
+        groups = merge_regions([([0, 10], [0, 10], [0, 2]), ([500, 510], [500, 510], [14, 16])])
+        self.assertEqual(2, len(groups))
+
+    def test_adjacent_regions_are_merged(self):
+        regions = [([x, x + 10], [0, 10], [0, 10]) for x in range(0, 100, 10)]
+        self.assertEqual(merge_regions(regions), [(([0, 100], [0, 10], [0, 10]), list(range(10)))])
+
+    def test_max_ratio(self):
+        regions = [([0, 10], [0, 10], [0, 10]), ([15, 25], [0, 10], [0, 10])]
+        self.assertEqual(1, len(merge_regions(regions)))
+        self.assertEqual(2, len(merge_regions(regions, max_ratio=1.0)))
+
+    def test_chain_of_overlapping_regions_is_not_merged_into_one_box(self):
+        regions = [([16 * i, 16 * i + 32],) * 3 for i in range(20)]
+        groups = merge_regions(regions)
+        self.assertGreater(len(groups), 1)
+        self.assertEqual(sorted(i for _, members in groups for i in members), list(range(20)))
+        requested = 20 * 32 ** 3
+        fetched = sum(int(np.prod([r[1] - r[0] for r in box])) for box, _ in groups)
+        self.assertLessEqual(fetched, 2 * requested)
+        for box, members in groups:
+            for i in members:
+                for rng, outer in zip(regions[i], box):
+                    self.assertTrue(outer[0] <= rng[0] and rng[1] <= outer[1])
+
+
+class TestAscontiguousarrayBlocked(unittest.TestCase):
+    def test_contiguous_input_is_returned_unchanged(self):
+        data = np.zeros((4, 5, 6), dtype=np.uint8)
+        self.assertIs(data, ascontiguousarray_blocked(data))
+
+    def test_transposed_view(self):
+        data = np.random.randint(0, 255, (37, 70, 45), dtype=np.uint8)
+        result = ascontiguousarray_blocked(data.T, block_size=16)
+        self.assertTrue(result.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(result, data.T)
+
+    def test_strided_4d_view(self):
+        data = np.random.randint(0, 2 ** 32, (3, 20, 30, 40), dtype=np.uint64)
+        view = data[:, ::2, 5:, ::-1]
+        result = ascontiguousarray_blocked(view, block_size=8)
+        self.assertTrue(result.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(result, view)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.utils.progress import CancellationToken, ProgressTracker, TransferCancelled
+import unittest
+
+
+class TestProgress(unittest.TestCase):
+    def test_tracker_counts_chunks_and_bytes(self):
+        reports = []
+        tracker = ProgressTracker(4, 400, reports.append)
+        for _ in range(4):
+            tracker.update(100)
+        self.assertEqual([p.chunks_done for p in reports], [1, 2, 3, 4])
+        self.assertEqual(reports[-1].bytes_done, 400)
+        self.assertEqual(reports[-1].bytes_total, 400)
+        self.assertEqual(reports[-1].eta_seconds, 0)
+
+    def test_eta_from_chunks_when_size_unknown(self):
+        tracker = ProgressTracker(2, None)
+        progress = tracker.update(100)
+        self.assertIsNone(progress.bytes_total)
+        self.assertGreaterEqual(progress.eta_seconds, 0)
+
+    def test_cancellation_token(self):
+        token = CancellationToken()
+        token.raise_if_cancelled()
+        self.assertFalse(token.cancelled)
+        token.cancel()
+        self.assertTrue(token.cancelled)
+        with self.assertRaises(TransferCancelled):
+            token.raise_if_cancelled()
+
+
+if __name__ == '__main__':
+    unittest.main()
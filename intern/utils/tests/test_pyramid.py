@@ -0,0 +1,157 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.remote.local import LocalRemote
+from intern.utils.pyramid import (
+    build_pyramid, downsample_mean, downsample_mode, pyramid_regions)
+from intern.utils.progress import CancellationToken, TransferCancelled
+import numpy as np
+import shutil
+import tempfile
+import unittest
+
+
+class TestDownsample(unittest.TestCase):
+    def test_mean(self):
+        data = np.arange(2 * 4 * 4, dtype=np.uint8).reshape(2, 4, 4)
+
+        actual = downsample_mean(data, (2, 2, 1))
+
+        self.assertEqual(actual.dtype, np.uint8)
+        self.assertEqual(actual.shape, (2, 2, 2))
+        # The first window is [0, 1, 4, 5].
+        self.assertEqual(actual[0, 0, 0], 2)
+        np.testing.assert_array_equal(
+            actual, np.rint(data.reshape(2, 2, 2, 2, 2).mean(axis=(2, 4))))
+
+    def test_mean_partial_windows(self):
+        data = np.array([[[10, 20, 30]]], dtype=np.uint16)
+
+        # The first voxel is the second of its window, so windows are [_, 10], [20, 30].
+        actual = downsample_mean(data, (2, 1, 1), offset=(1, 0, 0))
+
+        np.testing.assert_array_equal(actual, [[[10, 25]]])
+
+    def test_mean_float(self):
+        data = np.array([[[1.0, 2.0]]], dtype=np.float32)
+        np.testing.assert_array_equal(downsample_mean(data, (2, 1, 1)), [[[1.5]]])
+
+    def test_mode(self):
+        data = np.array([[[5, 5, 7, 0],
+                          [7, 9, 0, 0]]], dtype=np.uint64)
+
+        actual = downsample_mode(data, (2, 2, 1))
+
+        self.assertEqual(actual.dtype, np.uint64)
+        np.testing.assert_array_equal(actual, [[[5, 7]]])
+
+    def test_mode_background(self):
+        data = np.zeros((2, 2, 2), dtype=np.uint64)
+        np.testing.assert_array_equal(downsample_mode(data, (2, 2, 2)), [[[0]]])
+
+    def test_pyramid_regions(self):
+        self.assertEqual(
+            [[[10, 101], [0, 64], [3, 9]],
+             [[5, 51], [0, 32], [3, 9]],
+             [[2, 26], [0, 16], [3, 9]]],
+            pyramid_regions([10, 101], [0, 64], [3, 9], 2, (2, 2, 1)))
+
+
+class TestBuildPyramid(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.remote = LocalRemote({"root": self.root})
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _volume(self, dtype, factor):
+        resource = self.remote.create_resource(
+            "volume", dtype, (100, 80, 16), chunk_size=(16, 16, 4), num_res=4, factor=factor)
+        data = np.random.randint(0, 6, (16, 80, 100)).astype(dtype)
+        self.remote.create_cutout(resource, 0, [0, 100], [0, 80], [0, 16], data)
+        return resource, data
+
+    def test_anisotropic_mean(self):
+        resource, data = self._volume("uint8", (2, 2, 1))
+
+        blocks = build_pyramid(
+            self.remote, resource, 0, [0, 100], [0, 80], [0, 16], 3,
+            block_size=(32, 32, 8), max_workers=3)
+
+        self.assertGreater(blocks, 3)
+        expected = data
+        for res in range(1, 4):
+            expected = downsample_mean(expected, (2, 2, 1))
+            extents = self.remote.get_extents(resource, res)
+            np.testing.assert_array_equal(
+                expected, self.remote.get_cutout(resource, res, *extents))
+
+    def test_isotropic_mode_unaligned(self):
+        resource, data = self._volume("uint64", (2, 2, 2))
+        self.remote.create_cutout(
+            resource, 0, [0, 100], [0, 80], [0, 16], np.zeros_like(data))
+        self.remote.create_cutout(
+            resource, 0, [5, 67], [3, 80], [1, 16], data[1:, 3:, 5:67])
+
+        build_pyramid(
+            self.remote, resource, 0, [5, 67], [3, 80], [1, 16], 1,
+            factor="isotropic", method="mode")
+
+        # The windows cut by the region's edges only hold the region's voxels.
+        expected = downsample_mode(data[1:, 3:, 5:67], (2, 2, 2), offset=(1, 1, 1))
+        np.testing.assert_array_equal(
+            expected, self.remote.get_cutout(resource, 1, [2, 34], [1, 40], [0, 8]))
+
+    def test_method_from_channel_type(self):
+        resource, data = self._volume("uint8", (2, 2, 1))
+        resource.type = "annotation"
+
+        build_pyramid(self.remote, resource, 0, [0, 100], [0, 80], [0, 16], 1)
+
+        np.testing.assert_array_equal(
+            downsample_mode(data, (2, 2, 1)),
+            self.remote.get_cutout(resource, 1, [0, 50], [0, 40], [0, 16]))
+
+    def test_progress(self):
+        resource, _ = self._volume("uint8", (2, 2, 1))
+        reports = []
+
+        blocks = build_pyramid(
+            self.remote, resource, 0, [0, 100], [0, 80], [0, 16], 2,
+            block_size=(16, 16, 16), progress=reports.append)
+
+        self.assertEqual(blocks, len(reports))
+        self.assertEqual(reports[-1].chunks_done, reports[-1].chunks_total)
+
+    def test_cancel(self):
+        resource, _ = self._volume("uint8", (2, 2, 1))
+        cancel = CancellationToken()
+        cancel.cancel()
+        with self.assertRaises(TransferCancelled):
+            build_pyramid(
+                self.remote, resource, 0, [0, 100], [0, 80], [0, 16], 2, cancel=cancel)
+
+    def test_invalid_arguments(self):
+        resource, _ = self._volume("uint8", (2, 2, 1))
+        with self.assertRaises(ValueError):
+            build_pyramid(self.remote, resource, 0, [0, 100], [0, 80], [0, 16], 1,
+                          factor="octree")
+        with self.assertRaises(ValueError):
+            build_pyramid(self.remote, resource, 0, [0, 100], [0, 80], [0, 16], 1,
+                          method="max")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from intern.utils.transfer import (
+    transfer_cutout, transfer_block_size, iter_cutout_blocks, resource_key)
+from intern.remote.local import LocalRemote
+from intern.utils.progress import CancellationToken, TransferCancelled
+import numpy as np
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+
+class FakeRemote(object):
+    """In-memory stand-in for a Remote, backed by a single numpy volume."""
+
+    def __init__(self, volume, axis_order="ZYX", chunk_size=(16, 16, 8), origin=(0, 0, 0)):
+        self.volume = volume
+        self.cutout_axis_order = axis_order
+        self.chunk_size = chunk_size
+        self.origin = origin
+        self.writes = []
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def get_cutout_chunking(self, resource, resolution):
+        return self.chunk_size, self.origin
+
+    def _index(self, x_range, y_range, z_range):
+        xs, ys, zs = slice(*x_range), slice(*y_range), slice(*z_range)
+        return (xs, ys, zs) if self.cutout_axis_order == "XYZ" else (zs, ys, xs)
+
+    def get_cutout(self, resource, resolution, x_range, y_range, z_range):
+        return self.volume[self._index(x_range, y_range, z_range)].copy()
+
+    def create_cutout(self, resource, resolution, x_range, y_range, z_range, data):
+        with self._lock:
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+        self.volume[self._index(x_range, y_range, z_range)] = data
+        with self._lock:
+            self._active -= 1
+            self.writes.append((tuple(x_range), tuple(y_range), tuple(z_range)))
+
+
+class TestTransfer(unittest.TestCase):
+    def setUp(self):
+        self.zyx = np.random.randint(0, 255, (40, 50, 60), dtype=np.uint8)
+
+    def test_block_size_is_multiple_of_chunk_size(self):
+        self.assertEqual(transfer_block_size((64, 64, 64)), (256, 256, 256))
+        self.assertEqual(transfer_block_size((512, 512, 16)), (512, 512, 16))
+
+    def test_transfer_zyx_to_xyz(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros((60, 50, 40), dtype=np.uint8), axis_order="XYZ")
+        transfer_cutout(
+            source, None, dest, None, 0, [0, 60], [0, 50], [0, 40], block_size=(16, 16, 8))
+        np.testing.assert_array_equal(dest.volume, self.zyx.T)
+
+    def test_transfer_xyz_to_zyx(self):
+        source = FakeRemote(np.ascontiguousarray(self.zyx.T), axis_order="XYZ")
+        dest = FakeRemote(np.zeros_like(self.zyx))
+        transfer_cutout(
+            source, None, dest, None, 0, [0, 60], [0, 50], [0, 40], block_size=(32, 32, 16))
+        np.testing.assert_array_equal(dest.volume, self.zyx)
+
+    def test_blocks_align_to_destination_chunks(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros_like(self.zyx), origin=(0, 0, 0))
+        transfer_cutout(
+            source, None, dest, None, 0, [5, 60], [3, 50], [1, 40], block_size=(16, 16, 8))
+        for x_range, y_range, z_range in dest.writes:
+            for (start, stop), full, size in zip(
+                    (x_range, y_range, z_range), ((5, 60), (3, 50), (1, 40)), (16, 16, 8)):
+                self.assertTrue(start == full[0] or start % size == 0)
+                self.assertTrue(stop == full[1] or stop % size == 0)
+        np.testing.assert_array_equal(dest.volume[1:40, 3:50, 5:60], self.zyx[1:40, 3:50, 5:60])
+        self.assertFalse(dest.volume[0].any())
+
+    def test_in_flight_blocks_are_bounded(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros_like(self.zyx))
+        transfer_cutout(
+            source, None, dest, None, 0, [0, 60], [0, 50], [0, 40],
+            block_size=(16, 16, 8), max_workers=2)
+        self.assertLessEqual(dest.max_concurrent, 2)
+        np.testing.assert_array_equal(dest.volume, self.zyx)
+
+    def test_block_size_must_match_chunk_grid(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros_like(self.zyx))
+        with self.assertRaises(ValueError):
+            transfer_cutout(
+                source, None, dest, None, 0, [0, 60], [0, 50], [0, 40], block_size=(10, 16, 8))
+
+    def test_errors_propagate(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros((1, 1, 1), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            transfer_cutout(
+                source, None, dest, None, 0, [0, 60], [0, 50], [0, 40], block_size=(16, 16, 8))
+
+
+    def test_iter_blocks_cover_region(self):
+        source = FakeRemote(self.zyx)
+        out = np.zeros_like(self.zyx)
+        count = 0
+        for (x, y, z), data in iter_cutout_blocks(
+                source, None, 0, [5, 60], [3, 50], [1, 40], block_size=(16, 16, 8)):
+            out[z[0]:z[1], y[0]:y[1], x[0]:x[1]] = data
+            count += 1
+        self.assertEqual(count, 4 * 4 * 5)
+        np.testing.assert_array_equal(out[1:40, 3:50, 5:60], self.zyx[1:40, 3:50, 5:60])
+        self.assertFalse(out[0].any())
+
+    def test_iter_blocks_overlap_is_clipped(self):
+        source = FakeRemote(np.ascontiguousarray(self.zyx.T), axis_order="XYZ")
+        for (x, y, z), data in iter_cutout_blocks(
+                source, None, 0, [0, 60], [0, 50], [0, 40],
+                block_size=(16, 16, 8), overlap=1, max_workers=2):
+            self.assertEqual(x[1], min(x[0] + 17, 60))
+            self.assertEqual(z[1], min(z[0] + 9, 40))
+            np.testing.assert_array_equal(data, self.zyx[z[0]:z[1], y[0]:y[1], x[0]:x[1]].T)
+
+    def test_transfer_reports_progress(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros_like(self.zyx))
+        reports = []
+        transfer_cutout(
+            source, None, dest, None, 0, [0, 60], [0, 50], [0, 40],
+            block_size=(16, 16, 8), progress=reports.append)
+        self.assertEqual(len(reports), 4 * 4 * 5)
+        self.assertEqual(max(p.chunks_done for p in reports), 4 * 4 * 5)
+        self.assertEqual(max(p.bytes_done for p in reports), self.zyx.nbytes)
+
+    def test_transfer_cancel(self):
+        source = FakeRemote(self.zyx)
+        dest = FakeRemote(np.zeros_like(self.zyx))
+        token = CancellationToken()
+
+        def _cancel_after_first(progress):
+            token.cancel()
+
+        with self.assertRaises(TransferCancelled):
+            transfer_cutout(
+                source, None, dest, None, 0, [0, 60], [0, 50], [0, 40],
+                block_size=(16, 16, 8), max_workers=1,
+                progress=_cancel_after_first, cancel=token)
+        self.assertLess(len(dest.writes), 4 * 4 * 5)
+
+    def test_iter_blocks_cancel(self):
+        source = FakeRemote(self.zyx)
+        token = CancellationToken()
+        blocks = iter_cutout_blocks(
+            source, None, 0, [0, 60], [0, 50], [0, 40], block_size=(16, 16, 8),
+            cancel=token)
+        next(blocks)
+        token.cancel()
+        with self.assertRaises(TransferCancelled):
+            list(blocks)
+
+
+
+class TestResourceKey(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_local_volumes_have_distinct_keys(self):
+        rmt = LocalRemote({"root": self.root})
+        first = rmt.create_resource("first", "uint8", (8, 8, 8))
+        second = rmt.create_resource("second", "uint8", (8, 8, 8))
+        self.assertNotEqual(resource_key(first), resource_key(second))
+        self.assertEqual(resource_key(first), "file://" + os.path.join(os.path.abspath(self.root), "first"))
+        self.assertEqual(resource_key(first), resource_key(rmt.get_resource("first")))
+
+
+if __name__ == '__main__':
+    unittest.main()
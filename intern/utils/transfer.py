@@ -0,0 +1,317 @@
+# Copyright 2020 The Johns Hopkins University Applied Physics Laboratory
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Streaming transfers of volumetric data between remotes.
+
+A transfer walks the requested region in blocks that are aligned to the
+destination's native chunk grid. Each block is downloaded from the source,
+reordered into the destination's axis order and uploaded, with several blocks
+in flight at once so that downloads and uploads overlap. Only the in-flight
+blocks are ever held in memory.
+
+`iter_cutout_blocks` exposes the download half on its own, for consumers such
+as streaming meshing that process each block as soon as it arrives.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import os
+
+import numpy as np
+
+from intern.utils.parallel import block_compute
+from intern.utils.progress import ProgressTracker
+
+# Rough number of voxels to move per block. The destination chunk size is
+# scaled up towards this so that tiny chunks don't cost one round trip each.
+DEFAULT_BLOCK_VOXELS = 512 * 512 * 64
+
+
+def resource_key(resource):
+    """String identifying a resource, for caches and manifests kept on disk."""
+    try:
+        # Boss channels
+        return resource.get_cutout_route()
+    except (AttributeError, RuntimeError):
+        pass
+    if getattr(resource, "url", None):
+        # CloudVolume
+        return resource.url
+    if getattr(resource, "path", None):
+        # Local and zarr volumes
+        return "file://" + os.path.abspath(resource.path)
+    # DVID data instances
+    return "{}/{}".format(getattr(resource, "UUID", None), getattr(resource, "name", None))
+
+
+def transfer_block_size(chunk_size, target_voxels=DEFAULT_BLOCK_VOXELS):
+    """
+    Scale a chunk size up to a block size that is a whole multiple of it.
+
+    Arguments:
+        chunk_size (Tuple[int, int, int]): Native chunk size in XYZ order.
+        target_voxels (int): Approximate number of voxels per block.
+
+    Returns:
+        Tuple[int, int, int]: Block size in XYZ order.
+    """
+    chunk_voxels = int(np.prod(chunk_size))
+    scale = 1
+    while (scale + 1) ** 3 * chunk_voxels <= target_voxels:
+        scale += 1
+    return tuple(int(c) * scale for c in chunk_size)
+
+
+def _fetch_block(source, resource, resolution, block, axis_order, get_kwargs):
+    """
+    Download one block, in the source remote's axis order.
+
+    Some remotes squeeze singleton dimensions out of their cutouts, so the
+    result is reshaped back to the full 3D shape of the block.
+    """
+    x, y, z = block
+    data = source.get_cutout(resource, resolution, x, y, z, **get_kwargs)
+    if axis_order == "XYZ":
+        shape = (x[1] - x[0], y[1] - y[0], z[1] - z[0])
+    else:
+        shape = (z[1] - z[0], y[1] - y[0], x[1] - x[0])
+    return np.reshape(data, shape)
+
+
+def _region_bytes(resource, blocks):
+    """Uncompressed size of the blocks, or None if the resource has no datatype."""
+    datatype = getattr(resource, "datatype", None)
+    if not datatype:
+        return None
+    itemsize = np.dtype(datatype).itemsize
+    return sum(
+        itemsize * int(np.prod([stop - start for start, stop in block]))
+        for block in blocks
+    )
+
+
+def transfer_cutout(
+    source,
+    source_resource,
+    dest,
+    dest_resource,
+    resolution,
+    x_range,
+    y_range,
+    z_range,
+    dest_resolution=None,
+    block_size=None,
+    max_workers=4,
+    get_kwargs=None,
+    progress=None,
+    cancel=None,
+):
+    """
+    Stream a region from one remote to another, one block at a time.
+
+    Blocks are aligned to the destination's chunk grid (as reported by
+    `dest.get_cutout_chunking`), so every upload writes whole chunks except at
+    the edges of the region. At most `max_workers` blocks are held in memory.
+
+    Arguments:
+        source (intern.remote.Remote): Remote to download from.
+        source_resource (intern.resource.Resource): Resource to download.
+        dest (intern.remote.Remote): Remote to upload to.
+        dest_resource (intern.resource.Resource): Resource to upload to.
+        resolution (int): Resolution to read from the source.
+        x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+        y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+        z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+        dest_resolution (optional[int]): Resolution to write to the
+            destination. Defaults to `resolution`.
+        block_size (optional[Tuple[int, int, int]]): Size of each block in XYZ
+            order. Defaults to a multiple of the destination chunk size.
+        max_workers (int: 4): Number of blocks to move concurrently.
+        get_kwargs (optional[dict]): Extra arguments for `source.get_cutout`.
+        progress (optional[callable]): Called with an intern.utils.progress.Progress
+            after each block is uploaded.
+        cancel (optional[intern.utils.progress.CancellationToken]): Stops the
+            transfer before its next block, raising TransferCancelled once the
+            blocks in flight have finished.
+
+    Returns:
+        int: The number of blocks transferred.
+    """
+    if dest_resolution is None:
+        dest_resolution = resolution
+    get_kwargs = get_kwargs or {}
+    if max_workers < 1:
+        raise ValueError("max_workers must be greater than 0.")
+
+    chunk_size, origin = dest.get_cutout_chunking(dest_resource, dest_resolution)
+    if block_size is None:
+        block_size = transfer_block_size(chunk_size)
+    elif any(b % c for b, c in zip(block_size, chunk_size)):
+        raise ValueError(
+            "block_size {} must be a multiple of the destination chunk size {}.".format(
+                block_size, chunk_size
+            )
+        )
+
+    source_order = source.cutout_axis_order
+    dest_order = dest.cutout_axis_order
+
+    def _move(block):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        data = _fetch_block(
+            source, source_resource, resolution, block, source_order, get_kwargs
+        )
+        if source_order != dest_order:
+            # XYZ and ZYX are reversals of one another, so this is a view and
+            # the full block is never copied here. CloudVolume stores chunks
+            # in Fortran order, so a C-ordered ZYX block viewed as XYZ is
+            # already in its chunk layout. Boss and DVID make the view
+            # contiguous with a cache-blocked copy right before encoding.
+            data = np.transpose(data)
+        dest.create_cutout(
+            dest_resource, dest_resolution, block[0], block[1], block[2], data
+        )
+        tracker.update(data.nbytes)
+
+    blocks = block_compute(
+        x_range[0], x_range[1],
+        y_range[0], y_range[1],
+        z_range[0], z_range[1],
+        origin=origin,
+        block_size=block_size,
+    )
+
+    tracker = ProgressTracker(
+        len(blocks), _region_bytes(dest_resource, blocks), progress
+    )
+
+    # Keep a bounded window of blocks in flight so that memory use does not
+    # grow with the size of the region.
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for block in blocks:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                if len(in_flight) >= max_workers:
+                    in_flight.popleft().result()
+                in_flight.append(executor.submit(_move, block))
+            while in_flight:
+                in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    return len(blocks)
+
+
+def iter_cutout_blocks(
+    source,
+    resource,
+    resolution,
+    x_range,
+    y_range,
+    z_range,
+    block_size=None,
+    overlap=0,
+    max_workers=4,
+    get_kwargs=None,
+    progress=None,
+    cancel=None,
+):
+    """
+    Download a region block by block, yielding blocks as they arrive.
+
+    Blocks are aligned to the source's chunk grid and downloaded on a thread
+    pool, so later blocks keep downloading while the caller processes the
+    ones already yielded. At most `max_workers` blocks are in flight, and
+    blocks are yielded in the order they finish, not in grid order.
+
+    Arguments:
+        source (intern.remote.Remote): Remote to download from.
+        resource (intern.resource.Resource): Resource to download.
+        resolution (int): Resolution to read.
+        x_range (list[int]): x range such as [10, 20] which means x>=10 and x<20.
+        y_range (list[int]): y range such as [10, 20] which means y>=10 and y<20.
+        z_range (list[int]): z range such as [10, 20] which means z>=10 and z<20.
+        block_size (optional[Tuple[int, int, int]]): Size of each block in XYZ
+            order. Defaults to a multiple of the source chunk size.
+        overlap (int: 0): Extra voxels to read past the high side of each
+            block, clipped to the region.
+        max_workers (int: 4): Number of blocks to download concurrently.
+        get_kwargs (optional[dict]): Extra arguments for `source.get_cutout`.
+        progress (optional[callable]): Called with an intern.utils.progress.Progress
+            as each block is yielded.
+        cancel (optional[intern.utils.progress.CancellationToken]): Stops the
+            download before the next block is yielded, raising TransferCancelled.
+
+    Yields:
+        ((x_range, y_range, z_range), numpy.ndarray): Bounds of each block as
+            read (including the overlap) and its data, in the source's axis order.
+    """
+    get_kwargs = get_kwargs or {}
+    if max_workers < 1:
+        raise ValueError("max_workers must be greater than 0.")
+
+    chunk_size, origin = source.get_cutout_chunking(resource, resolution)
+    if block_size is None:
+        block_size = transfer_block_size(chunk_size)
+
+    blocks = block_compute(
+        x_range[0], x_range[1],
+        y_range[0], y_range[1],
+        z_range[0], z_range[1],
+        origin=origin,
+        block_size=block_size,
+    )
+    stops = (x_range[1], y_range[1], z_range[1])
+    blocks = [
+        tuple((b[0], min(b[1] + overlap, stop)) for b, stop in zip(block, stops))
+        for block in blocks
+    ]
+
+    tracker = ProgressTracker(len(blocks), _region_bytes(resource, blocks), progress)
+
+    def _fetch(block):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        return block, _fetch_block(
+            source, resource, resolution, block, source.cutout_axis_order, get_kwargs
+        )
+
+    remaining = iter(blocks)
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for block in remaining:
+                in_flight.add(executor.submit(_fetch, block))
+                if len(in_flight) >= max_workers:
+                    break
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if cancel is not None:
+                        cancel.raise_if_cancelled()
+                    # Keep the window full before handing the block over.
+                    for block in remaining:
+                        in_flight.add(executor.submit(_fetch, block))
+                        break
+                    block, data = future.result()
+                    tracker.update(data.nbytes)
+                    yield block, data
+        finally:
+            for future in in_flight:
+                future.cancel()
@@ -73,11 +73,14 @@ setup(
         "boss",
         "microns",
     ],
-    packages=find_packages(exclude=["docs", "tests*"]),
+    packages=find_packages(exclude=["docs", "tests*", "benchmarks*"]),
     include_package_data=True,
     author="Johns Hopkins University Applied Physics Laboratory",
     install_requires=install_requires,
-    extras_require={"cloudvolume": ["cloud-volume>=3.4.0", "brotli>=1.0.7"]},
+    extras_require={
+        "cloudvolume": ["cloud-volume>=3.4.0", "brotli>=1.0.7"],
+        "zarr": ["zarr>=2.5,<3"],
+    },
     dependency_links=dependency_links,
     author_email="iarpamicrons@jhuapl.edu",
 )